@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	benchmark/lib.py: Infrastructure shared by all benchmark suites
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import math
+import threading
+import time
+import tracemalloc
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Client-side phases of a routine call: name of data method (or routine attribute) -> name of phase
+PHASES_DATA = {
+	'client_pack_memory_list': 'pack_memory',
+	'arg_list_pack': 'pack_args',
+	'arg_list_unpack': 'unpack_args',
+	'arg_list_sync': 'sync_args',
+	'return_msg_unpack': 'unpack_return',
+	'client_unpack_memory_list': 'unpack_memory',
+	'server_unpack_memory_list': 'unpack_memory_callback',
+	'server_pack_memory_list': 'pack_memory_callback',
+	'return_msg_pack': 'pack_return_callback'
+	}
+PHASES_ROUTINE = {
+	'__handle_call_on_server__': 'rpc',
+	'__handle_call_scalar_on_server__': 'rpc'
+	}
+
+# Percentiles reported for latencies
+PERCENTILES = (50, 90, 99)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class case_class:
+
+
+	def __init__(
+		self, name, category, call, routine = None, bytes_per_call = 0, iterations = None,
+		setup = None, allocations = False
+		):
+
+		# Unique name of case and its category
+		self.name = name
+		self.category = category
+
+		# Callable without arguments, runs exactly one operation
+		self.call = call
+
+		# Callable without arguments, prepares one operation (not timed)
+		self.setup = setup
+
+		# Trace memory allocations of operation
+		self.allocations = allocations
+
+		# Handle on zugbruecke routine(s) involved, required for phase breakdown
+		self.routine = routine
+
+		# Payload per call, used for throughput
+		self.bytes_per_call = bytes_per_call
+
+		# Case-specific number of iterations (None: use default)
+		self.iterations = iterations
+
+
+class phase_profiler_class:
+
+
+	def __init__(self, data):
+
+		# Handle on data object of session
+		self.data = data
+
+		# Accumulated time per phase
+		self.phases = {}
+
+		# Stack of active phases per thread
+		self.local = threading.local()
+
+		# Main thread - phases from other threads (e.g. callbacks from threads of a DLL) are nested, not exclusive
+		self.main_thread = threading.current_thread()
+
+		# Keep track of everything patched
+		self.patched = []
+
+
+	def attach(self, routine):
+
+		# Wrap data methods
+		for method_name, phase_name in PHASES_DATA.items():
+			self.__patch__(self.data, method_name, phase_name)
+
+		# Wrap routine attributes (e.g. RPC)
+		if routine is not None:
+			for attr_name, phase_name in PHASES_ROUTINE.items():
+				self.__patch__(routine, attr_name, phase_name)
+
+
+	def detach(self):
+
+		# Remove instance attributes, exposing original methods again
+		for obj, attr_name, original, is_instance_attr in reversed(self.patched):
+			if is_instance_attr:
+				setattr(obj, attr_name, original)
+			else:
+				delattr(obj, attr_name)
+		self.patched.clear()
+
+
+	def reset(self):
+
+		self.phases.clear()
+
+
+	def __enter_phase__(self, phase_name):
+
+		now = time.perf_counter()
+		stack = self.__get_stack__()
+
+		# Pause parent phase
+		if len(stack) > 0:
+			self.__account__(stack[-1][0], now - stack[-1][1])
+
+		stack.append([phase_name, now])
+
+
+	def __exit_phase__(self):
+
+		now = time.perf_counter()
+		stack = self.__get_stack__()
+
+		phase_name, started = stack.pop()
+		self.__account__(phase_name, now - started)
+
+		# Resume parent phase
+		if len(stack) > 0:
+			stack[-1][1] = now
+
+
+	def __account__(self, phase_name, duration):
+
+		# Phases from other threads overlap with main thread, mark them
+		if threading.current_thread() is not self.main_thread:
+			phase_name = 'nested:' + phase_name
+
+		self.phases[phase_name] = self.phases.get(phase_name, 0.0) + duration
+
+
+	def __get_stack__(self):
+
+		if not hasattr(self.local, 'stack'):
+			self.local.stack = []
+		return self.local.stack
+
+
+	def __patch__(self, obj, attr_name, phase_name):
+
+		original = getattr(obj, attr_name, None)
+		if original is None:
+			return
+
+		def wrapper(*args, **kwargs):
+			self.__enter_phase__(phase_name)
+			try:
+				return original(*args, **kwargs)
+			finally:
+				self.__exit_phase__()
+
+		self.patched.append((obj, attr_name, original, attr_name in vars(obj)))
+		setattr(obj, attr_name, wrapper)
+
+
+def compare_results(baseline, current, tolerance, metric = 'p50'):
+
+	regressions, improvements = [], []
+
+	# Compare cases present in both runs
+	for name in sorted(set(baseline['cases'].keys()) & set(current['cases'].keys())):
+
+		old_value = baseline['cases'][name]['latency_ns'][metric]
+		new_value = current['cases'][name]['latency_ns'][metric]
+
+		if old_value <= 0:
+			continue
+		ratio = new_value / old_value
+
+		entry = {
+			'name': name,
+			'metric': metric,
+			'baseline_ns': old_value,
+			'current_ns': new_value,
+			'ratio': ratio
+			}
+
+		if ratio > 1.0 + tolerance:
+			regressions.append(entry)
+		elif ratio < 1.0 - tolerance:
+			improvements.append(entry)
+
+	return {
+		'tolerance': tolerance,
+		'metric': metric,
+		'regressions': regressions,
+		'improvements': improvements,
+		'missing': sorted(set(baseline['cases'].keys()) - set(current['cases'].keys()))
+		}
+
+
+def get_percentile(sorted_values, percent):
+
+	if len(sorted_values) == 0:
+		return 0.0
+
+	# Nearest-rank method
+	rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+	return sorted_values[max(rank, 1) - 1]
+
+
+def run_case(case, iterations, profiler = None):
+
+	# Warm up: First call configures routines
+	if case.setup is not None:
+		case.setup()
+	case.call()
+
+	# Measure individual calls
+	latencies = []
+	for _ in range(iterations):
+		if case.setup is not None:
+			case.setup()
+		started = time.perf_counter()
+		case.call()
+		latencies.append(time.perf_counter() - started)
+
+	result = {
+		'category': case.category,
+		'iterations': iterations,
+		'bytes_per_call': case.bytes_per_call,
+		'latency_ns': summarize_latencies(latencies),
+		'throughput': {
+			'calls_per_s': iterations / sum(latencies),
+			'bytes_per_s': case.bytes_per_call * iterations / sum(latencies)
+			}
+		}
+
+	# Per-phase breakdown in separate pass, instrumentation adds overhead
+	if profiler is not None:
+		result['phases_ns'] = run_case_phases(case, max(iterations // 10, 3), profiler)
+
+	# Memory allocations in separate pass, tracing adds overhead
+	if case.allocations:
+		result['allocations'] = run_case_allocations(case, min(max(iterations // 10, 3), 100))
+
+	return result
+
+
+def run_case_allocations(case, iterations):
+	"""
+	tracemalloc only knows about blocks, which are alive. Reported are the peak
+	of memory allocated during one operation as well as bytes and blocks, which
+	were allocated during the operation and are still alive after it.
+	"""
+
+	peak_bytes, retained_bytes, retained_blocks = 0, 0, 0
+
+	tracemalloc.start()
+
+	try:
+		for _ in range(iterations):
+			if case.setup is not None:
+				case.setup()
+			tracemalloc.clear_traces()
+			case.call()
+			current, peak = tracemalloc.get_traced_memory()
+			snapshot = tracemalloc.take_snapshot()
+			peak_bytes += peak
+			retained_bytes += current
+			retained_blocks += sum(stat.count for stat in snapshot.statistics('filename'))
+	finally:
+		tracemalloc.stop()
+
+	return {
+		'peak_bytes_per_op': peak_bytes / iterations,
+		'retained_bytes_per_op': retained_bytes / iterations,
+		'retained_blocks_per_op': retained_blocks / iterations
+		}
+
+
+def run_case_phases(case, iterations, profiler):
+
+	profiler.attach(case.routine)
+	profiler.reset()
+
+	total = 0.0
+	try:
+		for _ in range(iterations):
+			if case.setup is not None:
+				case.setup()
+			started = time.perf_counter()
+			case.call()
+			total += time.perf_counter() - started
+	finally:
+		profiler.detach()
+
+	phases_ns = {
+		phase_name: duration / iterations * 1e9
+		for phase_name, duration in profiler.phases.items()
+		}
+	phases_ns['total'] = total / iterations * 1e9
+	phases_ns['other'] = phases_ns['total'] - sum(
+		value for key, value in phases_ns.items()
+		if key != 'total' and not key.startswith('nested:')
+		)
+
+	return phases_ns
+
+
+def summarize_latencies(latencies):
+
+	values = sorted(value * 1e9 for value in latencies)
+	mean = sum(values) / len(values)
+
+	summary = {
+		'mean': mean,
+		'min': values[0],
+		'max': values[-1],
+		'stdev': math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+		}
+	summary.update({
+		('p%d' % percent): get_percentile(values, percent) for percent in PERCENTILES
+		})
+
+	return summary
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	benchmark/suite_data.py: Microbenchmarks of data layer in isolation (no session, no RPC)
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import ctypes
+from copy import deepcopy
+from multiprocessing.reduction import ForkingPickler
+import pickle
+
+from zugbruecke.core.data import data_class, mem_contents
+from zugbruecke.core.data.mem_contents import WCHAR_BYTES
+
+from lib import case_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Operations of one round trip through the data layer, in order
+OPERATIONS = (
+	'pack', # client: arguments
+	'memsync_pack', # client: memory
+	'pickle', # transport: serialize and deserialize request like multiprocessing.connection
+	'unpack', # server: arguments
+	'memsync_unpack', # server: memory
+	'reply_pack', # server: memory and arguments after call
+	'sync', # client: arguments
+	'memsync_sync' # client: memory
+	)
+
+ARRAY_SIZE = 8
+IMAGE_WIDTH, IMAGE_HEIGHT = 64, 64
+STRING_LENGTH = 1000
+
+# Lengths of strings (characters) converted between wchar_t sizes
+WCHAR_LENGTHS = (
+	('1k', 2 ** 10),
+	('1m', 2 ** 20),
+	('4m', 4 * 2 ** 20)
+	)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class struct_with_arrays(ctypes.Structure):
+
+
+	_fields_ = [
+		('flags', ctypes.c_int8 * ARRAY_SIZE),
+		('matrix', ctypes.c_float * ARRAY_SIZE * ARRAY_SIZE),
+		('scale', ctypes.c_double)
+		]
+
+
+class image_data(ctypes.Structure):
+
+
+	_fields_ = [
+		('data', ctypes.POINTER(ctypes.c_int16)),
+		('width', ctypes.c_int16),
+		('height', ctypes.c_int16)
+		]
+
+
+class log_class:
+
+
+	def out(self, message):
+		pass
+
+
+	def err(self, message):
+		pass
+
+
+class signature_class:
+
+
+	def __init__(self, client, server, argtypes, restype, memsync, make_args):
+
+		self.client, self.server = client, server
+		self.argtypes, self.restype, self.memsync = argtypes, restype, memsync
+
+		# Function without arguments, returns tuple of fresh arguments for one round trip
+		self.make_args = make_args
+
+		# Client-side definitions
+		self.argtypes_d, self.restype_d, self.memsync_d, memsync_d_packed = self.__configure__()
+
+		# Server-side definitions, like routine_server_class.__configure__
+		self.server_argtypes_d = pickle.loads(ForkingPickler.dumps(self.argtypes_d))
+		self.server_memsync_d = server.unpack_definition_memsync(
+			pickle.loads(ForkingPickler.dumps(memsync_d_packed))
+			)
+		server.unpack_definition_argtypes(self.server_argtypes_d)
+
+		# Indices of arguments synced after call, both sides
+		self.mutable_d = client.get_mutable_definition_indices(self.argtypes_d)
+		self.server_mutable_d = server.get_mutable_definition_indices(self.server_argtypes_d)
+
+		# State passed from one operation to the next
+		self.state = {}
+
+
+	def get_case(self, name, operation):
+
+		index = OPERATIONS.index(operation)
+
+		def setup():
+			self.state.clear()
+			self.state['args'] = self.make_args()
+			for prior_operation in OPERATIONS[:index]:
+				getattr(self, '__op_%s__' % prior_operation)()
+
+		return case_class(
+			'%s.%s' % (name, operation), operation,
+			getattr(self, '__op_%s__' % operation),
+			setup = setup,
+			allocations = True
+			)
+
+
+	def get_configure_case(self, name):
+
+		return case_class(
+			'%s.configure' % name, 'configure',
+			self.__configure__,
+			allocations = True
+			)
+
+
+	def __configure__(self):
+
+		# Like routine_client_class.__configure__
+		argtypes_d = self.client.pack_definition_argtypes(self.argtypes)
+		restype_d = self.client.pack_definition_returntype(self.restype)
+		memsync_d = self.client.unpack_definition_memsync(deepcopy(self.memsync))
+		memsync_d_packed = self.client.pack_definition_memsync(memsync_d)
+		self.client.apply_memsync_to_argtypes_and_restype_definition(
+			memsync_d, argtypes_d, restype_d
+			)
+
+		return argtypes_d, restype_d, memsync_d, memsync_d_packed
+
+
+	def __op_pack__(self):
+
+		self.state['arg_message'] = self.client.arg_list_pack(self.state['args'], self.argtypes_d)
+
+
+	def __op_memsync_pack__(self):
+
+		self.state['memory'] = self.client.client_pack_memory_list(self.state['args'], self.memsync_d)
+
+
+	def __op_pickle__(self):
+
+		self.state['arg_message'], self.state['memory'] = pickle.loads(ForkingPickler.dumps(
+			(self.state['arg_message'], self.state['memory'])
+			))
+
+
+	def __op_unpack__(self):
+
+		self.state['server_args'] = self.server.arg_list_unpack(
+			self.state['arg_message'], self.server_argtypes_d
+			)
+
+
+	def __op_memsync_unpack__(self):
+
+		self.server.server_unpack_memory_list(
+			self.state['server_args'], self.state['memory'], self.server_memsync_d
+			)
+
+
+	def __op_reply_pack__(self):
+
+		self.server.server_pack_memory_list(
+			self.state['server_args'], None, self.state['memory'], self.server_memsync_d
+			)
+		self.state['arg_message'], self.state['memory'] = pickle.loads(ForkingPickler.dumps((
+			self.server.arg_list_pack_mutable(self.state['server_args'], self.server_argtypes_d, self.server_mutable_d),
+			self.state['memory']
+			)))
+
+
+	def __op_sync__(self):
+
+		self.client.arg_list_sync_mutable(
+			self.state['args'], self.state['arg_message'], self.argtypes_d, self.mutable_d
+			)
+
+
+	def __op_memsync_sync__(self):
+
+		self.client.client_unpack_memory_list(
+			self.state['args'], None, self.state['memory'], self.memsync_d
+			)
+
+
+class suite_class:
+
+
+	def __init__(self, parameter = None):
+
+		log = log_class()
+
+		# Both sides of the data layer in one process
+		self.client = data_class(log, is_server = False)
+		self.server = data_class(log, is_server = True)
+
+		# Server gets its own cache, so it has to generate struct types from definitions
+		self.server.cache_dict = {
+			key: (type(value)() if key != 'func_type' else {flag: {} for flag in value.keys()})
+			for key, value in data_class.cache_dict.items()
+			}
+
+
+	def get_cases(self):
+
+		cases = []
+		for name in ('scalars', 'nested_arrays', 'struct_arrays', 'memsync_length_func', 'wchar_string'):
+			signature = getattr(self, '__signature_%s__' % name)()
+			cases.append(signature.get_configure_case(name))
+			cases.extend([signature.get_case(name, operation) for operation in OPERATIONS])
+		for size_name, length in WCHAR_LENGTHS:
+			cases.extend(self.__cases_wchar_convert__(size_name, length))
+		return cases
+
+
+	def get_profiler(self):
+
+		# No session, no phases
+		return None
+
+
+	def terminate(self):
+
+		pass
+
+
+	def __cases_wchar_convert__(self, size_name, length):
+
+		# Mostly BMP characters, some outside of it (surrogate pairs in UTF-16)
+		text = ('zugbrücke \U0001f309 ' * (length // 12 + 1))[:length]
+		state = {}
+
+		cases = []
+		for direction, old_width, new_width, codec in (('4to2', 4, 2, 'utf-32-le'), ('2to4', 2, 4, 'utf-16-le')):
+
+			data = text.encode(codec)
+
+			def setup(data = data, old_width = old_width):
+				state['memory_d'] = {'d': data, 'l': len(data), 'w': old_width}
+
+			def call(new_width = new_width):
+				mem_contents.WCHAR_BYTES = new_width
+				try:
+					self.server.__adjust_wchar_length__(state['memory_d'])
+				finally:
+					mem_contents.WCHAR_BYTES = WCHAR_BYTES
+
+			cases.append(case_class(
+				'wchar_convert_%s_%s' % (direction, size_name), 'wchar_convert', call,
+				setup = setup,
+				bytes_per_call = len(data),
+				allocations = True
+				))
+
+		return cases
+
+
+	def __signature_scalars__(self):
+
+		return signature_class(
+			self.client, self.server,
+			(ctypes.c_int16, ctypes.c_int32, ctypes.c_float, ctypes.c_double), ctypes.c_double, [],
+			lambda: (1, 2, 3.0, 4.0)
+			)
+
+
+	def __signature_nested_arrays__(self):
+
+		array_type = ctypes.c_int16 * ARRAY_SIZE * ARRAY_SIZE * ARRAY_SIZE
+
+		def make_args():
+			array = array_type()
+			for x in range(ARRAY_SIZE):
+				for y in range(ARRAY_SIZE):
+					array[x][y][:] = range(ARRAY_SIZE)
+			return (ctypes.pointer(array),)
+
+		return signature_class(
+			self.client, self.server,
+			(ctypes.POINTER(array_type),), ctypes.c_int, [],
+			make_args
+			)
+
+
+	def __signature_struct_arrays__(self):
+
+		def make_args():
+			struct = struct_with_arrays()
+			struct.flags[:] = range(ARRAY_SIZE)
+			for x in range(ARRAY_SIZE):
+				struct.matrix[x][:] = range(ARRAY_SIZE)
+			struct.scale = 2.0
+			return (ctypes.pointer(struct),)
+
+		return signature_class(
+			self.client, self.server,
+			(ctypes.POINTER(struct_with_arrays),), ctypes.c_int, [],
+			make_args
+			)
+
+
+	def __signature_memsync_length_func__(self):
+
+		length = IMAGE_WIDTH * IMAGE_HEIGHT
+
+		def make_args():
+			in_image, out_image = image_data(), image_data()
+			for image in (in_image, out_image):
+				image.width, image.height = IMAGE_WIDTH, IMAGE_HEIGHT
+			in_image.data = ctypes.cast(
+				ctypes.pointer((ctypes.c_int16 * length)(*range(length))),
+				ctypes.POINTER(ctypes.c_int16)
+				)
+			return (ctypes.pointer(in_image), ctypes.pointer(out_image))
+
+		return signature_class(
+			self.client, self.server,
+			(ctypes.POINTER(image_data), ctypes.POINTER(image_data)), ctypes.c_int,
+			[
+				{
+					'p': [0, 'data'],
+					'l': ([0, 'width'], [0, 'height']),
+					'f': 'lambda x, y: x * y',
+					't': 'c_int16'
+					},
+				{
+					'p': [1, 'data'],
+					'l': ([1, 'width'], [1, 'height']),
+					'f': 'lambda x, y: x * y',
+					't': 'c_int16'
+					}
+				],
+			make_args
+			)
+
+
+	def __signature_wchar_string__(self):
+
+		in_string = ('zugbrücke ' * STRING_LENGTH)[:STRING_LENGTH]
+
+		return signature_class(
+			self.client, self.server,
+			(ctypes.POINTER(ctypes.c_wchar), ctypes.c_wchar, ctypes.c_wchar), None,
+			[
+				{
+					'p': [0],
+					'n': True,
+					'w': True
+					}
+				],
+			lambda: (ctypes.create_unicode_buffer(in_string), 'z', 'Z')
+			)
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	benchmark/suite_dll.py: Benchmark cases built on top of demo DLL
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import zugbruecke as ctypes
+
+from lib import case_class, phase_profiler_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+DLL_NAME = 'tests/demo_dll.dll'
+
+# Sizes of memsync'ed arrays in bytes
+MEMSYNC_SIZES = (
+	('1k', 2 ** 10),
+	('10k', 10 * 2 ** 10),
+	('100k', 100 * 2 ** 10),
+	('1m', 2 ** 20),
+	('10m', 10 * 2 ** 20),
+	('100m', 100 * 2 ** 20)
+	)
+
+# Maximum volume of data moved per case, limits iterations for large segments
+MEMSYNC_BUDGET = 512 * 2 ** 20
+
+# Streams of calls: number of chunks and size of a chunk in bytes
+STREAM_CHUNKS = 8
+STREAM_CHUNK_SIZE = 2 ** 20
+
+# Loop moved to the Wine side
+PYTHON_SOURCE = """
+def gcd_loop(dll_name, n):
+	gcd = get_dll(dll_name).cookbook_gcd
+	return [gcd(35, 42) for _ in range(n)]
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class cookbook_point(ctypes.Structure):
+
+
+	_fields_ = [
+		('x', ctypes.c_double),
+		('y', ctypes.c_double)
+		]
+
+
+class image_data(ctypes.Structure):
+
+
+	_fields_ = [
+		('data', ctypes.POINTER(ctypes.c_int16)),
+		('width', ctypes.c_int16),
+		('height', ctypes.c_int16)
+		]
+
+
+class suite_class:
+
+
+	def __init__(self, parameter = None):
+
+		# Separate session, logs off for minimal overhead
+		self.session = ctypes.session(parameter if parameter is not None else {'log_level': 0})
+		self.dll = self.session.load_library(DLL_NAME, 'windll')
+
+		# Started on demand, see __get_session_prefetch__
+		self.parameter = parameter
+		self.session_prefetch = None
+
+
+	def get_cases(self):
+
+		cases = []
+		for category in (
+			'scalar', 'byref', 'struct', 'array', 'memsync', 'stream',
+			'string', 'unicode', 'callback', 'callback_memsync', 'python'
+			):
+			cases.extend(getattr(self, '__cases_%s__' % category)())
+		return cases
+
+
+	def get_profiler(self):
+
+		return phase_profiler_class(self.session.data)
+
+
+	def terminate(self):
+
+		self.session.terminate()
+		if self.session_prefetch is not None:
+			self.session_prefetch.terminate()
+
+
+	def __get_session_prefetch__(self):
+
+		if self.session_prefetch is None:
+			self.session_prefetch = ctypes.session(self.parameter if self.parameter is not None else {'log_level': 0})
+		return self.session_prefetch
+
+
+	def __cases_scalar__(self):
+
+		simple_demo_routine = self.dll.simple_demo_routine
+		simple_demo_routine.argtypes = (ctypes.c_float, ctypes.c_float)
+		simple_demo_routine.restype = ctypes.c_float
+
+		cookbook_gcd = self.dll.cookbook_gcd
+		cookbook_gcd.argtypes = (ctypes.c_int, ctypes.c_int)
+		cookbook_gcd.restype = ctypes.c_int
+
+		return [
+			case_class(
+				'simple_demo_routine', 'scalar',
+				lambda: simple_demo_routine(20.0, 1.07),
+				routine = simple_demo_routine
+				),
+			case_class(
+				'gcd', 'scalar',
+				lambda: cookbook_gcd(35, 42),
+				routine = cookbook_gcd
+				)
+			]
+
+
+	def __cases_byref__(self):
+
+		cookbook_divide = self.dll.cookbook_divide
+		cookbook_divide.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+		cookbook_divide.restype = ctypes.c_int
+
+		remainder = ctypes.c_int()
+
+		return [
+			case_class(
+				'divide', 'byref',
+				lambda: cookbook_divide(42, 8, ctypes.byref(remainder)),
+				routine = cookbook_divide
+				)
+			]
+
+
+	def __cases_struct__(self):
+
+		cookbook_distance = self.dll.cookbook_distance
+		cookbook_distance.argtypes = (ctypes.POINTER(cookbook_point), ctypes.POINTER(cookbook_point))
+		cookbook_distance.restype = ctypes.c_double
+
+		p1, p2 = cookbook_point(1, 2), cookbook_point(4, 5)
+
+		return [
+			case_class(
+				'distance', 'struct',
+				lambda: cookbook_distance(p1, p2),
+				routine = cookbook_distance
+				)
+			]
+
+
+	def __cases_array__(self):
+
+		gauss_elimination = self.dll.gauss_elimination
+		gauss_elimination.argtypes = (
+			ctypes.POINTER(ctypes.c_float * 4 * 3),
+			ctypes.POINTER(ctypes.c_float * 3)
+			)
+
+		A = [[1, 2, 3, 2], [1, 3, 2, 4], [3, 2, 1, 2]]
+
+		def call():
+			_A = (ctypes.c_float * 4 * 3)(*(tuple(eq) for eq in A))
+			_x = (ctypes.c_float * 3)()
+			gauss_elimination(ctypes.pointer(_A), ctypes.pointer(_x))
+
+		return [
+			case_class(
+				'gauss_elimination', 'array', call,
+				routine = gauss_elimination,
+				bytes_per_call = ctypes.sizeof(ctypes.c_float) * (12 + 3)
+				)
+			]
+
+
+	def __cases_memsync__(self):
+
+		cookbook_avg = self.dll.cookbook_avg
+		cookbook_avg.argtypes = (ctypes.POINTER(ctypes.c_double), ctypes.c_int)
+		cookbook_avg.restype = ctypes.c_double
+		cookbook_avg.memsync = [
+			{
+				'p': [0],
+				'l': [1],
+				't': 'c_double'
+				}
+			]
+
+		cases = []
+		for size_name, size in MEMSYNC_SIZES:
+
+			length = size // ctypes.sizeof(ctypes.c_double)
+			values = (ctypes.c_double * length)()
+			pointer = ctypes.cast(ctypes.pointer(values), ctypes.POINTER(ctypes.c_double))
+
+			cases.append(case_class(
+				'avg_%s' % size_name, 'memsync',
+				(lambda pointer, length: lambda: cookbook_avg(pointer, length))(pointer, length),
+				routine = cookbook_avg,
+				bytes_per_call = length * ctypes.sizeof(ctypes.c_double),
+				iterations = max(3, MEMSYNC_BUDGET // size)
+				))
+
+		return cases
+
+
+	def __cases_stream__(self):
+
+		cookbook_avg = self.dll.cookbook_avg
+		cookbook_avg.argtypes = (ctypes.POINTER(ctypes.c_double), ctypes.c_int)
+		cookbook_avg.restype = ctypes.c_double
+		cookbook_avg.memsync = [
+			{
+				'p': [0],
+				'l': [1],
+				't': 'c_double'
+				}
+			]
+
+		# Chunks of 1 MB each, called one after another vs. streamed
+		length = STREAM_CHUNK_SIZE // ctypes.sizeof(ctypes.c_double)
+		chunks = [
+			(ctypes.cast(ctypes.pointer((ctypes.c_double * length)()), ctypes.POINTER(ctypes.c_double)), length)
+			for _ in range(STREAM_CHUNKS)
+			]
+
+		cases = [case_class(
+			'avg_chunks_loop', 'stream',
+			lambda: [cookbook_avg(*chunk) for chunk in chunks],
+			routine = cookbook_avg,
+			bytes_per_call = STREAM_CHUNK_SIZE * STREAM_CHUNKS,
+			iterations = MEMSYNC_BUDGET // (STREAM_CHUNK_SIZE * STREAM_CHUNKS)
+			)]
+		for depth in (1, 2, 3):
+			cases.append(case_class(
+				'avg_chunks_stream_depth%d' % depth, 'stream',
+				(lambda depth: lambda: list(cookbook_avg.stream(chunks, depth = depth)))(depth),
+				routine = cookbook_avg,
+				bytes_per_call = STREAM_CHUNK_SIZE * STREAM_CHUNKS,
+				iterations = MEMSYNC_BUDGET // (STREAM_CHUNK_SIZE * STREAM_CHUNKS)
+				))
+
+		return cases
+
+
+	def __cases_string__(self):
+
+		replace_letter = self.dll.replace_letter_in_null_terminated_string_a
+		replace_letter.argtypes = (
+			ctypes.POINTER(ctypes.c_char),
+			ctypes.c_char,
+			ctypes.c_char
+			)
+		replace_letter.memsync = [
+			{
+				'p': [0],
+				'n': True
+				}
+			]
+
+		in_string = ('zugbruecke ' * 100).encode('utf-8')
+		string_buffer = ctypes.create_string_buffer(in_string)
+
+		return [
+			case_class(
+				'replace_letter', 'string',
+				lambda: replace_letter(string_buffer, b'z', b'Z'),
+				routine = replace_letter,
+				bytes_per_call = len(in_string)
+				)
+			]
+
+
+	def __cases_unicode__(self):
+
+		replace_letter = self.dll.replace_letter_in_null_terminated_string_unicode_a
+		replace_letter.argtypes = (
+			ctypes.POINTER(ctypes.c_wchar),
+			ctypes.c_wchar,
+			ctypes.c_wchar
+			)
+		replace_letter.memsync = [
+			{
+				'p': [0],
+				'n': True,
+				'w': True
+				}
+			]
+
+		in_string = 'zugbrücke ' * 100
+		string_buffer = ctypes.create_unicode_buffer(in_string)
+
+		return [
+			case_class(
+				'replace_letter_unicode', 'unicode',
+				lambda: replace_letter(string_buffer, 'z', 'Z'),
+				routine = replace_letter,
+				bytes_per_call = len(in_string) * ctypes.sizeof(ctypes.c_wchar)
+				)
+			]
+
+
+	def __cases_callback__(self):
+
+		conveyor_belt = self.session.ctypes_WINFUNCTYPE(ctypes.c_int16, ctypes.c_int16)
+
+		sum_elements_from_callback = self.dll.sum_elements_from_callback
+		sum_elements_from_callback.argtypes = (ctypes.c_int16, conveyor_belt)
+		sum_elements_from_callback.restype = ctypes.c_int16
+
+		DATA = [1, 6, 8, 4, 9, 7, 4, 2, 5, 2]
+
+		@conveyor_belt
+		def get_data(index):
+			return DATA[index]
+
+		# Same callback, running natively on the Wine side
+		get_data_portable = self.session.portable_callback(
+			'def get_data(index):\n\treturn %r[index]\n' % DATA, name = 'get_data'
+			)
+
+		# Same callback, results prefetched in one block. The setting is picked up when
+		# the routine is configured, so it requires a routine of a session of its own.
+		dll_prefetch = self.__get_session_prefetch__().load_library(DLL_NAME, 'windll')
+		conveyor_belt_prefetch = self.session_prefetch.ctypes_WINFUNCTYPE(ctypes.c_int16, ctypes.c_int16)
+		sum_elements_from_callback_prefetch = dll_prefetch.sum_elements_from_callback
+		sum_elements_from_callback_prefetch.argtypes = (ctypes.c_int16, conveyor_belt_prefetch)
+		sum_elements_from_callback_prefetch.restype = ctypes.c_int16
+
+		@conveyor_belt_prefetch
+		def get_data_prefetch(index):
+			return DATA[index]
+
+		conveyor_belt_prefetch.prefetch = 16
+		sum_elements_from_callback_prefetch(len(DATA), get_data_prefetch)
+		conveyor_belt_prefetch.prefetch = 0
+
+		return [
+			case_class(
+				'sum_elements_from_callback', 'callback',
+				lambda: sum_elements_from_callback(len(DATA), get_data),
+				routine = sum_elements_from_callback,
+				iterations = 100
+				),
+			case_class(
+				'sum_elements_from_callback_prefetch', 'callback',
+				lambda: sum_elements_from_callback_prefetch(len(DATA), get_data_prefetch),
+				iterations = 100
+				),
+			case_class(
+				'sum_elements_from_callback_portable', 'callback',
+				lambda: sum_elements_from_callback(len(DATA), get_data_portable),
+				routine = sum_elements_from_callback,
+				iterations = 100
+				)
+			]
+
+
+	def __cases_callback_memsync__(self):
+
+		filter_func_type = self.session.ctypes_WINFUNCTYPE(ctypes.c_int16, ctypes.POINTER(image_data))
+		filter_func_type.memsync = [
+			{
+				'p': [0, 'data'],
+				'l': ([0, 'width'], [0, 'height']),
+				'f': 'lambda x, y: x * y',
+				't': 'c_int16'
+				}
+			]
+
+		apply_filter_to_image = self.dll.apply_filter_to_image
+		apply_filter_to_image.argtypes = (
+			ctypes.POINTER(image_data),
+			ctypes.POINTER(image_data),
+			filter_func_type
+			)
+		apply_filter_to_image.memsync = [
+			{
+				'p': [0, 'data'],
+				'l': ([0, 'width'], [0, 'height']),
+				'f': 'lambda x, y: x * y',
+				't': 'c_int16'
+				},
+			{
+				'p': [1, 'data'],
+				'l': ([1, 'width'], [1, 'height']),
+				'f': 'lambda x, y: x * y',
+				't': 'c_int16'
+				}
+			]
+
+		@filter_func_type
+		def filter_average(in_buffer):
+			width, height = in_buffer.contents.width, in_buffer.contents.height
+			return sum(in_buffer.contents.data[index] for index in range(width * height)) // (width * height)
+
+		WIDTH, HEIGHT = 10, 10
+
+		def call():
+			in_image, out_image = image_data(), image_data()
+			in_image.width, in_image.height = WIDTH, HEIGHT
+			in_image.data = ctypes.cast(
+				ctypes.pointer((ctypes.c_int16 * (WIDTH * HEIGHT))(*range(WIDTH * HEIGHT))),
+				ctypes.POINTER(ctypes.c_int16)
+				)
+			apply_filter_to_image(
+				ctypes.pointer(in_image), ctypes.pointer(out_image), filter_average
+				)
+
+		return [
+			case_class(
+				'apply_filter_to_image', 'callback_memsync', call,
+				routine = apply_filter_to_image,
+				bytes_per_call = 2 * WIDTH * HEIGHT * ctypes.sizeof(ctypes.c_int16),
+				iterations = 10
+				)
+			]
+
+
+	def __cases_python__(self):
+
+		cookbook_gcd = self.dll.cookbook_gcd
+		cookbook_gcd.argtypes = (ctypes.c_int, ctypes.c_int)
+		cookbook_gcd.restype = ctypes.c_int
+
+		module = self.session.load_python_module(PYTHON_SOURCE, name = 'benchmark')
+
+		return [
+			case_class(
+				'gcd_x100_unix', 'python',
+				lambda: [cookbook_gcd(35, 42) for _ in range(100)],
+				routine = cookbook_gcd,
+				iterations = 100
+				),
+			case_class(
+				'gcd_x100_wine', 'python',
+				lambda: module.gcd_loop(DLL_NAME, 100),
+				iterations = 100
+				)
+			]
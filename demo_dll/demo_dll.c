@@ -571,6 +571,28 @@ int16_t __stdcall DEMODLL sum_elements_from_callback_in_struct(
 }
 
 
+static conveyor_belt kept_callback = NULL;
+
+void __stdcall DEMODLL keep_callback_from_struct(
+	struct conveyor_belt_data *data
+	)
+{
+
+	kept_callback = data->get_data;
+
+}
+
+
+int16_t __stdcall DEMODLL call_kept_callback(
+	int16_t index
+	)
+{
+
+	return kept_callback(index);
+
+}
+
+
 int16_t _coordinates_in_image_(
 	image_data *in_image, int16_t x, int16_t y
 	)
@@ -684,6 +706,7 @@ int16_t __stdcall DEMODLL use_optional_callback_b(
 // DLL infrastructure
 // +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+#ifdef _WIN32
 DEMODLL bool __stdcall DllMain(HANDLE hModule, DWORD ul_reason_for_call, LPVOID lpReserved)
 {
 	switch (ul_reason_for_call)
@@ -699,3 +722,4 @@ DEMODLL bool __stdcall DllMain(HANDLE hModule, DWORD ul_reason_for_call, LPVOID
 	}
 	return TRUE;
 }
+#endif
@@ -33,10 +33,18 @@ specific language governing rights and limitations under the License.
 // +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 #include <stdio.h>
-#include <windows.h>
 #include <stdint.h>
 #include <math.h>
 
+#ifdef _WIN32
+#include <windows.h>
+#else
+// Native build for zugbruecke's loopback mode, see makefile target "loopback"
+#include <stdlib.h>
+#include <string.h>
+#include <wchar.h>
+#endif
+
 
 // +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 // MACROS
@@ -45,7 +53,12 @@ specific language governing rights and limitations under the License.
 // #ifdef BUILDING_EXAMPLE_DLL
 // #define DEMODLL __declspec(dllexport)
 // #else
+#ifdef _WIN32
 #define DEMODLL __declspec(dllimport)
+#else
+#define DEMODLL
+#define __stdcall
+#endif
 // #endif
 
 typedef int32_t bool;
@@ -275,6 +288,14 @@ int16_t __stdcall DEMODLL sum_elements_from_callback_in_struct(
 	struct conveyor_belt_data *data
 	);
 
+void __stdcall DEMODLL keep_callback_from_struct(
+	struct conveyor_belt_data *data
+	);
+
+int16_t __stdcall DEMODLL call_kept_callback(
+	int16_t index
+	);
+
 typedef struct image_data {
 	int16_t *data;
 	int16_t width;
@@ -304,7 +325,9 @@ int16_t __stdcall DEMODLL use_optional_callback_b(
 // DLL infrastructure
 // +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+#ifdef _WIN32
 DEMODLL bool __stdcall DllMain(HANDLE hModule, DWORD ul_reason_for_call, LPVOID lpReserved);
+#endif
 
 // DEMODLL_H
 #endif
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	run_benchmark.py: Run benchmark suite, report as JSON, compare against baseline
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+BENCHMARK_FLD = 'benchmark'
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def run_suite(suite_name, iterations, case_filter, phases):
+
+	cwd = os.path.dirname(os.path.abspath(__file__))
+	sys.path.append(os.path.join(cwd, BENCHMARK_FLD))
+
+	lib = importlib.import_module('lib')
+	suite = importlib.import_module('suite_' + suite_name).suite_class()
+
+	results = {
+		'meta': {
+			'suite': suite_name,
+			'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'iterations': iterations
+			},
+		'cases': {}
+		}
+
+	try:
+
+		profiler = suite.get_profiler() if phases else None
+
+		for case in suite.get_cases():
+
+			if case_filter is not None and case_filter not in case.name:
+				continue
+
+			sys.stderr.write('[benchmark] %s ...\n' % case.name)
+
+			results['cases'][case.name] = lib.run_case(
+				case,
+				case.iterations if case.iterations is not None else iterations,
+				profiler
+				)
+
+	finally:
+
+		suite.terminate()
+
+	return results
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# INIT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+if __name__ == '__main__':
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument(
+		'-s', '--suite', type = str, nargs = 1, default = ['dll']
+		)
+	parser.add_argument(
+		'-n', '--iterations', type = int, nargs = 1, default = [2000]
+		)
+	parser.add_argument(
+		'-k', '--filter', type = str, nargs = 1, default = [None]
+		)
+	parser.add_argument(
+		'-o', '--output', type = str, nargs = 1, default = [None]
+		)
+	parser.add_argument(
+		'-c', '--compare', type = str, nargs = 1, default = [None]
+		)
+	parser.add_argument(
+		'-t', '--tolerance', type = float, nargs = 1, default = [0.1]
+		)
+	parser.add_argument(
+		'--no-phases', action = 'store_true'
+		)
+	args = parser.parse_args()
+
+	results = run_suite(args.suite[0], args.iterations[0], args.filter[0], not args.no_phases)
+
+	# Compare against saved baseline
+	if args.compare[0] is not None:
+		from lib import compare_results
+		with open(args.compare[0], 'r') as f:
+			baseline = json.loads(f.read())
+		results['comparison'] = compare_results(baseline, results, args.tolerance[0])
+
+	output = json.dumps(results, indent = 4, sort_keys = True)
+	if args.output[0] is not None:
+		with open(args.output[0], 'w') as f:
+			f.write(output + '\n')
+	else:
+		print(output)
+
+	# Flag regressions by exit code
+	if 'comparison' in results and len(results['comparison']['regressions']) > 0:
+		for entry in results['comparison']['regressions']:
+			sys.stderr.write('[benchmark] REGRESSION %s: %.1f ns -> %.1f ns (x%.2f)\n' % (
+				entry['name'], entry['baseline_ns'], entry['current_ns'], entry['ratio']
+				))
+		sys.exit(1)
@@ -60,6 +60,18 @@ if __name__ == '__main__':
 	parser.add_argument(
 		'--log_write', type = int, nargs = 1
 		)
+	parser.add_argument(
+		'--loopback', type = int, nargs = 1, default = [0]
+		)
+	parser.add_argument(
+		'--memory_pool_size', type = int, nargs = 1, default = [0]
+		)
+	parser.add_argument(
+		'--memsync_stream_threshold', type = int, nargs = 1, default = [0]
+		)
+	parser.add_argument(
+		'--memsync_stream_chunk_size', type = int, nargs = 1, default = [4 * 1024 * 1024]
+		)
 	args = parser.parse_args()
 
 	# Generate parameter dict
@@ -71,7 +83,11 @@ if __name__ == '__main__':
 		'log_write': bool(args.log_write[0]),
 		'log_level': args.log_level[0],
 		'port_socket_wine': args.port_socket_wine[0],
-		'port_socket_unix': args.port_socket_unix[0]
+		'port_socket_unix': args.port_socket_unix[0],
+		'loopback': bool(args.loopback[0]),
+		'memory_pool_size': args.memory_pool_size[0],
+		'memsync_stream_threshold': args.memsync_stream_threshold[0],
+		'memsync_stream_chunk_size': args.memsync_stream_chunk_size[0]
 		}
 
 	# Fire up wine server session with parsed parameters
@@ -59,6 +59,9 @@ class callback_translator_client_class:
 		# Store definition of argument types
 		self.argtypes_d = argtypes_d
 
+		# Indices of arguments, which are synced after call
+		self.mutable_d = self.data.get_mutable_definition_indices(argtypes_d)
+
 		# Store definition of return value type
 		self.restype_d = restype_d
 
@@ -103,9 +106,12 @@ class callback_translator_client_class:
 			# Push traceback to log
 			self.log.err(traceback.format_exc())
 
-			# Pack return package and return it
+			# Buffers are not reused
+			self.data.server_discard_memory_list(arg_memory_list)
+
+			# Pack return package and return it (arguments unchanged, nothing to sync)
 			return {
-				'args': arg_message_list,
+				'args': [],
 				'return_value': return_value,
 				'memory': arg_memory_list,
 				'success': False,
@@ -117,8 +123,8 @@ class callback_translator_client_class:
 			# Pack memory for return
 			self.data.server_pack_memory_list(args_list, return_value, arg_memory_list, self.memsync_d)
 
-			# Get new arg message list
-			arg_message_list = self.data.arg_list_pack(args_list, self.argtypes_d)
+			# Get new arg message list (only arguments, which can have changed)
+			arg_message_list = self.data.arg_list_pack_mutable(args_list, self.argtypes_d, self.mutable_d)
 
 			# Pack return value
 			return_message = self.data.return_msg_pack(return_value, self.restype_d)
@@ -144,3 +150,32 @@ class callback_translator_client_class:
 			self.log.err(traceback.format_exc())
 
 			raise e
+
+
+	def call_block(self, start, count):
+		"""
+		Prefetch protocol: Returns results for indices start, start + 1, ... in one go.
+		Stops at the first index, for which the Python function raises an error.
+		"""
+
+		# Function pointers without Python function (e.g. fields of structures) are called one by one
+		function = getattr(self.handler, '_function_', None)
+		if function is None:
+			return []
+
+		# Log status
+		self.log.out('[callback-client] Prefetching %d results of callback routine "%s" ...' % (count, self.name))
+
+		return_message_list = []
+
+		for index in range(start, start + count):
+
+			# Errors (e.g. index out of range) end the block, the Wine side calls one by one then
+			try:
+				return_value = self.data.return_msg_pack(function(index), self.restype_d)
+			except Exception:
+				break
+
+			return_message_list.append(return_value)
+
+		return return_message_list
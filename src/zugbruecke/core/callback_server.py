@@ -31,6 +31,7 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from collections import OrderedDict
 from pprint import pformat as pf
 import traceback
 
@@ -42,7 +43,8 @@ import traceback
 class callback_translator_server_class:
 
 
-	def __init__(self, data, routine_name, routine_handler, argtypes_d, restype_d, memsync_d):
+	def __init__(self, data, routine_name, routine_handler, argtypes_d, restype_d, memsync_d,
+		memoize = 0, prefetch = 0, prefetch_handler = None):
 
 		# Store my own name
 		self.name = routine_name
@@ -59,18 +61,59 @@ class callback_translator_server_class:
 		# Store definition of argument types
 		self.argtypes_d = argtypes_d
 
+		# Indices of arguments, which are synced after call
+		self.mutable_d = self.data.get_mutable_definition_indices(argtypes_d)
+
 		# Store definition of return value type
 		self.restype_d = restype_d
 
 		# Store memsync definition
 		self.memsync_d = memsync_d
 
+		# Results only depend on arguments by value
+		is_scalar = self.data.is_scalar_definition(argtypes_d, restype_d, memsync_d)
+
+		# Memoize results (LRU) if requested and if possible
+		self.memoize = memoize if is_scalar else 0
+		self.memo_dict = OrderedDict()
+		self.memo_hits = 0
+		self.memo_misses = 0
+
+		# Prefetch blocks of results if requested and if callback only takes an index
+		self.prefetch = prefetch if is_scalar and len(argtypes_d) == 1 else 0
+		self.prefetch_handler = prefetch_handler
+		self.prefetch_start = 0
+		self.prefetch_list = []
+		self.prefetch_hits = 0
+		self.prefetch_blocks = 0
+
 
 	def __call__(self, *args):
 
 		# Log status
 		self.log.out('[callback-server] Trying to call callback routine "%s" ...' % self.name)
 
+		# Answer from memoized results if possible
+		if self.memoize > 0:
+			try:
+				return_value = self.memo_dict[args]
+			except KeyError:
+				self.memo_misses += 1
+			else:
+				self.memo_hits += 1
+				self.memo_dict.move_to_end(args)
+				return return_value
+
+		# Answer from prefetched block of results if possible
+		if self.prefetch > 0 and isinstance(args[0], int):
+			offset = args[0] - self.prefetch_start
+			if not 0 <= offset < len(self.prefetch_list):
+				self.__prefetch__(args[0])
+				offset = 0
+			if offset < len(self.prefetch_list):
+				self.prefetch_hits += 1
+				return self.prefetch_list[offset]
+
 		# Log status
 		self.log.out('[callback-server] ... parameters are "%r". Packing and pushing to client ...' % (args,))
 
@@ -110,11 +153,7 @@ class callback_translator_server_class:
 			self.log.out('[callback-server] ... received feedback from client, unpacking ...')
 
 			# Unpack return dict (for pointers and structs)
-			self.data.arg_list_sync(
-				args,
-				self.data.arg_list_unpack(return_dict['args'], self.argtypes_d),
-				self.argtypes_d
-				)
+			self.data.arg_list_sync_mutable(args, return_dict['args'], self.argtypes_d, self.mutable_d)
 
 			# Unpack return value
 			return_value = self.data.return_msg_unpack(return_dict['return_value'], self.restype_d)
@@ -137,8 +176,47 @@ class callback_translator_server_class:
 			self.log.out('[callback-server] ... call raised an error.')
 			raise return_dict['exception']
 
+		# Memoize result, drop least recently used one
+		if self.memoize > 0:
+			self.memo_dict[args] = return_value
+			if len(self.memo_dict) > self.memoize:
+				self.memo_dict.popitem(last = False)
+
 		# Log status
 		self.log.out('[callback-server] ... unpacked, return.')
 
 		# Return data directly to DLL routine
 		return return_value
+
+
+	def get_statistics(self):
+
+		return {
+			'hits': self.memo_hits,
+			'misses': self.memo_misses,
+			'size': len(self.memo_dict),
+			'maxsize': self.memoize,
+			'prefetched': self.prefetch_hits,
+			'blocks': self.prefetch_blocks
+			}
+
+
+	def invalidate(self):
+
+		# Drop memoized and prefetched results, keep statistics
+		self.memo_dict.clear()
+		self.prefetch_list = []
+
+
+	def __prefetch__(self, index):
+
+		# Log status
+		self.log.out('[callback-server] Prefetching %d results of callback routine "%s" ...' % (self.prefetch, self.name))
+
+		# One round trip for a block of results, may be shorter or empty (errors)
+		self.prefetch_list = [
+			self.data.return_msg_unpack(return_message, self.restype_d)
+			for return_message in self.prefetch_handler(index, self.prefetch)
+			]
+		self.prefetch_start = index
+		self.prefetch_blocks += 1
@@ -74,6 +74,18 @@ def get_default_config():
 	# Default config directory
 	cfg['dir'] = __get_default_config_directory__()
 
+	# Run session server natively on Unix instead of Wine (for tests and benchmarks)
+	cfg['loopback'] = os.environ.get('ZUGBRUECKE_LOOPBACK', '0') not in ('', '0')
+
+	# Maximum size of buffers retained for reuse by memsync per side in bytes, 0 is off
+	cfg['memory_pool_size'] = 16 * 1024 * 1024
+
+	# Memory segments of this size in bytes and larger are streamed in chunks by memsync, 0 is off
+	cfg['memsync_stream_threshold'] = 32 * 1024 * 1024
+
+	# Size of chunks of streamed memory segments in bytes
+	cfg['memsync_stream_chunk_size'] = 4 * 1024 * 1024
+
 	return cfg
 
 
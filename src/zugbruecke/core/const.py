@@ -44,3 +44,22 @@ GROUP_FUNCTION = 8
 
 # Required for WINFUNCTYPE
 _FUNCFLAG_STDCALL = 0 # EXPORT
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CALLBACKS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Maximum number of registered callbacks, which can not be tracked (e.g. fields of structures)
+CALLBACK_CACHE_SIZE = 256
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# MANIFEST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Format version of binding manifests, part of the key of their on-disk cache
+MANIFEST_VERSION = 1
+
+# Format version of packed definitions, part of the key of on-disk caches of manifests
+DEFINITION_VERSION = 3
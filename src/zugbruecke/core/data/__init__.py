@@ -31,12 +31,28 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from collections import (
+	deque,
+	OrderedDict
+	)
 from ctypes import _FUNCFLAG_CDECL
+from itertools import count
+from threading import (
+	local,
+	RLock
+	)
+from weakref import (
+	WeakKeyDictionary,
+	WeakValueDictionary
+	)
 
 from .arg_contents import arguments_contents_class
 from .arg_definition import arguments_definition_class
 from .mem_contents import memory_contents_class
 from .mem_definition import memory_definition_class
+from .pool import memory_pool_class
+from .remote import remote_contents_class
+from .stream import stream_contents_class
 
 from ..const import _FUNCFLAG_STDCALL
 
@@ -49,7 +65,9 @@ class data_class(
 	arguments_contents_class,
 	arguments_definition_class,
 	memory_contents_class,
-	memory_definition_class
+	memory_definition_class,
+	remote_contents_class,
+	stream_contents_class
 	):
 
 
@@ -58,15 +76,71 @@ class data_class(
 			_FUNCFLAG_CDECL: {},
 			_FUNCFLAG_STDCALL: {}
 			},
-		'func_handle': {},
-		'struct_type': {}
+		'func_handle': {}, # server side: name -> native callback
+		'func_translator': {}, # server side: name -> callback translator
+		'struct_type': {}, # name -> datatype (weak references on client side)
+		'struct_name': WeakKeyDictionary(), # datatype (client side) -> name
+		'struct_name_used': set(), # client side: names of structs, also of those which are gone
+		'packed_definition': WeakKeyDictionary() # datatype (client side) -> packed definition
 		}
 
 
-	def __init__(self, log, is_server, callback_client = None, callback_server = None):
+	def __init__(self, log, is_server, callback_client = None, callback_server = None, memory_pool_size = 0,
+		stream_threshold = 0, stream_chunk_size = 4 * 1024 * 1024):
 
 		self.log = log
 		self.is_server = is_server
 
+		# Struct types (client side) belong to user code, dynamically created ones can be collected
+		if not is_server and not isinstance(self.cache_dict['struct_type'], WeakValueDictionary):
+			self.cache_dict['struct_type'] = WeakValueDictionary(self.cache_dict['struct_type'])
+
 		self.callback_client = callback_client
 		self.callback_server = callback_server
+
+		# Callbacks (client side): (address, id of type) -> name, names are never reused
+		self.callback_name_dict = {}
+		self.callback_counter = 0
+
+		# Callbacks (client side): name -> [translator, finalizer or None, (address, id of type)]
+		self.callback_dict = {}
+
+		# Callbacks (client side), which can not be tracked: names in least recently used order
+		self.callback_lru = OrderedDict()
+
+		# Names of garbage collected callbacks (client side), dropped with next callback (any thread)
+		self.callback_dropped_queue = deque()
+
+		# Names of dropped callbacks (client side), released on server with next callback
+		self.callback_release_list = []
+
+		# Callbacks (client side) are added and dropped by one thread at a time
+		self.callback_lock = RLock()
+
+		# Remote buffers (server side): id -> [buffer, reference count]
+		self.remote_buffer_dict = {}
+		self.remote_buffer_counter = 0
+
+		# Number of live references on remote buffers (handles on client side)
+		self.remote_references = 0
+
+		# Remote buffers of garbage collected handles (client side), released with next call (any thread)
+		self.remote_release_queue = deque()
+
+		# Buffers for memory synchronized during calls (server side and callbacks on client side)
+		self.memory_pool = memory_pool_class(memory_pool_size)
+
+		# Memory streamed in chunks during calls (client side): token -> (address, length, buffer or None)
+		# Calls of streams run concurrently: tokens are only added and popped, next() on count is atomic
+		self.stream_dict = {}
+		self.stream_counter = count(1)
+
+		# Tokens of memory allocated by other side during calls per thread (client side)
+		self.stream_local = local()
+
+		# Memory segments of this size in bytes and larger are streamed, 0 is off
+		self.stream_threshold = stream_threshold
+		self.stream_chunk_size = stream_chunk_size
+
+		# Functions of Python modules on Wine side (server side): (module id, name) -> function
+		self.python_function_dict = {}
@@ -34,8 +34,10 @@ specific language governing rights and limitations under the License.
 import ctypes
 from pprint import pformat as pf
 import traceback
+import weakref
 
 from ..const import (
+	CALLBACK_CACHE_SIZE,
 	FLAG_POINTER,
 	GROUP_VOID,
 	GROUP_FUNDAMENTAL,
@@ -44,7 +46,13 @@ from ..const import (
 	)
 from ..callback_client import callback_translator_client_class
 from ..callback_server import callback_translator_server_class
-from .memory import is_null_pointer
+from .memory import is_null_pointer, WCHAR_CODECS
+from .mem_contents import WCHAR_BYTES
+from .remote import remote_pointer_class
+
+
+# ctypes objects support the buffer protocol, they are passed as they are
+CTYPES_BUFFER_TYPES = (ctypes.Array, ctypes.Structure, ctypes.Union, ctypes._Pointer, ctypes._SimpleCData)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -69,6 +77,39 @@ class arguments_contents_class():
 			raise TypeError
 
 
+	def arg_list_wrap_buffers(self, args_tuple, argtypes_list, buffer_list):
+		"""
+		Objects supporting the buffer protocol (bytearray, array.array, NumPy arrays etc.)
+		are replaced by ctypes arrays sharing their memory, so results are written back in place.
+		Read-only objects are copied.
+		"""
+
+		args_list = None
+
+		for index in buffer_list:
+
+			# Number of arguments is wrong, handled by packing
+			if index >= len(args_tuple):
+				break
+
+			arg = args_tuple[index]
+
+			# Anything ctypes handles on its own, bytes and str are immutable C strings
+			if arg is None or isinstance(arg, (bytes, str, int, float) + CTYPES_BUFFER_TYPES):
+				continue
+
+			try:
+				view = memoryview(arg)
+			except TypeError:
+				continue # e.g. byref, remote buffers
+
+			if args_list is None:
+				args_list = list(args_tuple)
+			args_list[index] = self.__wrap_buffer__(view, argtypes_list[index])
+
+		return args_tuple if args_list is None else tuple(args_list)
+
+
 	def arg_list_unpack(self, args_package_list, argtypes_list):
 
 		# Everything is normal
@@ -84,6 +125,91 @@ class arguments_contents_class():
 			raise TypeError
 
 
+	def get_callback_name(self, func_ptr):
+
+		# Addresses of garbage collected callbacks may have been reused
+		self.__drop_callbacks__()
+
+		# None if callback has never been passed
+		return self.callback_name_dict.get(self.__get_callback_key__(func_ptr), None)
+
+
+	def release_callback(self, func_ptr):
+
+		with self.callback_lock:
+
+			func_name = self.get_callback_name(func_ptr)
+
+			# Callback has never been passed or has been released before
+			if func_name is None:
+				return
+
+			# Detach finalizer (runs only once) if there is one, passing it again registers it under a new name
+			finalizer = self.callback_dict[func_name][1]
+			if finalizer is not None:
+				finalizer.detach()
+			self.__drop_callback__(func_name)
+
+		# Release on server immediately
+		self.__release_callbacks__()
+
+
+	def release_callbacks_on_server(self, func_name_list):
+
+		for func_name in func_name_list:
+
+			# Drop translator and native callback
+			self.cache_dict['func_translator'].pop(func_name, None)
+			self.cache_dict['func_handle'].pop(func_name, None)
+
+			# Handles of callback on client side are invalid
+			self.callback_client.forget(func_name)
+			self.callback_client.forget(func_name + '_prefetch')
+
+		# Number of callbacks still alive
+		return len(self.cache_dict['func_translator'])
+
+
+	def __drop_callback__(self, func_name):
+
+		# Function pointer is gone (or released), nothing left of it on this side (callback lock held)
+		self.callback_name_dict.pop(self.callback_dict.pop(func_name)[2], None)
+		self.callback_lru.pop(func_name, None)
+		self.callback_server.unregister_function(func_name)
+		self.callback_server.unregister_function(func_name + '_prefetch')
+
+		# Server side is notified later, this may run in the middle of an RPC
+		self.callback_release_list.append(func_name)
+
+
+	def __drop_callbacks__(self):
+
+		# Nothing was garbage collected
+		if len(self.callback_dropped_queue) == 0:
+			return
+
+		with self.callback_lock:
+			while len(self.callback_dropped_queue) > 0:
+				self.__drop_callback__(self.callback_dropped_queue.popleft())
+
+
+	def __get_callback_key__(self, func_ptr):
+
+		# Address of native code, identical for all function pointer objects of one callback
+		return (ctypes.cast(func_ptr, ctypes.c_void_p).value, id(type(func_ptr)))
+
+
+	def __release_callbacks__(self):
+
+		# Drop callbacks garbage collected meanwhile
+		self.__drop_callbacks__()
+
+		# Names of callbacks, which are gone, are sent in one go
+		with self.callback_lock:
+			func_name_list, self.callback_release_list = self.callback_release_list, []
+		self.callback_client.release_callbacks(func_name_list)
+
+
 	def return_msg_pack(self, return_value, returntype_dict):
 
 		if return_value is None:
@@ -118,6 +244,33 @@ class arguments_contents_class():
 				)
 
 
+	def arg_list_local_indices(self, mutable_list, arg_message_list):
+
+		# No remote buffers around, nothing to filter
+		if self.remote_references == 0:
+			return mutable_list
+
+		# Remote buffers stay where they are, they are neither sent back nor synced
+		return [index for index in mutable_list if not isinstance(arg_message_list[index][1], dict)]
+
+
+	def arg_list_pack_mutable(self, args_list, argtypes_list, mutable_list):
+
+		# Only pack arguments, which can have been changed by call
+		return [self.__pack_item__(args_list[index], argtypes_list[index]) for index in mutable_list]
+
+
+	def arg_list_sync_mutable(self, old_arguments_list, args_package_list, argtypes_list, mutable_list):
+
+		# Step through arguments, which can have been changed by call
+		for index, arg_raw in zip(mutable_list, args_package_list):
+			self.__sync_item__(
+				old_arguments_list[index],
+				self.__unpack_item__(arg_raw, argtypes_list[index]),
+				argtypes_list[index]
+				)
+
+
 	def __item_pointer_strip__(self, arg_in):
 
 		# Handle pointer object
@@ -141,9 +294,17 @@ class arguments_contents_class():
 
 	def __pack_item__(self, arg_in, arg_def_dict):
 
+		# Remote buffers are passed by reference only
+		if isinstance(arg_in, remote_pointer_class):
+			return arg_in.__get_remote_pointer__()
+
 		# Grep the simple case first, scalars
 		if arg_def_dict['s']:
 
+			# Buffers (mutable) travel with their entire contents, in a list, Unicode as str
+			if arg_def_dict['b'] and isinstance(arg_in, ctypes.Array):
+				return [arg_in[:] if arg_in._type_ is ctypes.c_wchar else bytes(arg_in)]
+
 			# Strip away the pointers ... (all flags are pointers in this case)
 			for flag in arg_def_dict['f']:
 				if flag != FLAG_POINTER:
@@ -219,28 +380,68 @@ class arguments_contents_class():
 		if self.is_server:
 			return None
 
-		# Use memory address of function pointer as unique name/ID
-		func_name = 'func_%x' % id(func_ptr)
+		# Callbacks garbage collected meanwhile are dropped first, their addresses may have been reused
+		self.__drop_callbacks__()
 
-		# Has callback translator been built before?
-		if func_name in self.cache_dict['func_handle'].keys():
+		# Callbacks, which are gone, are released on server before new ones are added
+		if len(self.callback_release_list) > 0:
+			self.__release_callbacks__()
+
+		with self.callback_lock:
+
+			# Has callback translator been built before?
+			func_name = self.callback_name_dict.get(self.__get_callback_key__(func_ptr), None)
+			if func_name is not None:
 
-			# Just return its name
-			return func_name
+				# Keep order of callbacks, which can not be tracked
+				if func_name in self.callback_lru:
+					self.callback_lru.move_to_end(func_name)
 
-		# Generate and store callback translator in cache
-		self.cache_dict['func_handle'][func_name] = callback_translator_client_class(
-			self, func_name, func_ptr, func_def_dict['_argtypes_'], func_def_dict['_restype_'],
+				# Just return its name
+				return func_name
+
+			# Return name of new callback entry
+			return self.__register_callback__(func_ptr, func_def_dict)
+
+
+	def __register_callback__(self, func_ptr, func_def_dict):
+
+		# Unique name/ID, never reused (unlike memory addresses)
+		self.callback_counter += 1
+		func_name = 'func_%x' % self.callback_counter
+
+		# Function pointers from fields of structures etc. are temporary objects, callback can not be tracked
+		tracked = func_ptr._b_base_ is None
+
+		# Generate callback translator, must not keep tracked function pointer alive
+		translator = callback_translator_client_class(
+			self, func_name, weakref.proxy(func_ptr) if tracked else func_ptr,
+			func_def_dict['_argtypes_'], func_def_dict['_restype_'],
 			self.unpack_definition_memsync(func_def_dict['_memsync_'])
 			)
 
+		# Store translator, queue it for dropping once function pointer is garbage collected (any thread) ...
+		if tracked:
+			finalizer = weakref.finalize(func_ptr, self.callback_dropped_queue.append, func_name)
+			finalizer.atexit = False
+		else:
+			finalizer = None
+		self.callback_dict[func_name] = [translator, finalizer, self.__get_callback_key__(func_ptr)]
+		self.callback_name_dict[self.callback_dict[func_name][2]] = func_name
+
+		# ... or drop it once there are too many, which can not be tracked (they are kept alive until then)
+		if not tracked:
+			self.callback_lru[func_name] = None
+			if len(self.callback_lru) > CALLBACK_CACHE_SIZE:
+				self.__drop_callback__(next(iter(self.callback_lru)))
+
 		# Register translator at RPC server
-		self.callback_server.register_function(
-			self.cache_dict['func_handle'][func_name],
-			public_name = func_name
-			)
+		self.callback_server.register_function(translator, public_name = func_name)
+
+		# Register prefetch protocol if requested
+		if func_def_dict.get('_prefetch_', 0) > 0:
+			self.callback_server.register_function(translator.call_block, public_name = func_name + '_prefetch')
 
-		# Return name of callback entry
 		return func_name
 
 
@@ -261,6 +462,10 @@ class arguments_contents_class():
 			if arg_def_dict['g'] == GROUP_VOID:
 				return
 
+			# String buffers are overwritten in place
+			if arg_def_dict['b'] and isinstance(old_arg, ctypes.Array):
+				return self.__sync_item_buffer__(old_arg, new_arg)
+
 			# Strip away the pointers ... (all flags are pointers in this case)
 			for flag in arg_def_dict['f']:
 				if flag != FLAG_POINTER:
@@ -325,6 +530,23 @@ class arguments_contents_class():
 				raise # TODO
 
 
+	def __sync_item_buffer__(self, old_buffer, new_buffer):
+
+		# Raw memory, old buffer may share memory with another object (buffer protocol)
+		if old_buffer._type_ is not ctypes.c_wchar:
+			ctypes.memmove(old_buffer, new_buffer, min(ctypes.sizeof(old_buffer), ctypes.sizeof(new_buffer)))
+			return
+
+		value = new_buffer[:]
+		length = len(old_buffer)
+
+		# Number of characters can differ if wchar_t differs in size, fit into old buffer
+		if len(value) != length:
+			value = value[:length] + '\0' * (length - len(value[:length]))
+
+		old_buffer[:] = value
+
+
 	def __sync_item_struct__(self, old_struct, new_struct, struct_def_dict):
 
 		# Step through arguments
@@ -337,13 +559,42 @@ class arguments_contents_class():
 				)
 
 
+	def __wrap_buffer__(self, view, arg_def_dict):
+
+		# Element type: Fundamental type of C string, pointer or array, bytes for void pointers (memsync)
+		if arg_def_dict['g'] == GROUP_FUNDAMENTAL:
+			datatype = getattr(ctypes, {'c_char_p': 'c_char', 'c_wchar_p': 'c_wchar'}.get(
+				arg_def_dict['t'], arg_def_dict['t']
+				))
+		else:
+			datatype = ctypes.c_ubyte
+
+		# Arrays have a fixed shape, everything else gets its length from the buffer
+		if arg_def_dict['g'] == GROUP_FUNDAMENTAL and not arg_def_dict['s']:
+			datatype = self.__unpack_definition_flags__(datatype, [flag for flag in arg_def_dict['f'] if flag > 0])
+		else:
+			datatype = datatype * (view.nbytes // ctypes.sizeof(datatype))
+
+		try:
+			return datatype.from_buffer(view)
+		except TypeError:
+			return datatype.from_buffer_copy(view) # read-only
+
+
 	def __unpack_item__(self, arg_raw, arg_def_dict):
 
+		# Remote buffers are local on this side
+		if isinstance(arg_raw, dict):
+			return self.__unpack_item_remote__(arg_raw, arg_def_dict)
+
 		# Again the simple case first, scalars of any kind
 		if arg_def_dict['s']:
 
+			# Handle buffers
+			if arg_def_dict['b'] and isinstance(arg_raw, list):
+				return self.__unpack_item_buffer__(arg_raw[0], arg_def_dict)
 			# Handle fundamental types
-			if arg_def_dict['g'] == GROUP_FUNDAMENTAL:
+			elif arg_def_dict['g'] == GROUP_FUNDAMENTAL:
 				arg_rebuilt = getattr(ctypes, arg_def_dict['t'])(arg_raw)
 			# Handle structs
 			elif arg_def_dict['g'] == GROUP_STRUCT:
@@ -373,6 +624,29 @@ class arguments_contents_class():
 			return self.__unpack_item_array__(arg_raw, arg_def_dict)[1]
 
 
+	def __unpack_item_buffer__(self, value, arg_def_dict):
+
+		# Unicode
+		if isinstance(value, str):
+			# Characters outside of the BMP take two units if wchar_t is UTF-16
+			if WCHAR_BYTES == 4:
+				length = len(value)
+			else:
+				length = len(value.encode(WCHAR_CODECS[WCHAR_BYTES], 'surrogatepass')) // WCHAR_BYTES
+			buffer = (ctypes.c_wchar * length)()
+			buffer.value = value
+			return buffer
+
+		# Bytes for char
+		if arg_def_dict['t'] in ('c_char', 'c_char_p'):
+			return ctypes.create_string_buffer(value, len(value))
+
+		# Array of fundamental type
+		datatype = getattr(ctypes, arg_def_dict['t'])
+		length = len(value) // ctypes.sizeof(datatype)
+		return (datatype * length).from_buffer_copy(value[:length * ctypes.sizeof(datatype)])
+
+
 	def __unpack_item_array__(self, arg_in, arg_def_dict, flag_index = 0):
 
 		# Extract the flag
@@ -442,13 +716,18 @@ class arguments_contents_class():
 			# Just return handle
 			return self.cache_dict['func_handle'][func_name]
 
-		# Generate, decorate and store callback translator in cache
+		# Generate and store callback translator
+		self.cache_dict['func_translator'][func_name] = callback_translator_server_class(
+			self, func_name, getattr(self.callback_client, func_name),
+			func_def_dict['_argtypes_'], func_def_dict['_restype_'],
+			self.unpack_definition_memsync(func_def_dict['_memsync_']),
+			func_def_dict.get('_memoize_', 0),
+			func_def_dict.get('_prefetch_', 0), getattr(self.callback_client, func_name + '_prefetch')
+			)
+
+		# Decorate and store callback translator in cache
 		self.cache_dict['func_handle'][func_name] = func_def_dict['_factory_type_'](
-			callback_translator_server_class(
-				self, func_name, getattr(self.callback_client, func_name),
-				func_def_dict['_argtypes_'], func_def_dict['_restype_'],
-				self.unpack_definition_memsync(func_def_dict['_memsync_'])
-				)
+			self.cache_dict['func_translator'][func_name]
 			)
 
 		# Return name of callback entry
@@ -74,13 +74,87 @@ class arguments_definition_class():
 				_argtypes_ = argtypes
 				_restype_ = restype
 				memsync = self.unpack_definition_memsync(_memsync_)
+				memoize = 0 # maximum number of memoized results on Wine side, 0 is off
+				prefetch = 0 # number of results prefetched in one go by Wine side, 0 is off
 				_flags_ = flags
 
+				def __init__(self, *args):
+
+					# Keep Python function, allows calls without ctypes swallowing errors
+					if len(args) == 1 and callable(args[0]):
+						self._function_ = args[0]
+
 			# Store the new type and return
 			self.cache_dict['func_type'][func_type_key][(restype, argtypes, flags)] = FunctionType
 			return FunctionType
 
 
+	def get_buffer_definition_indices(self, argtypes_d):
+		"""
+		Indices of arguments, which can be passed objects supporting the buffer protocol:
+		C strings, pointers to fundamental types, arrays of fundamental types and
+		void pointers (memsync).
+		"""
+
+		return [
+			index for index, arg_d in enumerate(argtypes_d)
+			if arg_d['b'] or arg_d['g'] == GROUP_VOID or (arg_d['g'] == GROUP_FUNDAMENTAL and not arg_d['s'])
+			]
+
+
+	def get_mutable_definition_indices(self, argtypes_d):
+		"""
+		Indices of arguments, which can be changed by a call and must be synced:
+		Pointers, arrays, structures containing pointers and C strings (string buffers).
+		Everything else is passed by value, void pointers are handled by memsync.
+		"""
+
+		return [
+			index for index, arg_d in enumerate(argtypes_d)
+			if arg_d['g'] != GROUP_VOID and (
+				arg_d['p'] or not arg_d['s'] or arg_d['b'] or self.__has_pointer_definition__(arg_d)
+				)
+			]
+
+
+	def get_struct_type_name(self, datatype):
+
+		# Struct has been registered before
+		type_name = self.cache_dict['struct_name'].get(datatype, None)
+		if type_name is not None:
+			return type_name
+
+		# Names are never reused, server keeps struct types by name (also after they are gone here)
+		type_name = datatype.__name__
+		while type_name in self.cache_dict['struct_name_used']:
+			type_name = '%s_%x' % (datatype.__name__, len(self.cache_dict['struct_name_used']))
+		self.cache_dict['struct_name_used'].add(type_name)
+
+		# Keep track of datatype on client side, must not keep it alive
+		self.cache_dict['struct_name'][datatype] = type_name
+		self.cache_dict['struct_type'][type_name] = datatype
+
+		return type_name
+
+
+	def is_scalar_definition(self, argtypes_d, restype_d, memsync_d):
+		"""
+		True if all arguments and the return value are fundamental types passed
+		by value and there is no memory to sync, i.e. nothing can change in place.
+		"""
+
+		if len(memsync_d) > 0:
+			return False
+
+		# Arguments: Fundamental, no pointers, no arrays
+		for arg_d in argtypes_d:
+			if arg_d['g'] != GROUP_FUNDAMENTAL or len(arg_d['f']) > 0:
+				return False
+
+		# Return value: Fundamental or void, no pointers, no arrays
+		return restype_d['g'] in (GROUP_VOID, GROUP_FUNDAMENTAL) and len(restype_d['f']) == 0
+
+
 	def pack_definition_argtypes(self, argtypes):
 
 		return [self.__pack_definition_dict__(arg) for arg in argtypes]
@@ -162,6 +236,20 @@ class arguments_definition_class():
 			)
 
 
+	def __has_pointer_definition__(self, datatype_d):
+
+		if datatype_d['g'] == GROUP_VOID:
+			return False
+
+		if datatype_d['p']:
+			return True
+
+		if datatype_d['g'] == GROUP_STRUCT:
+			return any(self.__has_pointer_definition__(field_d) for field_d in datatype_d['_fields_'])
+
+		return False
+
+
 	def __pack_definition_dict__(self, datatype, field_name = None):
 
 		# Not all datatypes have a name, let's handle that
@@ -213,6 +301,12 @@ class arguments_definition_class():
 		# Flag elements containing pointers
 		flag_pointer = len([flag for flag in flag_list if flag == FLAG_POINTER]) != 0
 
+		# Flag C strings and pointers to (non-pointer) fundamental types, which can be passed buffers
+		flag_buffer = group_name == 'PyCSimpleType' and (
+			(type_name in ('c_char_p', 'c_wchar_p') and len(flag_list) == 0) or
+			(type_name not in ('c_char_p', 'c_wchar_p', 'c_void_p') and flag_list == [FLAG_POINTER])
+			)
+
 		# Fundamental ('simple') C types
 		if group_name == 'PyCSimpleType':
 
@@ -221,6 +315,7 @@ class arguments_definition_class():
 				's': flag_scalar,
 				'd': flag_array_depth,
 				'p': flag_pointer,
+				'b': flag_buffer,
 				'n': field_name, # kw
 				't': type_name, # Type name, such as 'c_int'
 				'g': GROUP_FUNDAMENTAL
@@ -229,42 +324,42 @@ class arguments_definition_class():
 		# Structs
 		elif group_name == 'PyCStructType':
 
-			# Keep track of datatype on client side
-			if type_name not in self.cache_dict['struct_type'].keys():
-				self.cache_dict['struct_type'][type_name] = datatype
-
-			# TODO: For speed, cache packed struct definitions for known structs
+			# Keep track of datatype on client side, unique name
+			type_name = self.get_struct_type_name(datatype)
 
 			return {
 				'f': flag_list,
 				's': flag_scalar,
 				'd': flag_array_depth,
 				'p': flag_pointer,
+				'b': flag_buffer,
 				'n': field_name, # kw
 				't': type_name, # Type name, such as 'c_int'
 				'g': GROUP_STRUCT,
-				'_fields_': [
-					self.__pack_definition_dict__(field[1], field[0]) for field in datatype._fields_
-					]
+				'_fields_': self.__get_packed_definition__(datatype, self.__pack_definition_struct_fields__)
 				}
 
 		# Function pointers
 		elif group_name == 'PyCFuncPtrType':
 
-			# TODO: For speed, cache packed function definitions for known functions
+			# Parts of definition, which do not depend on use of datatype
+			func_def_dict = self.__get_packed_definition__(datatype, self.__pack_definition_function__)
 
 			return {
 				'f': flag_list,
 				's': flag_scalar,
 				'd': flag_array_depth,
 				'p': flag_pointer,
+				'b': flag_buffer,
 				'n': field_name, # kw
-				't': (datatype._restype_, datatype._argtypes_, datatype._flags_).__hash__(),
+				't': func_def_dict['t'],
 				'g': GROUP_FUNCTION,
-				'_argtypes_': self.pack_definition_argtypes(datatype._argtypes_),
-				'_restype_': self.pack_definition_returntype(datatype._restype_),
-				'_memsync_': self.pack_definition_memsync(datatype.memsync),
-				'_flags_': datatype._flags_
+				'_argtypes_': func_def_dict['_argtypes_'],
+				'_restype_': func_def_dict['_restype_'],
+				'_memsync_': self.pack_definition_memsync(datatype.memsync), # can be changed by user any time
+				'_memoize_': getattr(datatype, 'memoize', 0), # can be changed by user any time
+				'_prefetch_': getattr(datatype, 'prefetch', 0), # can be changed by user any time
+				'_flags_': func_def_dict['_flags_']
 				}
 
 		# UNKNOWN stuff, likely pointers - handled without datatype
@@ -275,12 +370,47 @@ class arguments_definition_class():
 				's': flag_scalar,
 				'd': flag_array_depth,
 				'p': flag_pointer,
+				'b': flag_buffer,
 				'n': field_name, # kw
 				't': type_name, # Type name, such as 'c_int'
 				'g': GROUP_VOID # Let's try void
 				}
 
 
+	def __get_packed_definition__(self, datatype, pack_func):
+		"""
+		Packed definitions are shared by all routines using a datatype. They must
+		therefore never be modified after packing (see memsync).
+		"""
+
+		# Look for known datatype (weak reference, dynamically generated types can be collected)
+		packed_definition = self.cache_dict['packed_definition'].get(datatype, None)
+
+		# Pack definition of unknown datatype and remember it
+		if packed_definition is None:
+			packed_definition = pack_func(datatype)
+			self.cache_dict['packed_definition'][datatype] = packed_definition
+
+		return packed_definition
+
+
+	def __pack_definition_function__(self, datatype):
+
+		return {
+			't': (datatype._restype_, datatype._argtypes_, datatype._flags_).__hash__(),
+			'_argtypes_': self.pack_definition_argtypes(datatype._argtypes_),
+			'_restype_': self.pack_definition_returntype(datatype._restype_),
+			'_flags_': datatype._flags_
+			}
+
+
+	def __pack_definition_struct_fields__(self, datatype):
+
+		return [
+			self.__pack_definition_dict__(field[1], field[0]) for field in datatype._fields_
+			]
+
+
 	def __unpack_definition_dict__(self, datatype_d_dict):
 
 		# Handle fundamental C datatypes (PyCSimpleType)
@@ -37,11 +37,13 @@ from pprint import pformat as pf
 
 from ..const import GROUP_VOID
 from .memory import (
+	convert_wchar_bytes,
 	generate_pointer_from_bytes,
 	is_null_pointer,
 	overwrite_pointer_with_bytes,
 	serialize_pointer_into_bytes
 	)
+from .remote import remote_pointer_class
 
 WCHAR_BYTES = ctypes.sizeof(ctypes.c_wchar)
 
@@ -64,12 +66,15 @@ class memory_contents_class():
 			# HACK make memory sync pointers type agnostic
 			arg_type['g'] = GROUP_VOID
 			arg_type['t'] = None # no type string
+			arg_type['b'] = False # no string buffer
 
 
 	def client_pack_memory_list(self, args_tuple, memsync_d_list):
 
-		# Pack data for every pointer, append data to package
-		return [self.__pack_memory_item__(memsync_d, args_tuple) for memsync_d in memsync_d_list]
+		# Pack data for every pointer, append data to package (Unix side streams large memory)
+		return [
+			self.__pack_memory_item__(memsync_d, args_tuple, stream = not self.is_server) for memsync_d in memsync_d_list
+			]
 
 
 	def client_unpack_memory_list(self, args_list, return_value, mem_package_list, memsync_d_list):
@@ -77,6 +82,10 @@ class memory_contents_class():
 		# Iterate over memory package dicts
 		for memory_d, memsync_d in zip(mem_package_list, memsync_d_list):
 
+			# Remote buffer, nothing to sync
+			if memory_d.get('r', False):
+				continue
+
 			# If memory for pointer has been allocated by remote side
 			if memory_d['_a'] is None:
 
@@ -95,10 +104,20 @@ class memory_contents_class():
 		# Iterate through pointers and serialize them
 		for memory_d, memsync_d in zip(mem_package_list, memsync_d_list):
 
-			# If memory for pointer was allocated here on server side
+			# Remote buffer, nothing to sync
+			if memory_d.get('r', False):
+				continue
+
+			# If memory for pointer was allocated here on server side (Wine side streams large memory)
 			if memory_d['a'] is None:
 
-				memory_d.update(self.__pack_memory_item__(memsync_d, args_list, return_value))
+				memory_d.update(self.__pack_memory_item__(memsync_d, args_list, return_value, stream = self.is_server))
+
+			# If pointer pointed to streamed data on client side
+			elif 's' in memory_d.keys():
+
+				# Write data back in chunks, nothing to serialize
+				self.__stream_push__(memory_d['s'], memory_d['a'], memory_d['l'])
 
 			# If pointer pointed to data on client side
 			else:
@@ -108,12 +127,31 @@ class memory_contents_class():
 					ctypes.c_void_p(memory_d['a']), memory_d['l']
 					)
 
+			# Call is over, buffer can be reused
+			if '_p' in memory_d.keys():
+				self.memory_pool.release(memory_d.pop('_p'))
+
+			# Call is over, streamed buffer is dropped
+			memory_d.pop('_s', None)
+
+
+	def server_discard_memory_list(self, mem_package_list):
+
+		# Call failed, buffers are dropped (not reused) - MUST WORK WITH PICKLE afterwards
+		for memory_d in mem_package_list:
+			memory_d.pop('_p', None)
+			memory_d.pop('_s', None)
+
 
 	def server_unpack_memory_list(self, args_tuple, arg_memory_list, memsync_d_list):
 
 		# Iterate over memory segments, which must be kept in sync
 		for memory_d, memsync_d in zip(arg_memory_list, memsync_d_list):
 
+			# Remote buffer, already unpacked as argument
+			if memory_d.get('r', False):
+				continue
+
 			# Is this a null pointer?
 			if memory_d['a'] is None:
 
@@ -122,8 +160,8 @@ class memory_contents_class():
 
 			else:
 
-				# Unpack one memory section / item
-				self.__unpack_memory_item_data__(memory_d, memsync_d, args_tuple)
+				# Unpack one memory section / item, memory is only used during call
+				self.__unpack_memory_item_data__(memory_d, memsync_d, args_tuple, pool = True)
 
 
 	def __adjust_wchar_length__(self, memory_d):
@@ -134,58 +172,21 @@ class memory_contents_class():
 		if old_len == new_len:
 			return
 
-		tmp = bytearray(memory_d['l'] * new_len // old_len)
-
-		for index in range(old_len if new_len > old_len else new_len):
-			tmp[index::new_len] = memory_d['d'][index::old_len]
-
-		memory_d['d'] = bytes(tmp)
-		memory_d['l'] = len(memory_d['d'])
-		memory_d['w'] = WCHAR_BYTES
-
-
-	def __get_argument_by_memsync_path__(self, memsync_path, args_tuple, return_value = None):
-
-		# Reference args_tuple as initial value
-		element = args_tuple
-
-		# Step through path
-		for element_index, path_element in enumerate(memsync_path):
-
-			# Element is an int
-			if isinstance(path_element, int):
-
-				# Pointer to pointer (in top-level arguments) for memory allocation by DLL
-				if path_element < 0:
-					element = self.__item_pointer_strip__(element)
+		data = convert_wchar_bytes(memory_d['d'], old_len, new_len)
 
-				# Dive into argument tuple
-				else:
-					element = element[path_element]
+		# Back on the side, which sent the data: Fit into its memory (number of characters may differ)
+		length = memory_d.get('_l', None)
+		if length is not None and len(data) > length:
+			data = data[:length]
+		elif length is not None and len(data) < length:
+			data += bytes(length - len(data))
 
-			# Element equals 'r' and index 0: Return value
-			elif isinstance(path_element, str) and element_index == 0:
+		# Remember length of memory on other side for way back
+		memory_d['_l'] = memory_d['l']
 
-				if path_element != 'r':
-					raise ValueError()
-
-				element = return_value
-
-				if element is None:
-					return None
-
-			# Field name in struct
-			elif isinstance(path_element, str) and element_index > 0:
-
-				element = getattr(self.__item_pointer_strip__(element), path_element)
-
-			# TODO elements of arrays
-			else:
-
-				print(path_element)
-				raise # TODO
-
-		return element
+		memory_d['d'] = data
+		memory_d['l'] = len(data)
+		memory_d['w'] = WCHAR_BYTES
 
 
 	def __get_argument_type_by_memsync_path__(self, memsync_path, argtypes_d, restype_d):
@@ -204,8 +205,13 @@ class memory_contents_class():
 			if isinstance(path_element, int):
 				if path_element < 0:
 					continue
+			# Field definitions are shared through cache of packed definitions, copy along path
+			fields = list(arg_type['_fields_'])
+			field_index = [field['n'] for field in fields].index(path_element)
+			fields[field_index] = dict(fields[field_index])
+			arg_type['_fields_'] = fields
 			# Go deeper ...
-			arg_type = {field['n']: field for field in arg_type['_fields_']}[path_element]
+			arg_type = fields[field_index]
 
 		return arg_type
 
@@ -222,30 +228,14 @@ class memory_contents_class():
 		return len(ctypes.cast(in_pointer, datatype_p).value) * ctypes.sizeof(datatype)
 
 
-	def __get_number_of_elements__(self, memsync_d, args_tuple, return_value = None):
-
-		# There is no function defining the length?
-		if '_f' not in memsync_d.keys():
-
-			# Search for length
-			length = self.__get_argument_by_memsync_path__(memsync_d['l'], args_tuple, return_value)
-
-			# Length might come from ctypes or a Python datatype
-			return getattr(length, 'value', length)
-
-		# Make sure length can be computed from a tuple of arguments
-		assert isinstance(memsync_d['l'], tuple)
-
-		# Compute length from arguments and return
-		return memsync_d['_f'](*(
-			self.__get_argument_by_memsync_path__(item, args_tuple, return_value) for item in memsync_d['l']
-			))
-
-
-	def __pack_memory_item__(self, memsync_d, args_tuple, return_value = None):
+	def __pack_memory_item__(self, memsync_d, args_tuple, return_value = None, stream = False):
 
 		# Search for pointer
-		pointer = self.__get_argument_by_memsync_path__(memsync_d['p'], args_tuple, return_value)
+		pointer = memsync_d['_get_pointer'](args_tuple, return_value)
+
+		# Remote buffer, memory is already on the other side
+		if isinstance(pointer, remote_pointer_class):
+			return {'d': b'', 'l': 0, 'a': None, '_a': None, 'w': None, 'r': True}
 
 		# Convert argument into ctypes datatype TODO more checks needed!
 		if '_c' in memsync_d.keys():
@@ -269,7 +259,11 @@ class memory_contents_class():
 			length = self.__get_length_of_null_terminated_string__(pointer, bool(w))
 		else:
 			# Compute actual length
-			length = self.__get_number_of_elements__(memsync_d, args_tuple, return_value) * memsync_d['s']
+			length = memsync_d['_get_length'](args_tuple, return_value) * memsync_d['s']
+
+		# Large memory is streamed in chunks instead of being serialized
+		if stream and self.__is_stream_required__(length, w):
+			return self.__pack_memory_stream__(pointer, length, w)
 
 		return {
 			'd': serialize_pointer_into_bytes(pointer, length), # serialized data, '' if NULL pointer
@@ -288,20 +282,27 @@ class memory_contents_class():
 			})
 
 
-	def __unpack_memory_item_data__(self, memory_d, memsync_d, args_tuple, return_value = None):
+	def __unpack_memory_item_data__(self, memory_d, memsync_d, args_tuple, return_value = None, pool = False):
 
 		# Swap local and remote memory addresses
 		self.__swap_memory_addresses__(memory_d)
 
 		# Search for pointer in passed arguments
-		pointer_arg = self.__get_argument_by_memsync_path__(memsync_d['p'][:-1], args_tuple, return_value)
+		pointer_arg = memsync_d['_get_parent'](args_tuple, return_value)
 
 		# Adjust Unicode wchar length
 		if memsync_d['w']:
 			self.__adjust_wchar_length__(memory_d)
 
-		# Generate pointer to passed data
-		pointer = generate_pointer_from_bytes(memory_d['d'])
+		# Generate pointer to passed data. Pooled buffers are returned after the call. Never
+		# pool pointers to pointers, the DLL may take over (e.g. reallocate) the memory.
+		if 's' in memory_d.keys():
+			pointer = self.__unpack_memory_stream__(memory_d, pool and -1 not in memsync_d['p'])
+		elif pool and -1 not in memsync_d['p']:
+			memory_d['_p'] = self.memory_pool.acquire(memory_d['d'])
+			pointer = ctypes.cast(memory_d['_p'], ctypes.c_void_p)
+		else:
+			pointer = generate_pointer_from_bytes(memory_d['d'])
 
 		# Is this an already existing pointer, which has to be given a new value?
 		if hasattr(pointer_arg, 'contents'):
@@ -309,6 +310,8 @@ class memory_contents_class():
 			if hasattr(pointer_arg.contents, 'value'):
 				# Is the pointer empty?
 				if pointer_arg.contents.value is None:
+					# DLL may take over memory, do not reuse it
+					memory_d.pop('_p', None)
 					# Overwrite the pointer's value
 					pointer_arg.contents.value = pointer.value
 					# Get out of here HACK
@@ -356,7 +359,7 @@ class memory_contents_class():
 			path_shift = 0
 
 		# Search for pointer in passed arguments
-		pointer_arg = self.__get_argument_by_memsync_path__(memsync_d['p'][:(-1 - path_shift)], args_tuple)
+		pointer_arg = memsync_d['_get_null_parent'](args_tuple)
 
 		# If we're in the top level arguments or an array ...
 		if isinstance(memsync_d['p'][-1 - path_shift], int):
@@ -373,6 +376,10 @@ class memory_contents_class():
 		# Swap local and remote memory addresses
 		self.__swap_memory_addresses__(memory_d)
 
+		# Streamed memory has been written by other side during call
+		if 's' in memory_d.keys():
+			return
+
 		# Adjust Unicode wchar length
 		if memsync_d['w']:
 			self.__adjust_wchar_length__(memory_d)
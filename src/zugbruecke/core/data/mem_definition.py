@@ -32,10 +32,25 @@ specific language governing rights and limitations under the License.
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 import ctypes
+from operator import attrgetter, itemgetter
 from pprint import pformat as pf
 #import traceback
 
 
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def strip_pointer(element):
+
+	# Same as __item_pointer_strip__, but dereferences pointer objects only once
+	contents = getattr(element, 'contents', None)
+	if contents is not None:
+		return contents
+	# Handle reference (byref) 'light pointer' or object, which was likely not provided as a pointer
+	return getattr(element, '_obj', element)
+
+
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # CLASS: Memory content packing and unpacking
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -56,7 +71,14 @@ class memory_definition_class():
 	def __pack_memsync_definition_dict__(self, memsync_d):
 
 		# Keep everything, which is not private (does not start with '_')
-		return {key: memsync_d[key] for key in memsync_d.keys() if not key.startswith('_')}
+		memsync_d_packed = {key: memsync_d[key] for key in memsync_d.keys() if not key.startswith('_')}
+
+		# Structs are referred to by name, pass definition along in case the other side does not know the name
+		if '_t' in memsync_d.keys() and issubclass(memsync_d['_t'], ctypes.Structure):
+			memsync_d_packed['d'] = self.__pack_definition_dict__(memsync_d['_t'])
+			memsync_d_packed['t'] = memsync_d_packed['d']['t']
+
+		return memsync_d_packed
 
 
 	def __unpack_memsync_definition_dict__(self, memsync_d):
@@ -76,7 +98,10 @@ class memory_definition_class():
 		# Get actual type class - if it is not a ctypes member, try struct cache
 		memsync_d['_t'] = getattr(ctypes, memsync_d['t'], None)
 		if memsync_d['_t'] is None:
-			memsync_d['_t'] = self.cache_dict['struct_type'][memsync_d['t']]
+			if 'd' in memsync_d.keys():
+				memsync_d['_t'] = self.__unpack_definition_struct_dict__(memsync_d['d'])
+			else:
+				memsync_d['_t'] = self.cache_dict['struct_type'][memsync_d['t']]
 
 		# Compute the size of type '_t'
 		memsync_d['s'] = ctypes.sizeof(memsync_d['_t'])
@@ -85,4 +110,101 @@ class memory_definition_class():
 		if 'w' not in memsync_d.keys():
 			memsync_d['w'] = False
 
+		# Compile accessors for pointer, its parent and length, paths are not parsed per call
+		memsync_d['_get_pointer'] = self.__compile_memsync_path__(memsync_d['p'])
+		memsync_d['_get_parent'] = self.__compile_memsync_path__(memsync_d['p'][:-1])
+		path_shift = 1 if memsync_d['p'][-1] == -1 else 0 # pointer to pointer
+		memsync_d['_get_null_parent'] = self.__compile_memsync_path__(memsync_d['p'][:(-1 - path_shift)])
+		if 'l' in memsync_d.keys():
+			memsync_d['_get_length'] = self.__compile_memsync_length__(memsync_d)
+
 		return memsync_d
+
+
+	def __compile_memsync_length__(self, memsync_d):
+
+		# There is no function defining the length?
+		if '_f' not in memsync_d.keys():
+
+			get_length = self.__compile_memsync_path__(memsync_d['l'])
+
+			def get_number_of_elements(args_tuple, return_value = None):
+				length = get_length(args_tuple, return_value)
+				# Length might come from ctypes or a Python datatype
+				return getattr(length, 'value', length)
+
+			return get_number_of_elements
+
+		# Make sure length can be computed from a tuple of arguments
+		assert isinstance(memsync_d['l'], tuple)
+
+		get_length_list = [self.__compile_memsync_path__(item) for item in memsync_d['l']]
+		length_func = memsync_d['_f']
+
+		def get_number_of_elements_by_func(args_tuple, return_value = None):
+			# Compute length from arguments and return
+			return length_func(*[get_length(args_tuple, return_value) for get_length in get_length_list])
+
+		return get_number_of_elements_by_func
+
+
+	def __compile_memsync_path__(self, memsync_path):
+
+		# Path may start at return value instead of argument tuple
+		is_return_value = len(memsync_path) > 0 and memsync_path[0] == 'r'
+
+		# Translate path into chain of getters
+		getter_list = []
+		for element_index, path_element in enumerate(memsync_path):
+
+			# Element is an int
+			if isinstance(path_element, int):
+
+				# Pointer to pointer (in top-level arguments) for memory allocation by DLL
+				if path_element < 0:
+					getter_list.append(strip_pointer)
+
+				# Dive into argument tuple
+				else:
+					getter_list.append(itemgetter(path_element))
+
+			# Element equals 'r' and index 0: Return value
+			elif isinstance(path_element, str) and element_index == 0:
+
+				if path_element != 'r':
+					raise ValueError('memsync path must start with an argument index or "r", not "%s"' % path_element)
+
+			# Field name in struct, there is a chance that it is behind a pointer
+			elif isinstance(path_element, str) and element_index > 0:
+
+				getter_list.append(strip_pointer)
+				getter_list.append(attrgetter(path_element))
+
+			# TODO elements of arrays
+			else:
+
+				raise ValueError('memsync path element "%s" is not supported' % str(path_element))
+
+		def get_element_from_return_value(args_tuple, return_value = None):
+			if return_value is None:
+				return None
+			element = return_value
+			for getter in getter_list:
+				element = getter(element)
+			return element
+
+		if is_return_value:
+			return get_element_from_return_value
+
+		# Top-level argument, most common case
+		if len(getter_list) == 1:
+			getter = getter_list[0]
+			return lambda args_tuple, return_value = None: getter(args_tuple)
+
+		def get_element_from_args(args_tuple, return_value = None):
+			element = args_tuple
+			for getter in getter_list:
+				element = getter(element)
+			return element
+
+		return get_element_from_args
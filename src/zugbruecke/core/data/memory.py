@@ -33,10 +33,33 @@ specific language governing rights and limitations under the License.
 import ctypes
 
 
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Encodings of wchar_t by size: Windows (UTF-16) and Unix (UTF-32)
+WCHAR_CODECS = {2: 'utf-16-le', 4: 'utf-32-le'}
+
+
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # ROUTINES
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+def convert_wchar_bytes(in_bytes, old_width, new_width):
+
+	# Transcode at once, surrogate pairs become single characters and vice versa, lone surrogates pass
+	try:
+		return in_bytes.decode(WCHAR_CODECS[old_width], 'surrogatepass').encode(WCHAR_CODECS[new_width], 'surrogatepass')
+	except UnicodeError:
+		pass
+
+	# Not valid Unicode (e.g. uninitialized memory): copy unit by unit, wider units are truncated
+	out_bytes = bytearray(len(in_bytes) // old_width * new_width)
+	for index in range(min(old_width, new_width)):
+		out_bytes[index::new_width] = in_bytes[index:len(in_bytes) // old_width * old_width:old_width]
+	return bytes(out_bytes)
+
+
 def generate_pointer_from_bytes(in_bytes):
 
 	return ctypes.cast(ctypes.pointer((ctypes.c_ubyte * len(in_bytes)).from_buffer_copy(in_bytes)), ctypes.c_void_p)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/data/pool.py: Pool of buffers for memory synchronized during calls
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import ctypes
+from threading import Lock
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Smallest size class in bytes
+SIZE_CLASS_MIN = 64
+
+# Size classes per doubling of size, limits unused space to 1/8 of a buffer
+SIZE_CLASS_STEPS = 8
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def get_size_class(length):
+
+	if length <= SIZE_CLASS_MIN:
+		return SIZE_CLASS_MIN
+
+	# Round up to next step between powers of two
+	step = (1 << (length - 1).bit_length()) // SIZE_CLASS_STEPS
+	return -(-length // step) * step
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS: Pool of buffers
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class memory_pool_class():
+	"""
+	Buffers are handed out for the duration of one call and returned afterwards.
+	Buffers, which would exceed the maximum retained size, are left to the garbage collector.
+	"""
+
+
+	def __init__(self, max_size):
+
+		# Maximum number of bytes retained, 0 is off
+		self.max_size = max_size
+
+		# Free buffers: size class -> list of buffers
+		self.buffer_dict = {}
+
+		# Number of bytes retained
+		self.size = 0
+
+		# Statistics
+		self.hits = 0
+		self.misses = 0
+
+		# Calls of streams acquire and release buffers concurrently
+		self.lock = Lock()
+
+
+	def acquire(self, data):
+
+		length = len(data)
+
+		# Pool is off, buffer of exact length
+		if self.max_size == 0:
+			return (ctypes.c_ubyte * length).from_buffer_copy(data)
+
+		size_class = get_size_class(length)
+
+		# Reuse buffer if there is one
+		with self.lock:
+			try:
+				buffer = self.buffer_dict[size_class].pop()
+			except (KeyError, IndexError):
+				buffer = None
+				self.misses += 1
+			else:
+				self.hits += 1
+				self.size -= size_class
+
+		# New buffers are zeroed
+		if buffer is None:
+			buffer = (ctypes.c_ubyte * size_class)()
+			ctypes.memmove(buffer, data, length)
+			return buffer
+
+		# Nothing of earlier calls must be visible beyond data, e.g. for null-terminated strings
+		ctypes.memmove(buffer, data, length)
+		ctypes.memset(ctypes.addressof(buffer) + length, 0, size_class - length)
+
+		return buffer
+
+
+	def clear(self):
+
+		with self.lock:
+			self.buffer_dict.clear()
+			self.size = 0
+
+
+	def get_statistics(self):
+
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'size': self.size,
+			'maxsize': self.max_size
+			}
+
+
+	def release(self, buffer):
+
+		size_class = len(buffer)
+
+		with self.lock:
+
+			# Pool is full or off
+			if self.size + size_class > self.max_size or self.max_size == 0:
+				return
+
+			self.buffer_dict.setdefault(size_class, []).append(buffer)
+			self.size += size_class
+
+
+	def set_max_size(self, max_size):
+
+		self.max_size = max_size
+
+		# Drop everything if pool is too large now
+		if self.size > self.max_size:
+			self.clear()
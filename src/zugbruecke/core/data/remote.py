@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/data/remote.py: Buffers residing on the Wine side across calls
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import ctypes
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS: Reference to remote buffer
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class remote_pointer_class(): # Stands in place of a pointer argument
+
+
+	def __init__(self, buffer_id):
+
+		self.buffer_id = buffer_id
+
+
+	def __get_remote_pointer__(self):
+
+		# Only a plain marker travels - MUST WORK WITH PICKLE without importing zugbruecke
+		return {'r': self.buffer_id}
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS: Remote buffer management (server side) and (un-) packing
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class remote_contents_class():
+
+
+	def remote_buffer_allocate(self, size):
+
+		# IDs are never reused
+		self.remote_buffer_counter += 1
+		buffer_id = self.remote_buffer_counter
+
+		# Buffer and its reference count
+		self.remote_buffer_dict[buffer_id] = [ctypes.create_string_buffer(size), 1]
+		self.remote_references += 1
+
+		return buffer_id
+
+
+	def remote_buffer_free(self, buffer_id):
+
+		entry = self.remote_buffer_dict[buffer_id]
+
+		# Release one reference, drop buffer if there is none left
+		entry[1] -= 1
+		self.remote_references -= 1
+		if entry[1] == 0:
+			del self.remote_buffer_dict[buffer_id]
+
+		return entry[1]
+
+
+	def remote_buffer_free_list(self, buffer_id_list):
+
+		# Buffers of garbage collected handles (client side) are released in one go
+		for buffer_id in buffer_id_list:
+			self.remote_buffer_free(buffer_id)
+
+
+	def remote_buffer_read(self, buffer_id, offset, length):
+
+		buffer = self.remote_buffer_dict[buffer_id][0]
+
+		if offset < 0 or length < 0 or offset + length > ctypes.sizeof(buffer):
+			raise ValueError('out of bounds of remote buffer')
+
+		return ctypes.string_at(ctypes.addressof(buffer) + offset, length)
+
+
+	def remote_buffer_release(self, rpc_client):
+
+		# Nothing was garbage collected (client side)
+		if len(self.remote_release_queue) == 0:
+			return
+
+		buffer_id_list = []
+		while len(self.remote_release_queue) > 0:
+			buffer_id_list.append(self.remote_release_queue.popleft())
+
+		# References are held until they have been released on server
+		self.remote_references -= len(buffer_id_list)
+		rpc_client.remote_buffer_free_list(buffer_id_list)
+
+
+	def remote_buffer_retain(self, buffer_id):
+
+		entry = self.remote_buffer_dict[buffer_id]
+
+		# Add one reference
+		entry[1] += 1
+		self.remote_references += 1
+
+		return entry[1]
+
+
+	def remote_buffer_write(self, buffer_id, offset, data):
+
+		buffer = self.remote_buffer_dict[buffer_id][0]
+
+		if offset < 0 or offset + len(data) > ctypes.sizeof(buffer):
+			raise ValueError('out of bounds of remote buffer')
+
+		ctypes.memmove(ctypes.addressof(buffer) + offset, data, len(data))
+
+
+	def __unpack_item_remote__(self, remote_marker, arg_def_dict):
+
+		# Function of Python module on this side, used as native callback
+		if 'm' in remote_marker.keys():
+			return self.__unpack_item_remote_function__(remote_marker, arg_def_dict)
+
+		# Not a buffer but a result of an earlier call in a pipeline, substituted later
+		if 'r' not in remote_marker.keys():
+			return None
+
+		address = ctypes.addressof(self.remote_buffer_dict[remote_marker['r']][0])
+
+		# Type of argument, void pointers if memsync'ed
+		datatype = self.__unpack_definition_dict__(arg_def_dict)
+
+		# Pointers point to buffer, everything else (arrays) lives in buffer
+		if issubclass(datatype, (ctypes._Pointer, ctypes.c_void_p, ctypes.c_char_p, ctypes.c_wchar_p)):
+			return ctypes.cast(address, datatype)
+		return datatype.from_address(address)
+
+
+	def __unpack_item_remote_function__(self, remote_marker, func_def_dict):
+
+		func_name = 'py_%s_%s_%x' % (remote_marker['m'], remote_marker['n'], id(func_def_dict['_factory_type_']))
+
+		# Has native callback been built before?
+		if func_name not in self.cache_dict['func_handle'].keys():
+			self.cache_dict['func_handle'][func_name] = func_def_dict['_factory_type_'](
+				self.python_function_dict[(remote_marker['m'], remote_marker['n'])]
+				)
+
+		return self.cache_dict['func_handle'][func_name]
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/data/stream.py: Streaming of large memory segments in chunks
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import ctypes
+from itertools import count
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS: Memory streamed in chunks during calls
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class stream_contents_class():
+	"""
+	Memory segments exceeding a threshold are not serialized. The Wine side reads and writes
+	them in chunks through the connection of the call, so only a few chunks are copied at a time.
+	"""
+
+
+	def client_begin_stream_call(self):
+
+		# Memory allocated by other side during this call (or nested calls in this thread) is listed after mark
+		if not hasattr(self.stream_local, 'allocated'):
+			self.stream_local.allocated = []
+		return len(self.stream_local.allocated)
+
+
+	def client_end_stream_call(self, mark):
+
+		# Memory allocated by other side, which has not been handed over (call failed), is dropped
+		allocated = self.stream_local.allocated
+		while len(allocated) > mark:
+			self.stream_dict.pop(allocated.pop(), None)
+
+
+	def client_close_memory_list(self, mem_package_list):
+
+		# Call is over, other side does not access local memory anymore
+		for memory_d in mem_package_list:
+			if 's' in memory_d.keys():
+				self.stream_dict.pop(memory_d['s'], None)
+
+
+	def memsync_stream_allocate(self, length):
+
+		# Memory allocated on other side (e.g. by DLL), handed over when unpacking
+		buffer = (ctypes.c_ubyte * length)()
+		token = self.__stream_open__(ctypes.addressof(buffer), length, buffer)
+
+		# Requested during a call in this thread (nested request), dropped after the call if not handed over
+		getattr(self.stream_local, 'allocated', []).append(token)
+
+		return token
+
+
+	def memsync_stream_read(self, token, offset, length):
+
+		address, size, _ = self.stream_dict[token]
+
+		if offset < 0 or length < 0 or offset + length > size:
+			raise ValueError('out of bounds of memory stream')
+
+		return ctypes.string_at(address + offset, length)
+
+
+	def memsync_stream_write(self, token, offset, data):
+
+		address, size, _ = self.stream_dict[token]
+
+		if offset < 0 or offset + len(data) > size:
+			raise ValueError('out of bounds of memory stream')
+
+		ctypes.memmove(address + offset, data, len(data))
+
+
+	def __is_stream_required__(self, length, w):
+
+		# Unicode strings are converted as a whole, 0 is off
+		return 0 < self.stream_threshold <= length and not w
+
+
+	def __pack_memory_stream__(self, pointer, length, w):
+
+		address = ctypes.cast(pointer, ctypes.c_void_p).value
+
+		# Wine side: memory allocated here (e.g. by DLL) is copied into memory allocated on other side
+		if self.is_server:
+			token = self.callback_client.memsync_stream_allocate(length)
+			self.__stream_push__(token, address, length)
+
+		# Unix side: other side reads and writes memory during call
+		else:
+			token = self.__stream_open__(address, length)
+
+		return {
+			'd': b'', # nothing serialized
+			'l': length,
+			'a': address,
+			'_a': None,
+			'w': w,
+			's': token # handle of stream on Unix side
+			}
+
+
+	def __stream_close__(self, token):
+
+		_, _, buffer = self.stream_dict.pop(token)
+
+		return buffer
+
+
+	def __stream_open__(self, address, length, buffer = None):
+
+		# Tokens are never reused
+		token = next(self.stream_counter)
+		self.stream_dict[token] = (address, length, buffer)
+
+		return token
+
+
+	def __stream_pull__(self, token, address, length):
+
+		# Copy memory from other side chunk by chunk
+		for offset in range(0, length, self.stream_chunk_size):
+			data = self.callback_client.memsync_stream_read(token, offset, min(self.stream_chunk_size, length - offset))
+			ctypes.memmove(address + offset, data, len(data))
+
+
+	def __stream_push__(self, token, address, length):
+
+		# Copy memory to other side chunk by chunk
+		for offset in range(0, length, self.stream_chunk_size):
+			self.callback_client.memsync_stream_write(
+				token, offset, ctypes.string_at(address + offset, min(self.stream_chunk_size, length - offset))
+				)
+
+
+	def __unpack_memory_stream__(self, memory_d, drop_after_call):
+
+		# Unix side: Memory has been allocated and written by other side
+		if not self.is_server:
+			return ctypes.cast(self.__stream_close__(memory_d['s']), ctypes.c_void_p)
+
+		# Wine side: Memory is read from other side
+		buffer = (ctypes.c_ubyte * memory_d['l'])()
+		self.__stream_pull__(memory_d['s'], ctypes.addressof(buffer), memory_d['l'])
+
+		# Keep the DLL's memory alive (cast) or free it right after the call, not with the next garbage collection
+		if not drop_after_call:
+			return ctypes.cast(buffer, ctypes.c_void_p)
+		memory_d['_s'] = buffer
+		return ctypes.c_void_p(ctypes.addressof(buffer))
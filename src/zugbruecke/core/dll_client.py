@@ -31,6 +31,8 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from .header import get_manifest_from_header
+from .manifest import manifest_class
 from .routine_client import routine_client_class
 
 
@@ -65,6 +67,9 @@ class dll_client_class(): # Representing one idividual dll to be called into, re
 		# Expose routine registration
 		self.__register_routine_on_server__ = getattr(self.rpc_client, self.hash_id + '_register_routine')
 
+		# Expose bulk registration and configuration of routines
+		self.__declare_routines_on_server__ = getattr(self.rpc_client, self.hash_id + '_declare_routines')
+
 		# Expose string reprentation of dll object
 		self.__get_repr__ = getattr(self.rpc_client, self.hash_id + '_repr')
 
@@ -115,6 +120,113 @@ class dll_client_class(): # Representing one idividual dll to be called into, re
 		return self.routines[name]
 
 
+	def declare(self, routines):
+		"""
+		Registers and configures many routines with one single RPC. Expects a dict:
+		{name: (argtypes, restype, memsync)}, restype and memsync are optional.
+		"""
+
+		# Log status
+		self.log.out('[dll-client] Declaring %d routines in DLL file "%s" ...' % (len(routines), self.name))
+
+		declared_routines, configuration_list = {}, []
+
+		for name, declaration in routines.items():
+
+			# Only if name is a string ...
+			if isinstance(name, str):
+
+				# Original ctypes does that
+				if name.startswith('__') and name.endswith('__'):
+					raise AttributeError(name)
+
+			if not isinstance(declaration, tuple) and not isinstance(declaration, list):
+				raise TypeError('declaration of routine "%s" must be a tuple' % str(name))
+			if not 1 <= len(declaration) <= 3:
+				raise ValueError('declaration of routine "%s" must have between 1 and 3 elements' % str(name))
+
+			# Reuse known routine or create new instance of routine_client (without server roundtrip)
+			routine = self.routines.get(name, None)
+			if routine is None:
+				routine = routine_client_class(self, name)
+
+			# Declaration (argtypes, restype, memsync), applied to routine only once the server accepted it
+			if not isinstance(declaration[0], list) and not isinstance(declaration[0], tuple):
+				raise TypeError # original ctypes does that
+			attributes = (
+				declaration[0],
+				declaration[1] if len(declaration) > 1 else routine.restype,
+				declaration[2] if len(declaration) > 2 else routine.memsync
+				)
+
+			# Pack definitions locally
+			configuration = routine.__pack_configuration__(*attributes)
+			configuration_list.append((name,) + configuration[:3])
+			declared_routines[name] = (routine, attributes, configuration[3])
+
+		self.__declare_configured_routines__(declared_routines, configuration_list)
+
+		# Log status
+		self.log.out('[dll-client] ... declared.')
+
+
+	def load_header(self, header_path):
+		"""
+		Generates a manifest from declarations found in a C header file, including
+		guessed memsync rules, and loads it. Generated manifests are cached.
+		Returns manifest object holding the types.
+		"""
+
+		manifest, skipped = get_manifest_from_header(header_path, self.session.p['dir'])
+
+		# Log declarations, which could not be translated
+		for statement, reason in skipped:
+			self.log.out('[dll-client] Skipped declaration in header (%s): %s' % (reason, statement))
+
+		return manifest_class(self, manifest)
+
+
+	def load_manifest(self, manifest):
+		"""
+		Declares routines, structures and callback types described by a manifest
+		(file name of JSON file or dict). Returns manifest object holding the types.
+		"""
+
+		return manifest_class(self, manifest)
+
+
+	def __declare_configured_routines__(self, declared_routines, configuration_list):
+
+		try:
+
+			# Register and configure all routines in wine
+			self.__declare_routines_on_server__(configuration_list)
+
+		except AttributeError as e:
+
+			# Log status
+			self.log.out('[dll-client] ... failed!')
+
+			raise e
+
+		for name, argtypes_d, restype_d, memsync_d_packed in configuration_list:
+
+			routine, (argtypes, restype, memsync), memsync_d = declared_routines[name]
+
+			# Apply declaration and definitions on client side
+			routine.argtypes, routine.restype, routine.memsync = argtypes, restype, memsync
+			routine.__load_configuration__(argtypes_d, restype_d, memsync_d_packed, memsync_d)
+
+			# Change status of routine - it has been configured
+			routine.called = True
+
+			self.routines[name] = routine
+
+			# If name is a string, set attribute for future use
+			if isinstance(name, str):
+				setattr(self, name, routine)
+
+
 	def __getattr__(self, name):
 
 		if name in ['__objclass__']:
@@ -74,6 +74,32 @@ class dll_server_class(): # Representing one idividual dll to be called into
 			self.__register_routine__,
 			self.hash_id + '_register_routine'
 			)
+		self.session.rpc_server.register_function(
+			self.__declare_routines__,
+			self.hash_id + '_declare_routines'
+			)
+
+
+	def __declare_routines__(self, configuration_list):
+		"""
+		Exposed interface: Registers and configures many routines in one go
+		"""
+
+		# Log status
+		self.log.out('[dll-server] Declaring %d routines in DLL file "%s" ...' % (len(configuration_list), self.name))
+
+		# Register all routines (if not known yet) first, so nothing is configured if one is missing
+		for routine_name, _, _, _ in configuration_list:
+			self.__register_routine__(routine_name)
+
+		# Configure routines
+		for routine_name, argtypes_d, restype_d, memsync_d in configuration_list:
+			self.routines[routine_name].__configure__(argtypes_d, restype_d, memsync_d)
+
+		# Log status
+		self.log.out('[dll-server] ... done.')
+
+		return True # Success
 
 
 	def __get_repr__(self):
@@ -132,6 +158,10 @@ class dll_server_class(): # Representing one idividual dll to be called into
 			self.routines[routine_name],
 			self.hash_id + '_' + str(routine_name) + '_handle_call'
 			)
+		self.session.rpc_server.register_function(
+			self.routines[routine_name].__call_scalar__,
+			self.hash_id + '_' + str(routine_name) + '_handle_call_scalar'
+			)
 		self.session.rpc_server.register_function(
 			self.routines[routine_name].__configure__,
 			self.hash_id + '_' + str(routine_name) + '_configure'
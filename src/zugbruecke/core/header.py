@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/header.py: Generating binding manifests from C header files
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import os
+import re
+
+from .const import MANIFEST_VERSION
+from .lib import get_hash_of_string
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# C types -> ctypes types
+FUNDAMENTAL_TYPES = {
+	'char': 'c_char',
+	'signed char': 'c_byte',
+	'unsigned char': 'c_ubyte',
+	'short': 'c_short',
+	'short int': 'c_short',
+	'unsigned short': 'c_ushort',
+	'unsigned short int': 'c_ushort',
+	'int': 'c_int',
+	'signed': 'c_int',
+	'signed int': 'c_int',
+	'unsigned': 'c_uint',
+	'unsigned int': 'c_uint',
+	'long': 'c_long',
+	'long int': 'c_long',
+	'unsigned long': 'c_ulong',
+	'unsigned long int': 'c_ulong',
+	'long long': 'c_longlong',
+	'long long int': 'c_longlong',
+	'unsigned long long': 'c_ulonglong',
+	'unsigned long long int': 'c_ulonglong',
+	'float': 'c_float',
+	'double': 'c_double',
+	'long double': 'c_longdouble',
+	'_Bool': 'c_bool',
+	'wchar_t': 'c_wchar',
+	'size_t': 'c_size_t',
+	'ssize_t': 'c_ssize_t',
+	'int8_t': 'c_int8',
+	'uint8_t': 'c_uint8',
+	'int16_t': 'c_int16',
+	'uint16_t': 'c_uint16',
+	'int32_t': 'c_int32',
+	'uint32_t': 'c_uint32',
+	'int64_t': 'c_int64',
+	'uint64_t': 'c_uint64'
+	}
+INTEGER_TYPES = {
+	'c_byte', 'c_ubyte', 'c_short', 'c_ushort', 'c_int', 'c_uint', 'c_long', 'c_ulong',
+	'c_longlong', 'c_ulonglong', 'c_size_t', 'c_ssize_t',
+	'c_int8', 'c_uint8', 'c_int16', 'c_uint16', 'c_int32', 'c_uint32', 'c_int64', 'c_uint64'
+	}
+
+# Ignored keywords
+QUALIFIERS = {'const', 'volatile', 'extern', 'static', 'inline', 'struct', 'register', 'restrict'}
+
+# Calling conventions
+CONVENTIONS = {'__stdcall': 'stdcall', '__cdecl': 'cdecl', 'WINAPI': 'stdcall', 'CALLBACK': 'stdcall'}
+
+# Names of parameters or fields likely holding the length of an array
+LENGTH_NAME = re.compile(r'^(n|len|length|size|count|num)$|^(n|len|num)_|_(len|length|size|count|num)$')
+
+# Declarations
+STRUCT_DECLARATION = re.compile(r'^(typedef\s+)?struct\s+(\w+)?\s*\{(.*)\}\s*(\w+)?$', re.DOTALL)
+CALLBACK_DECLARATION = re.compile(r'^typedef\s+(.+?)\(\s*(\w+\s+)?\*\s*(\w+)\s*\)\s*\((.*)\)$', re.DOTALL)
+TYPEDEF_DECLARATION = re.compile(r'^typedef\s+(.+?)\s*(\**)\s*(\w+)$', re.DOTALL)
+ROUTINE_DECLARATION = re.compile(r'^(.*?)(\w+)\s*\((.*)\)$', re.DOTALL)
+
+# Declarators
+ARRAY_POINTER_DECLARATOR = re.compile(r'^(.+?)\(\s*\*\s*(\w+)\s*\)\s*((?:\[\s*[0-9]+\s*\])+)$')
+DECLARATOR = re.compile(r'^(.*?)\s*(\**)\s*(\w+)\s*((?:\[\s*[0-9]*\s*\])*)$')
+DIMENSION = re.compile(r'\[\s*([0-9]*)\s*\]')
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# HEADER CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class header_class(): # Declarations of one C header, translated into a manifest
+	"""
+	This is not a C parser. It understands the subset of C typically found in
+	DLL headers: structs, typedefs, function pointer typedefs and function
+	declarations. Preprocessor directives are ignored, i.e. all branches of
+	conditionals are read. Declarations, which can not be translated (e.g.
+	unknown types), are skipped and listed in `skipped`.
+	"""
+
+
+	def __init__(self, source):
+
+		# Names of macros, which expand to nothing of interest (e.g. export macros)
+		self.macros = set()
+
+		# Known types: C name -> description
+		self.types = {}
+
+		# Results
+		self.manifest = {'version': MANIFEST_VERSION, 'types': [], 'routines': {}}
+		self.skipped = []
+
+		for statement in self.__get_statements__(self.__strip_source__(source)):
+			try:
+				self.__parse_statement__(statement)
+			except ValueError as e:
+				self.skipped.append((statement, str(e)))
+
+
+	def __get_declarator__(self, declaration):
+
+		declaration = ' '.join(
+			token for token in declaration.replace('*', ' * ').split()
+			if token not in QUALIFIERS and token not in CONVENTIONS.keys() and token not in self.macros
+			).replace(' * ', '*').replace(' *', '*').replace('* ', '*')
+
+		# Pointer to array, e.g. float (*A)[3][4]
+		match = ARRAY_POINTER_DECLARATOR.match(declaration)
+		if match is not None:
+			base, name, dimensions = match.groups()
+			return name, self.__get_type__(base.strip(), 1, [int(d) for d in DIMENSION.findall(dimensions)])
+
+		# Anonymous declaration, e.g. int16_t
+		if ' '.join(declaration.replace('*', ' ').split()) in FUNDAMENTAL_TYPES.keys() or (
+			declaration.replace('*', '').strip() in self.types.keys()
+			):
+			return None, self.__get_type__(declaration.replace('*', '').strip(), declaration.count('*'), [])
+
+		match = DECLARATOR.match(declaration)
+		if match is None or match.group(1).strip() == '':
+			raise ValueError('unable to parse declaration "%s"' % declaration)
+		base, pointers, name, dimensions = match.groups()
+
+		return name, self.__get_type__(
+			base.strip(), len(pointers), [(int(d) if d != '' else None) for d in DIMENSION.findall(dimensions)]
+			)
+
+
+	def __get_memsync__(self, parameters):
+
+		memsync = []
+
+		# Candidates for lengths: integer parameters with typical names
+		length_index = None
+		for index, (name, type_d) in enumerate(parameters):
+			if type_d['pointers'] == 0 and type_d['dimensions'] == [] and type_d['base'] in INTEGER_TYPES:
+				if name is not None and LENGTH_NAME.match(name) is not None:
+					length_index = index
+					break
+
+		for index, (name, type_d) in enumerate(parameters):
+
+			if type_d['pointers'] != 1 or type_d['dimensions'] != []:
+				continue
+
+			# Pointer to struct, which contains pointer and length fields
+			if type_d['kind'] == 'struct' and len(self.__get_memsync_struct__(index, type_d['base'])) > 0:
+				memsync.extend(self.__get_memsync_struct__(index, type_d['base']))
+
+			# Pointer to fundamental type or struct, paired with length
+			elif type_d['kind'] in ('fundamental', 'struct') and length_index is not None:
+				memsync.append({'p': [index], 'l': [length_index], 't': type_d['base']})
+
+			# Null-terminated strings
+			elif type_d['base'] in ('c_char', 'c_wchar'):
+				memsync_d = {'p': [index], 'n': True}
+				if type_d['base'] == 'c_wchar':
+					memsync_d['w'] = True
+				memsync.append(memsync_d)
+
+		return memsync
+
+
+	def __get_memsync_struct__(self, index, struct_name):
+
+		fields = self.types[struct_name]['fields']
+
+		return [
+			dict(memsync_d, p = [index, fields[memsync_d['p'][0]][0]], **(
+				{'l': [index, fields[memsync_d['l'][0]][0]]} if 'l' in memsync_d.keys() else {}
+				))
+			for memsync_d in self.__get_memsync__(fields)
+			if self.types[struct_name]['fields'][memsync_d['p'][0]][1]['kind'] != 'struct'
+			]
+
+
+	def __get_statements__(self, source):
+
+		statements, depth, start = [], 0, 0
+
+		for position, character in enumerate(source):
+			if character == '{':
+				depth += 1
+			elif character == '}':
+				depth -= 1
+			elif character == ';' and depth == 0:
+				statement = source[start:position].strip()
+				if statement != '':
+					statements.append(statement)
+				start = position + 1
+
+		return statements
+
+
+	def __get_type__(self, base, pointers, dimensions):
+
+		base = ' '.join(base.split())
+
+		# Resolve aliases
+		while base in self.types.keys() and self.types[base]['kind'] == 'alias':
+			alias = self.types[base]
+			base, pointers = alias['base'], pointers + alias['pointers']
+
+		if base == 'void':
+			if pointers == 0:
+				return {'kind': 'void', 'base': None, 'pointers': 0, 'dimensions': dimensions}
+			return {'kind': 'fundamental', 'base': 'c_void_p', 'pointers': pointers - 1, 'dimensions': dimensions}
+		if base in FUNDAMENTAL_TYPES.keys():
+			return {'kind': 'fundamental', 'base': FUNDAMENTAL_TYPES[base], 'pointers': pointers, 'dimensions': dimensions}
+		if base in self.types.keys():
+			return {'kind': self.types[base]['kind'], 'base': self.types[base]['name'], 'pointers': pointers, 'dimensions': dimensions}
+
+		raise ValueError('unknown type "%s"' % base)
+
+
+	def __parse_callback__(self, match):
+
+		return_part, convention, name, parameters = match.groups()
+		convention = (convention or '').strip()
+
+		# Convention may precede the parenthesis, e.g. int __stdcall (*name)(int)
+		for token in return_part.split():
+			if token in CONVENTIONS.keys():
+				convention = token
+
+		_, restype = self.__get_declarator__(return_part + ' __return__')
+		parameters = self.__parse_parameters__(parameters)
+
+		type_d = {
+			'callback': name,
+			'restype': self.__type_to_expression__(restype),
+			'argtypes': [self.__type_to_expression__(type_d) for _, type_d in parameters],
+			'memsync': self.__get_memsync__(parameters)
+			}
+		if convention in CONVENTIONS.keys():
+			type_d['convention'] = CONVENTIONS[convention]
+
+		self.manifest['types'].append(type_d)
+		self.types[name] = {'kind': 'callback', 'name': name}
+
+
+	def __parse_fields__(self, body):
+
+		fields = []
+
+		for statement in self.__get_statements__(body):
+
+			declarators = statement.split(',')
+
+			# First declarator carries the base type
+			fields.append(self.__get_declarator__(declarators[0]))
+
+			# Following declarators share it, e.g. double x, y;
+			if len(declarators) > 1:
+				base = DECLARATOR.match(declarators[0].strip()).group(1)
+				for declarator in declarators[1:]:
+					fields.append(self.__get_declarator__(base + ' ' + declarator.strip()))
+
+		return fields
+
+
+	def __parse_parameters__(self, parameters):
+
+		parameters = parameters.strip()
+
+		if parameters in ('', 'void'):
+			return []
+
+		parsed, depth, start = [], 0, 0
+		for position, character in enumerate(parameters + ','):
+			if character == '(':
+				depth += 1
+			elif character == ')':
+				depth -= 1
+			elif character == ',' and depth == 0:
+				parsed.append(self.__get_declarator__(parameters[start:position].strip()))
+				start = position + 1
+
+		return parsed
+
+
+	def __parse_routine__(self, match):
+
+		return_part, name, parameters = match.groups()
+
+		# Pointers belonging to the return type may stand right in front of the name
+		_, restype = self.__get_declarator__(return_part + ' __return__')
+		parameters = self.__parse_parameters__(parameters)
+
+		self.manifest['routines'][name] = {
+			'argtypes': [self.__type_to_expression__(type_d) for _, type_d in parameters],
+			'restype': self.__type_to_expression__(restype),
+			'memsync': self.__get_memsync__(parameters)
+			}
+
+
+	def __parse_statement__(self, statement):
+
+		statement = ' '.join(statement.split())
+
+		# Structures
+		match = STRUCT_DECLARATION.match(statement)
+		if match is not None:
+			is_typedef, tag, body, name = match.groups()
+			name = name if (is_typedef and name is not None) else tag
+			if name is None:
+				raise ValueError('anonymous struct')
+			fields = self.__parse_fields__(body)
+			self.manifest['types'].append({'struct': name, 'fields': [
+				[field_name, self.__type_to_expression__(type_d)] for field_name, type_d in fields
+				]})
+			self.types[name] = {'kind': 'struct', 'name': name, 'fields': fields}
+			if tag is not None and tag != name:
+				self.types[tag] = self.types[name]
+			return
+
+		# Function pointer types
+		match = CALLBACK_DECLARATION.match(statement)
+		if match is not None:
+			self.__parse_callback__(match)
+			return
+
+		# Aliases
+		match = TYPEDEF_DECLARATION.match(statement)
+		if match is not None:
+			base, pointers, name = match.groups()
+			base = ' '.join(token for token in base.split() if token not in QUALIFIERS)
+			self.types[name] = {'kind': 'alias', 'base': base, 'pointers': len(pointers)}
+			return
+
+		# Routines
+		match = ROUTINE_DECLARATION.match(statement)
+		if match is not None:
+			self.__parse_routine__(match)
+			return
+
+		raise ValueError('unknown declaration')
+
+
+	def __strip_source__(self, source):
+
+		# Comments
+		source = re.sub(r'/\*.*?\*/', ' ', source, flags = re.DOTALL)
+		source = re.sub(r'//[^\n]*', ' ', source)
+
+		# Line continuations
+		source = source.replace('\\\n', ' ')
+
+		lines = []
+		for line in source.split('\n'):
+			if line.strip().startswith('#'):
+				# Macros without value or with attributes only, e.g. export macros
+				match = re.match(r'^\s*#\s*define\s+(\w+)\s*(__declspec\s*\(.*\)|__attribute__\s*\(.*\))?\s*$', line)
+				if match is not None and match.group(1) not in CONVENTIONS.keys():
+					self.macros.add(match.group(1))
+				continue
+			lines.append(line)
+		source = '\n'.join(lines)
+
+		# Attributes
+		return re.sub(r'__declspec\s*\(\s*\w+\s*\)|__attribute__\s*\(\(.*?\)\)', ' ', source)
+
+
+	def __type_to_expression__(self, type_d):
+
+		if type_d['kind'] == 'void':
+			return None
+
+		expression = type_d['base']
+
+		# Arrays (last dimension is innermost), unknown dimensions decay to pointers
+		for dimension in reversed(type_d['dimensions']):
+			if dimension is None:
+				expression = 'POINTER(%s)' % expression
+			else:
+				expression = '%s * %d' % (expression, dimension)
+
+		for _ in range(type_d['pointers']):
+			expression = 'POINTER(%s)' % expression
+
+		return expression
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def get_manifest_from_header(header_path, cache_dir = None):
+
+	with open(header_path, 'r') as f:
+		source = f.read()
+
+	# Look for manifest generated from identical header before
+	cache_path = None
+	if cache_dir is not None:
+		cache_path = os.path.join(cache_dir, 'cache', 'header_%s.json' % get_hash_of_string(
+			'%d:%s' % (MANIFEST_VERSION, source)
+			))
+		if os.path.isfile(cache_path):
+			with open(cache_path, 'r') as f:
+				return json.loads(f.read()), []
+
+	header = header_class(source)
+
+	# Cache is optional
+	if cache_path is not None:
+		try:
+			os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+			with open(cache_path + '.%d.tmp' % os.getpid(), 'w') as f:
+				f.write(json.dumps(header.manifest, indent = 4, sort_keys = True))
+			os.replace(cache_path + '.%d.tmp' % os.getpid(), cache_path)
+		except OSError:
+			pass
+
+	return header.manifest, header.skipped
@@ -34,6 +34,7 @@ specific language governing rights and limitations under the License.
 import os
 import signal
 import subprocess
+import sys
 import threading
 
 
@@ -85,6 +86,10 @@ class interpreter_session_class():
 
 	def __compile_python_command__(self):
 
+		# Loopback mode: Run session server with this very interpreter, natively
+		if self.p['loopback']:
+			return [sys.executable] + self.p['command_dict']
+
 		# Python interpreter's directory seen from this script
 		dir_python = os.path.join(self.p['dir'], self.p['arch'] + '-python' + self.p['version'])
 
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/manifest.py: Declarative binding manifests with on-disk cache
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import ctypes
+from copy import deepcopy
+import json
+import os
+import pickle
+import re
+
+from .const import DEFINITION_VERSION, MANIFEST_VERSION
+from .lib import get_hash_of_string
+from .routine_client import routine_client_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Type expressions: name, POINTER(expression) or expression * length
+TYPE_ARRAY = re.compile(r'^(.+)\*\s*([0-9]+)$')
+TYPE_POINTER = re.compile(r'^POINTER\s*\((.+)\)$')
+TYPE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+CALLING_CONVENTIONS = ('cdecl', 'stdcall')
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# MANIFEST CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class manifest_class(): # Types and routines of one DLL, described by a manifest
+	"""
+	Manifest format (JSON):
+
+	{
+		"version": 1,
+		"types": [
+			{"struct": "image_data", "fields": [["data", "POINTER(c_int16)"], ["width", "c_int16"]]},
+			{"callback": "filter_func_type", "restype": "c_int16", "argtypes": ["POINTER(image_data)"],
+				"memsync": [], "convention": "stdcall"}
+		],
+		"routines": {
+			"apply_filter_to_image": {"argtypes": ["POINTER(image_data)", "filter_func_type"],
+				"restype": null, "memsync": []}
+		}
+	}
+
+	Types are defined in order, i.e. a type can only refer to types defined before it.
+	Type expressions are parsed, not evaluated. They can refer to fundamental ctypes
+	types (c_*), to previously defined types and to None (void).
+	"""
+
+
+	def __init__(self, parent_dll, manifest):
+
+		# Store handle on parent dll
+		self.dll = parent_dll
+
+		# Store pointer to zugbruecke session
+		self.session = self.dll.session
+
+		# Get handle on log
+		self.log = self.dll.log
+
+		# Required by arg definitions
+		self.data = self.session.data
+
+		# Load manifest from file if required
+		if isinstance(manifest, str):
+			with open(manifest, 'r') as f:
+				manifest = json.loads(f.read())
+
+		# Check structure of manifest
+		validate_manifest(manifest)
+		self.manifest = manifest
+
+		# Hash manifest as unique ID
+		self.hash_id = get_hash_of_string('%d:%d:%s' % (
+			MANIFEST_VERSION, DEFINITION_VERSION, json.dumps(manifest, sort_keys = True)
+			))
+
+		# Log status
+		self.log.out('[manifest] Loading manifest %s for DLL file "%s" ...' % (self.hash_id, self.dll.name))
+
+		# Generate (Python) types: name -> type
+		self.types = {}
+		self.name_collision = False
+		for type_d in self.manifest.get('types', []):
+			self.__generate_type__(type_d)
+
+		# Routine handles: name -> routine
+		self.routines = {}
+
+		# Declare all routines on server, using cached definitions if possible
+		self.__declare_routines__()
+
+		# Log status
+		self.log.out('[manifest] ... loaded.')
+
+
+	def __getattr__(self, name):
+
+		if name in self.__dict__.get('types', {}).keys():
+			return self.types[name]
+		if name in self.__dict__.get('routines', {}).keys():
+			return self.routines[name]
+
+		raise AttributeError(name)
+
+
+	def __declare_routines__(self):
+
+		# Try on-disk cache of packed definitions (only valid if struct names are unique)
+		configuration_dict = self.__load_cache__() if not self.name_collision else None
+		from_cache = configuration_dict is not None
+		if not from_cache:
+			configuration_dict = {}
+
+		declared_routines, configuration_list = {}, []
+
+		for name, routine_d in self.manifest.get('routines', {}).items():
+
+			# Reuse known routine or create new instance of routine_client
+			routine = self.dll.routines.get(name, None)
+			if routine is None:
+				routine = routine_client_class(self.dll, name)
+
+			# Types are required on client side in any case
+			attributes = (
+				[self.__parse_type__(item) for item in routine_d.get('argtypes', [])],
+				self.__parse_type__(routine_d.get('restype', 'c_int')),
+				self.__get_memsync__(routine_d)
+				)
+
+			# Use cached definitions (memsync is compiled from them) or pack them
+			memsync_d = None
+			if not from_cache:
+				configuration_dict[name] = routine.__pack_configuration__(*attributes)
+				memsync_d = configuration_dict[name][3]
+				configuration_dict[name] = configuration_dict[name][:3]
+
+			configuration_list.append((name,) + tuple(configuration_dict[name]))
+			declared_routines[name] = (routine, attributes, memsync_d)
+
+		# One single RPC for all routines, applies definitions to routines on success
+		self.dll.__declare_configured_routines__(declared_routines, configuration_list)
+		self.routines.update({name: item[0] for name, item in declared_routines.items()})
+
+		# Populate cache
+		if not from_cache and not self.name_collision:
+			self.__store_cache__(configuration_dict)
+
+
+	def __generate_type__(self, type_d):
+
+		# Structures
+		if 'struct' in type_d.keys():
+
+			name = type_d['struct']
+			attributes = {'_fields_': [
+				(field_name, self.__parse_type__(field_type)) for field_name, field_type in type_d['fields']
+				]}
+			if 'pack' in type_d.keys():
+				attributes['_pack_'] = type_d['pack']
+
+			# Structure generated from identical definition by an earlier manifest, reuse it
+			type_json = json.dumps(type_d, sort_keys = True)
+			known_type = self.data.cache_dict['struct_type'].get(name, None)
+			if getattr(known_type, '_manifest_', None) == type_json and known_type._fields_ == attributes['_fields_']:
+				self.types[name] = known_type
+				return
+
+			attributes['_manifest_'] = type_json
+			self.types[name] = type(name, (ctypes.Structure,), attributes)
+
+			# Keep track of datatype on client side (packing, which would do this, may be skipped)
+			if self.data.get_struct_type_name(self.types[name]) != name:
+				# Another struct with the same name has been known, it got a unique name
+				self.name_collision = True
+
+		# Function pointer types
+		else:
+
+			name = type_d['callback']
+			convention = type_d.get('convention', 'cdecl' if self.dll.calling_convention == 'cdll' else 'stdcall')
+			factory = self.session.ctypes_CFUNCTYPE if convention == 'cdecl' else self.session.ctypes_WINFUNCTYPE
+
+			self.types[name] = factory(
+				self.__parse_type__(type_d.get('restype', 'c_int')),
+				*[self.__parse_type__(item) for item in type_d.get('argtypes', [])]
+				)
+			self.types[name].memsync = self.__get_memsync__(type_d)
+
+
+	def __get_memsync__(self, routine_d):
+
+		memsync = deepcopy(routine_d.get('memsync', []))
+
+		# JSON does not know tuples, length functions expect a tuple of paths
+		for memsync_d in memsync:
+			if 'f' in memsync_d.keys():
+				memsync_d['l'] = tuple(memsync_d['l'])
+
+		return memsync
+
+
+	def __get_cache_path__(self):
+
+		return os.path.join(self.session.p['dir'], 'cache', 'manifest_%s.pickle' % self.hash_id)
+
+
+	def __load_cache__(self):
+
+		cache_path = self.__get_cache_path__()
+
+		if not os.path.isfile(cache_path):
+			return None
+
+		try:
+			with open(cache_path, 'rb') as f:
+				configuration_dict = pickle.load(f)
+		except Exception:
+			# Broken cache, ignore it
+			self.log.out('[manifest] ... cache broken, ignoring it ...')
+			return None
+
+		# Cache must cover all routines of manifest
+		if set(configuration_dict.keys()) != set(self.manifest.get('routines', {}).keys()):
+			return None
+
+		# Log status
+		self.log.out('[manifest] ... using cached definitions ...')
+
+		return configuration_dict
+
+
+	def __parse_type__(self, expression):
+
+		if expression is None:
+			return None
+
+		expression = expression.strip()
+
+		# Arrays (outer most dimension last)
+		match = TYPE_ARRAY.match(expression)
+		if match is not None:
+			return self.__parse_type__(match.group(1)) * int(match.group(2))
+
+		# Pointers
+		match = TYPE_POINTER.match(expression)
+		if match is not None:
+			return ctypes.POINTER(self.__parse_type__(match.group(1)))
+
+		# Names
+		if TYPE_NAME.match(expression) is not None:
+			if expression == 'None':
+				return None
+			if expression in self.types.keys():
+				return self.types[expression]
+			if expression.startswith('c_') and hasattr(ctypes, expression):
+				return getattr(ctypes, expression)
+
+		raise ValueError('unknown type expression in manifest: "%s"' % expression)
+
+
+	def __store_cache__(self, configuration_dict):
+
+		cache_path = self.__get_cache_path__()
+
+		try:
+			os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+			# Write to temporary file first, other processes might read the cache at the same time
+			with open(cache_path + '.%d.tmp' % os.getpid(), 'wb') as f:
+				pickle.dump(configuration_dict, f, protocol = pickle.HIGHEST_PROTOCOL)
+			os.replace(cache_path + '.%d.tmp' % os.getpid(), cache_path)
+		except OSError:
+			# Cache is optional
+			self.log.out('[manifest] ... cache could not be written ...')
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def validate_manifest(manifest):
+
+	if not isinstance(manifest, dict):
+		raise TypeError('manifest must be a dict')
+	if manifest.get('version', MANIFEST_VERSION) != MANIFEST_VERSION:
+		raise ValueError('unsupported manifest version: %r' % manifest['version'])
+	unknown_keys = set(manifest.keys()) - {'version', 'types', 'routines'}
+	if len(unknown_keys) > 0:
+		raise ValueError('unknown keys in manifest: %s' % ', '.join(sorted(unknown_keys)))
+
+	if not isinstance(manifest.get('types', []), list):
+		raise TypeError('"types" in manifest must be a list')
+	for type_d in manifest.get('types', []):
+		__validate_type__(type_d)
+
+	if not isinstance(manifest.get('routines', {}), dict):
+		raise TypeError('"routines" in manifest must be a dict')
+	for name, routine_d in manifest.get('routines', {}).items():
+		__validate_signature__(name, routine_d, {'argtypes', 'restype', 'memsync'})
+
+
+def __validate_signature__(name, signature_d, allowed_keys):
+
+	if not isinstance(signature_d, dict):
+		raise TypeError('declaration of "%s" in manifest must be a dict' % name)
+	unknown_keys = set(signature_d.keys()) - allowed_keys
+	if len(unknown_keys) > 0:
+		raise ValueError('unknown keys in declaration of "%s": %s' % (name, ', '.join(sorted(unknown_keys))))
+	if not isinstance(signature_d.get('argtypes', []), list):
+		raise TypeError('argtypes of "%s" in manifest must be a list' % name)
+	if not isinstance(signature_d.get('memsync', []), list):
+		raise TypeError('memsync of "%s" in manifest must be a list' % name)
+	for memsync_d in signature_d.get('memsync', []):
+		if not isinstance(memsync_d, dict) or 'p' not in memsync_d.keys():
+			raise ValueError('memsync of "%s" in manifest must be a list of dicts with a path "p"' % name)
+
+
+def __validate_type__(type_d):
+
+	if not isinstance(type_d, dict):
+		raise TypeError('type in manifest must be a dict')
+
+	if 'struct' in type_d.keys():
+		name = type_d['struct']
+		if not isinstance(name, str) or TYPE_NAME.match(name) is None:
+			raise ValueError('invalid name of struct in manifest: %r' % name)
+		unknown_keys = set(type_d.keys()) - {'struct', 'fields', 'pack'}
+		if len(unknown_keys) > 0:
+			raise ValueError('unknown keys in struct "%s": %s' % (name, ', '.join(sorted(unknown_keys))))
+		if not isinstance(type_d.get('fields', None), list) or not all(
+			isinstance(field, list) and len(field) == 2 for field in type_d['fields']
+			):
+			raise TypeError('fields of struct "%s" in manifest must be a list of [name, type] pairs' % name)
+
+	elif 'callback' in type_d.keys():
+		name = type_d['callback']
+		if not isinstance(name, str) or TYPE_NAME.match(name) is None:
+			raise ValueError('invalid name of callback in manifest: %r' % name)
+		__validate_signature__(name, type_d, {'callback', 'argtypes', 'restype', 'memsync', 'convention'})
+		if type_d.get('convention', 'cdecl') not in CALLING_CONVENTIONS:
+			raise ValueError('unknown calling convention of callback "%s": %r' % (name, type_d['convention']))
+
+	else:
+		raise ValueError('type in manifest must either be a "struct" or a "callback"')
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/pipeline_client.py: Sequences of calls executed on the Wine side in one go
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from .data.remote import remote_pointer_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# PIPELINE REFERENCE CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class pipeline_reference_class(remote_pointer_class): # Result of a call in a pipeline, lives on the Wine side
+
+
+	def __init__(self, pipeline, step, index = None):
+
+		# Pipeline and index of call within it
+		self.pipeline = pipeline
+		self.step = step
+
+		# Index of argument or None (return value)
+		self.index = index
+
+
+	def __repr__(self):
+
+		if self.index is None:
+			return '<pipeline reference: return value of call %d>' % self.step
+		return '<pipeline reference: argument %d of call %d>' % (self.index, self.step)
+
+
+	def arg(self, index):
+		"""
+		Reference to argument (e.g. an out-parameter) of the call after it returned
+		"""
+
+		return pipeline_reference_class(self.pipeline, self.step, index)
+
+
+	def __get_remote_pointer__(self):
+
+		# Only a plain marker travels
+		return {'s': self.step, 'a': self.index}
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# PIPELINE CLIENT CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class pipeline_client_class(): # Sequence of calls, sent to and executed on the Wine side in one go
+	"""
+	Arguments of calls can be references on return values and arguments of
+	earlier calls in the same pipeline. Only the results of the calls requested
+	by run are sent back. Their arguments are synced like after a normal call.
+	"""
+
+
+	def __init__(self, session):
+
+		# Store pointer to zugbruecke session
+		self.session = session
+
+		# Get handle on log
+		self.log = self.session.log
+
+		# Required by arg definitions and contents
+		self.data = self.session.data
+
+		# Calls: (routine, args)
+		self.steps = []
+
+
+	def __len__(self):
+
+		return len(self.steps)
+
+
+	def call(self, routine, *args):
+		"""
+		Appends call of routine, returns reference on its return value
+		"""
+
+		# References must point backwards into this pipeline
+		for arg in args:
+			if isinstance(arg, pipeline_reference_class):
+				if arg.pipeline is not self:
+					raise ValueError('reference belongs to another pipeline')
+				if arg.index is not None and arg.index >= len(self.steps[arg.step][1]):
+					raise IndexError('call %d has no argument %d' % (arg.step, arg.index))
+
+		self.steps.append((routine, args))
+
+		return pipeline_reference_class(self, len(self.steps) - 1)
+
+
+	def run(self, *outputs):
+		"""
+		Executes all calls with one single round trip. outputs are references returned
+		by call or their arguments (default: last call). Returns list of their values.
+		"""
+
+		if len(self.steps) == 0:
+			return []
+
+		# Default output: last call
+		if len(outputs) == 0:
+			outputs = (pipeline_reference_class(self, len(self.steps) - 1),)
+		output_set = {reference.step for reference in outputs}
+
+		# Log status
+		self.log.out('[pipeline-client] Packing %d calls ...' % len(self.steps))
+
+		step_message_list, local_indices_list = [], []
+
+		for index, (routine, args) in enumerate(self.steps):
+
+			# Configure routine if required
+			if not routine.called:
+				routine.__configure__()
+				routine.called = True
+
+			# References can not be packed without definitions
+			if len(routine.argtypes_d) != len(args):
+				raise TypeError('routine "%s" requires %d arguments' % (routine.name, len(routine.argtypes_d)))
+
+			# Remote data is neither sent back nor synced
+			local_indices_list.append([
+				arg_index for arg_index in routine.mutable_d if not isinstance(args[arg_index], remote_pointer_class)
+				])
+
+			step_message_list.append((
+				routine.dll.name,
+				routine.name,
+				self.data.arg_list_pack(args, routine.argtypes_d),
+				self.data.client_pack_memory_list(args, routine.memsync_d),
+				local_indices_list[-1] if index in output_set else None
+				))
+
+		# Memory streamed from server is allocated during call
+		stream_mark = self.data.client_begin_stream_call()
+
+		try:
+
+			# One single round trip
+			try:
+				return_dict_dict = self.session.rpc_client.run_pipeline(step_message_list)
+			finally:
+				# Streamed memory is not accessed by server anymore
+				for step_message in step_message_list:
+					self.data.client_close_memory_list(step_message[3])
+
+			# Log status
+			self.log.out('[pipeline-client] ... received results, unpacking ...')
+
+			# Sync arguments and memory of requested calls, collect return values
+			return_values = {}
+			for step in sorted(output_set):
+				routine, args = self.steps[step]
+				return_values[step] = routine.__unpack_return_dict__(
+					args, return_dict_dict[step], local_indices_list[step]
+					)
+
+		finally:
+
+			# Memory streamed from server, which has not been handed over, is dropped
+			self.data.client_end_stream_call(stream_mark)
+
+		# References on arguments yield the (synced) arguments themselves
+		return [
+			(return_values[reference.step] if reference.index is None else self.steps[reference.step][1][reference.index])
+			for reference in outputs
+			]
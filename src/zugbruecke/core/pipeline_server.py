@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/pipeline_server.py: Executing sequences of calls with data dependencies
+
+	Required to run on platform / side: [WINE]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import traceback
+
+from .const import (
+	FLAG_POINTER,
+	GROUP_FUNDAMENTAL
+	)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# PIPELINE SERVER CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class pipeline_server_class():
+
+
+	def __init__(self, parent_session):
+
+		# Store pointer to _server_ session
+		self.session = parent_session
+
+		# Get handle on log
+		self.log = self.session.log
+
+		# Required by arg definitions and contents
+		self.data = self.session.data
+
+
+	def __call__(self, step_message_list):
+		"""
+		Exposed interface: Runs calls in order, returns dict of return dicts of requested
+		calls. They are packed once all calls are done.
+		"""
+
+		# Log status
+		self.log.out('[pipeline-server] Running %d calls ...' % len(step_message_list))
+
+		# Arguments and return value of every call: (args_list, return_value)
+		results = []
+		return_dict_dict = {}
+
+		for step, (dll_name, routine_name, arg_message_list, arg_memory_list, local_indices) in enumerate(step_message_list):
+
+			routine = self.session.dll_dict[dll_name].routines[routine_name]
+
+			# Unpack arguments, replacing references by results of earlier calls
+			args_list = routine.__unpack_arguments__(
+				arg_message_list, arg_memory_list,
+				self.__get_substitutes__(results, arg_message_list, routine.argtypes_d)
+				)
+
+			try:
+
+				# Call into dll
+				return_value = routine.handler(*tuple(args_list))
+
+			except Exception as e:
+
+				# Log status
+				self.log.out('[pipeline-server] ... call %d ("%s") failed!' % (step, routine_name))
+
+				# Push traceback to log
+				self.log.err(traceback.format_exc())
+
+				raise e
+
+			# Keep everything, later calls may refer to it (memory must stay alive, too)
+			results.append((args_list, return_value))
+
+		# Only pack what was requested, after all calls (memory may be changed by later calls)
+		for step, (dll_name, routine_name, _, arg_memory_list, local_indices) in enumerate(step_message_list):
+			if local_indices is not None:
+				return_dict_dict[step] = self.session.dll_dict[dll_name].routines[routine_name].__pack_return_dict__(
+					results[step][0], results[step][1], arg_memory_list, local_indices
+					)
+
+		# Log status
+		self.log.out('[pipeline-server] ... done.')
+
+		return return_dict_dict
+
+
+	def __get_substitutes__(self, results, arg_message_list, argtypes_d):
+
+		substitutes = {}
+
+		for index, (_, arg_raw) in enumerate(arg_message_list):
+
+			# References are dicts with a step
+			if not isinstance(arg_raw, dict) or 's' not in arg_raw.keys():
+				continue
+
+			args_list, return_value = results[arg_raw['s']]
+			value = return_value if arg_raw['a'] is None else args_list[arg_raw['a']]
+
+			# Arguments by value: strip pointers (e.g. out-parameters) down to the value
+			arg_def_dict = argtypes_d[index]
+			if arg_def_dict['g'] == GROUP_FUNDAMENTAL and FLAG_POINTER not in arg_def_dict['f']:
+				value = self.data.__item_value_strip__(self.__strip_pointers__(value))
+
+			substitutes[index] = value
+
+		return substitutes
+
+
+	def __strip_pointers__(self, value):
+
+		while True:
+			stripped = self.data.__item_pointer_strip__(value)
+			if stripped is value:
+				return value
+			value = stripped
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/python_client.py: Handles on Python modules running on the Wine side
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from .data.remote import remote_pointer_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# PYTHON MODULE CLIENT CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class python_module_client_class(): # Python module executed in the Wine Python interpreter
+	"""
+	Public functions of the module are exposed as attributes. Arguments and return
+	values are pickled as they are. Remote buffers and functions of Wine-side
+	modules are passed by reference.
+	"""
+
+
+	def __init__(self, session, name, source):
+
+		# Store pointer to zugbruecke session
+		self.session = session
+
+		# Get handle on log
+		self.log = self.session.log
+
+		# Store my own name
+		self.name = name
+
+		# Log status
+		self.log.out('[python-client] Loading module "%s" on Wine side ...' % self.name)
+
+		# Compile module on server, get its ID and the names of its functions
+		self.hash_id, function_names = self.session.rpc_client.load_python_module(name, source)
+
+		# Expose functions
+		self.functions = {}
+		for function_name in function_names:
+			self.functions[function_name] = python_function_client_class(self, function_name)
+			setattr(self, function_name, self.functions[function_name])
+
+		# Log status
+		self.log.out('[python-client] ... loaded, exposing %d functions.' % len(self.functions))
+
+
+	def __repr__(self):
+
+		return '<Wine-side Python module "%s">' % self.name
+
+
+class python_function_client_class(remote_pointer_class): # Can be passed in place of callbacks
+
+
+	def __init__(self, parent_module, function_name):
+
+		# Store my own name and module
+		self.name = function_name
+		self.module = parent_module
+
+		# Get handle on server-side function
+		self.__call_on_server__ = getattr(
+			parent_module.session.rpc_client, parent_module.hash_id + '_' + function_name
+			)
+
+
+	def __call__(self, *args, **kwargs):
+
+		# Remote buffers travel as markers
+		return self.__call_on_server__(
+			*[self.__pack_item__(arg) for arg in args],
+			**{key: self.__pack_item__(arg) for key, arg in kwargs.items()}
+			)
+
+
+	def __repr__(self):
+
+		return '<Wine-side Python function "%s">' % self.name
+
+
+	def __get_remote_pointer__(self):
+
+		# Only module ID and name travel, function is used as native callback on Wine side
+		return {'m': self.module.hash_id, 'n': self.name}
+
+
+	def __pack_item__(self, arg):
+
+		if isinstance(arg, remote_pointer_class):
+			return arg.__get_remote_pointer__()
+		return arg
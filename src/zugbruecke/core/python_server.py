@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/python_server.py: Running Python modules next to DLLs on the Wine side
+
+	Required to run on platform / side: [WINE]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from functools import partial
+import traceback
+import types
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# PYTHON MODULE SERVER CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class python_module_server_class(): # Python module compiled from source sent by Unix side
+
+
+	def __init__(self, parent_session, name, source, hash_id):
+
+		# Store pointer to _server_ session
+		self.session = parent_session
+
+		# Get handle on log
+		self.log = self.session.log
+
+		# Store my own name
+		self.name = name
+
+		# Hash of name and source as unique ID
+		self.hash_id = hash_id
+
+		# Module with access to DLLs and remote buffers of this session
+		self.module = types.ModuleType(name)
+		self.module.__dict__.update({
+			'get_buffer': self.__get_buffer__,
+			'get_dll': self.__get_dll__,
+			'session': self.session
+			})
+
+		# Run module code
+		exec(compile(source, '<zugbruecke module %s>' % name, 'exec'), self.module.__dict__)
+
+		# Public functions defined in module
+		self.function_names = sorted(
+			function_name for function_name, function in self.module.__dict__.items()
+			if isinstance(function, types.FunctionType) and not function_name.startswith('_')
+			and function.__module__ == name
+			)
+
+		# Export functions directly, make them available as (portable) callbacks
+		for function_name in self.function_names:
+			self.session.rpc_server.register_function(
+				partial(self.__call__, function_name),
+				self.hash_id + '_' + function_name
+				)
+			self.session.data.python_function_dict[(self.hash_id, function_name)] = getattr(self.module, function_name)
+
+
+	def __call__(self, function_name, *args, **kwargs):
+		"""
+		Exposed interface
+		"""
+
+		try:
+
+			return getattr(self.module, function_name)(
+				*[self.__unpack_item__(arg) for arg in args],
+				**{key: self.__unpack_item__(arg) for key, arg in kwargs.items()}
+				)
+
+		except Exception as e:
+
+			# Log status
+			self.log.out('[python-server] ... call of "%s" in module "%s" failed!' % (function_name, self.name))
+
+			# Push traceback to log
+			self.log.err(traceback.format_exc())
+
+			raise e
+
+
+	def __get_buffer__(self, buffer_id):
+
+		# Remote buffer as ctypes char array
+		return self.session.data.remote_buffer_dict[buffer_id][0]
+
+
+	def __get_dll__(self, dll_name):
+
+		# ctypes handle on DLL loaded by Unix side, routines carry their configuration
+		return self.session.dll_dict[dll_name].handler
+
+
+	def __unpack_item__(self, arg):
+
+		# Remote buffers and functions arrive as markers
+		if isinstance(arg, dict) and 'r' in arg.keys() and len(arg) == 1:
+			return self.__get_buffer__(arg['r'])
+		if isinstance(arg, dict) and 'm' in arg.keys() and len(arg) == 2:
+			return self.session.data.python_function_dict[(arg['m'], arg['n'])]
+		return arg
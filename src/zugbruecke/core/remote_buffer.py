@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/remote_buffer.py: Handles on buffers residing on the Wine side
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import ctypes
+
+from .data.remote import remote_pointer_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# REMOTE BUFFER CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class remote_buffer_class(remote_pointer_class): # One reference on a buffer on the Wine side
+	"""
+	Every handle holds one reference. The buffer is released on the Wine side once
+	all handles have been freed, either explicitly (free, end of with-block) or
+	when they are garbage collected (with the next call).
+	"""
+
+
+	def __init__(self, session, init = None, buffer_id = None, size = None):
+
+		# Store pointer to zugbruecke session
+		self.session = session
+
+		# Get handle on log
+		self.log = self.session.log
+
+		# Handle on existing buffer (retain)
+		if buffer_id is not None:
+			remote_pointer_class.__init__(self, buffer_id)
+			self.size = size
+			self.freed = False
+			self.__cache__ = None
+			self.session.data.remote_references += 1
+			return
+
+		# Size or initial data
+		if isinstance(init, int):
+			data, self.size = None, init
+		else:
+			data = self.__to_bytes__(init)
+			self.size = len(data)
+
+		# Release buffers of handles garbage collected meanwhile
+		self.session.data.remote_buffer_release(self.session.rpc_client)
+
+		# Allocate memory on server
+		remote_pointer_class.__init__(self, self.session.rpc_client.remote_buffer_allocate(self.size))
+		self.freed = False
+		self.session.data.remote_references += 1
+
+		# Local copy of contents (lazy download)
+		self.__cache__ = None
+
+		# Log status
+		self.log.out('[remote-buffer] Allocated buffer %d (%d bytes).' % (self.buffer_id, self.size))
+
+		if data is not None:
+			self.upload(data)
+
+
+	def __del__(self):
+
+		# Garbage collection may happen in any thread and in the middle of an RPC, released with next call
+		if self.freed or not self.session.up:
+			return
+		self.freed = True
+		self.session.data.remote_release_queue.append(self.buffer_id)
+
+
+	def __enter__(self):
+
+		return self
+
+
+	def __exit__(self, exc_type, exc_value, traceback):
+
+		self.free()
+
+
+	def __repr__(self):
+
+		return '<remote buffer %d (%d bytes)%s>' % (self.buffer_id, self.size, ' freed' if self.freed else '')
+
+
+	@property
+	def raw(self):
+		"""
+		Contents as bytes, downloaded only if the buffer may have changed
+		"""
+
+		if self.__cache__ is None:
+			self.__cache__ = self.download()
+		return self.__cache__
+
+
+	def download(self, target = None, offset = 0, length = None):
+		"""
+		Returns contents as bytes or copies them into target (ctypes object)
+		"""
+
+		self.__check_freed__()
+
+		if target is not None:
+			length = ctypes.sizeof(target)
+		elif length is None:
+			length = self.size - offset
+
+		data = self.session.rpc_client.remote_buffer_read(self.buffer_id, offset, length)
+
+		if target is None:
+			return data
+
+		ctypes.memmove(ctypes.addressof(target), data, length)
+		return target
+
+
+	def free(self):
+
+		# Release this handle's reference only once
+		if self.freed:
+			return
+		self.freed = True
+		self.session.data.remote_references -= 1
+
+		# Session is gone and so is the buffer
+		if not self.session.up:
+			return
+
+		self.session.rpc_client.remote_buffer_free(self.buffer_id)
+
+		# Log status
+		self.log.out('[remote-buffer] Released reference on buffer %d.' % self.buffer_id)
+
+
+	def retain(self):
+		"""
+		Returns new handle on the same buffer, holding an additional reference
+		"""
+
+		self.__check_freed__()
+
+		self.session.rpc_client.remote_buffer_retain(self.buffer_id)
+
+		return remote_buffer_class(self.session, buffer_id = self.buffer_id, size = self.size)
+
+
+	def upload(self, data, offset = 0):
+		"""
+		Copies data (bytes or ctypes object) into buffer
+		"""
+
+		self.__check_freed__()
+
+		self.session.rpc_client.remote_buffer_write(self.buffer_id, offset, self.__to_bytes__(data))
+		self.__cache__ = None
+
+
+	def __check_freed__(self):
+
+		if self.freed:
+			raise ValueError('remote buffer has been freed')
+
+
+	def __get_remote_pointer__(self):
+
+		self.__check_freed__()
+
+		# Routines may change contents
+		self.__cache__ = None
+
+		# Only the ID travels
+		return remote_pointer_class.__get_remote_pointer__(self)
+
+
+	def __to_bytes__(self, data):
+
+		if isinstance(data, (bytes, bytearray)):
+			return bytes(data)
+
+		# ctypes objects, arrays and structures
+		return ctypes.string_at(ctypes.addressof(data), ctypes.sizeof(data))
@@ -31,9 +31,15 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import ctypes
+from copy import deepcopy
 from functools import partial
 from pprint import pformat as pf
+from queue import Queue
+
+from .const import GROUP_VOID
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -85,6 +91,20 @@ class routine_client_class():
 			self.rpc_client, self.dll.hash_id + '_' + str(self.name) + '_handle_call'
 			)
 
+		# Get handle on server-side handle_call for routines with fundamental types by value only
+		self.__handle_call_scalar_on_server__ = getattr(
+			self.rpc_client, self.dll.hash_id + '_' + str(self.name) + '_handle_call_scalar'
+			)
+
+		# Routine only takes and returns fundamental types by value (set by configuration)
+		self.is_scalar = False
+
+		# Routine takes C strings, which can be passed string buffers (set by configuration)
+		self.has_buffers = False
+
+		# Indices of arguments, which can be passed objects supporting the buffer protocol (set by configuration)
+		self.buffer_d = []
+
 
 	def __call__(self, *args):
 		"""
@@ -109,26 +129,151 @@ class routine_client_class():
 			# Log status
 			self.log.out('[routine-client] ... configured. Proceeding ...')
 
+		# Release remote buffers of handles garbage collected meanwhile
+		if len(self.data.remote_release_queue) > 0:
+			self.data.remote_buffer_release(self.rpc_client)
+
+		return self.__handle_call__(args, self.__handle_call_on_server__, self.__handle_call_scalar_on_server__)
+
+
+	def stream(self, args_iterable, depth = 2):
+		"""
+		Calls routine once per tuple of arguments (e.g. per chunk of data), yields return values in order.
+		Up to depth calls are in flight, each one on a connection of its own, so transfers of chunks
+		overlap with the DLL processing another chunk. The DLL is entered by one call of the stream at a time.
+		"""
+
+		if depth < 1:
+			raise ValueError('depth must be at least 1')
+
+		# Has this routine ever been called?
+		if not self.called:
+			self.__configure__()
+			self.called = True
+
+		# Release remote buffers of handles garbage collected meanwhile
+		if len(self.data.remote_release_queue) > 0:
+			self.data.remote_buffer_release(self.rpc_client)
+
+		# Handles on server-side handle_call and handle_call_scalar per connection
+		rpc_clients = self.session.__acquire_rpc_clients__(depth)
+		handles_queue = Queue()
+		for rpc_client in rpc_clients:
+			handles_queue.put((
+				getattr(rpc_client, self.dll.hash_id + '_' + str(self.name) + '_handle_call'),
+				getattr(rpc_client, self.dll.hash_id + '_' + str(self.name) + '_handle_call_scalar')
+				))
+
+		def handle_call_on_connection(args):
+			handles = handles_queue.get()
+			try:
+				return self.__handle_call__(tuple(args), handles[0], handles[1], exclusive = True)
+			finally:
+				handles_queue.put(handles)
+
+		# Log status
+		self.log.out('[routine-client] Streaming calls of routine "%s" with depth %d ...' % (self.name, depth))
+
+		executor = ThreadPoolExecutor(max_workers = depth)
+		futures = deque()
+
+		try:
+
+			# Wait for oldest call once depth is reached, results are yielded in order
+			for args in args_iterable:
+				futures.append(executor.submit(handle_call_on_connection, args))
+				if len(futures) == depth:
+					yield futures.popleft().result()
+
+			while len(futures) > 0:
+				yield futures.popleft().result()
+
+		finally:
+
+			# Stream was closed or failed: drop calls, which have not been started yet
+			for future in futures:
+				future.cancel()
+			executor.shutdown(wait = True)
+
+			# Connections can be used by other streams
+			self.session.__release_rpc_clients__(rpc_clients)
+
+
+	def __handle_call__(self, args, handle_call_on_server, handle_call_scalar_on_server, **kwargs):
+
+		# Objects supporting the buffer protocol are replaced by ctypes arrays sharing their memory
+		if len(self.buffer_d) > 0:
+			args = self.data.arg_list_wrap_buffers(args, self.argtypes_d, self.buffer_d)
+
+		# Fast path: Values only, no definitions, nothing to sync (string buffers must be synced)
+		if self.is_scalar and not (self.has_buffers and any(isinstance(arg, ctypes.Array) for arg in args)):
+			return self.__call_scalar__(args, handle_call_scalar_on_server, **kwargs)
+
 		# Log status
 		self.log.out('[routine-client] ... parameters are "%r". Packing and pushing to server ...' % (args,))
 
 		# Handle memory
 		mem_package_list = self.data.client_pack_memory_list(args, self.memsync_d)
 
-		# Actually call routine in DLL! TODO Handle kw ...
-		return_dict = self.__handle_call_on_server__(
-			self.data.arg_list_pack(args, self.argtypes_d), mem_package_list
-			)
+		# Pack arguments
+		arg_message_list = self.data.arg_list_pack(args, self.argtypes_d)
+
+		# Memory streamed from server is allocated during call
+		stream_mark = self.data.client_begin_stream_call()
+
+		try:
+
+			# Actually call routine in DLL! TODO Handle kw ...
+			try:
+				return_dict = handle_call_on_server(arg_message_list, mem_package_list, **kwargs)
+			finally:
+				# Streamed memory is not accessed by server anymore
+				self.data.client_close_memory_list(mem_package_list)
+
+			# Log status
+			self.log.out('[routine-client] ... received feedback from server, unpacking & syncing arguments ...')
+
+			# Unpack return dict, sync arguments and memory
+			return self.__unpack_return_dict__(
+				args, return_dict, self.data.arg_list_local_indices(self.mutable_d, arg_message_list)
+				)
+
+		finally:
+
+			# Memory streamed from server, which has not been handed over, is dropped
+			self.data.client_end_stream_call(stream_mark)
+
+
+	def __call_scalar__(self, args, handle_call_scalar_on_server, **kwargs):
 
 		# Log status
-		self.log.out('[routine-client] ... received feedback from server, unpacking & syncing arguments ...')
+		self.log.out('[routine-client] ... parameters are "%r". Pushing values to server ...' % (args,))
+
+		# Function has not been configured, pass arguments as they are (like arg_list_pack)
+		if len(self.argtypes_d) == 0:
+			return_value = handle_call_scalar_on_server(*args, **kwargs)
+
+		# Number of arguments is just wrong
+		elif len(args) != len(self.argtypes_d):
+			raise TypeError
+
+		# Strip ctypes types, return value is a fundamental Python type or None
+		else:
+			return_value = handle_call_scalar_on_server(*[
+				(arg.value if hasattr(arg, 'value') else arg) for arg in args
+				], **kwargs)
+
+		# No memsync here, a void return value means restype None (server returns c_void_p)
+		if self.restype_d['g'] == GROUP_VOID:
+			return None
+
+		return return_value
+
+
+	def __unpack_return_dict__(self, args, return_dict, local_indices):
 
 		# Unpack return dict (call may have failed partially only)
-		self.data.arg_list_sync(
-			args,
-			self.data.arg_list_unpack(return_dict['args'], self.argtypes_d),
-			self.argtypes_d
-			)
+		self.data.arg_list_sync_mutable(args, return_dict['args'], self.argtypes_d, local_indices)
 
 		# Log status
 		self.log.out('[routine-client] ... unpacking return value ...')
@@ -159,34 +304,72 @@ class routine_client_class():
 
 	def __configure__(self):
 
+		# Pack definitions locally
+		argtypes_d, restype_d, memsync_d_packed, memsync_d = self.__pack_configuration__(
+			self.__argtypes__, self.__restype__, self.__memsync__
+			)
+
+		# Pass argument and return value types as strings ...
+		result = self.__configure_on_server__(
+			argtypes_d, restype_d, memsync_d_packed
+			)
+
+		# Server accepted definitions, use them on client side
+		self.__load_configuration__(argtypes_d, restype_d, memsync_d_packed, memsync_d)
+
+
+	def __load_configuration__(self, argtypes_d, restype_d, memsync_d_packed, memsync_d = None):
+
+		# Use ready-made definitions (e.g. from manifest cache) instead of packing them
+		self.argtypes_d = argtypes_d
+		self.restype_d = restype_d
+
+		# Compile memsync statements from a copy if required, the packed version is shipped
+		if memsync_d is None:
+			memsync_d = self.data.unpack_definition_memsync(deepcopy(memsync_d_packed))
+		self.memsync_d = memsync_d
+
+		# Classify signature
+		self.is_scalar = self.data.is_scalar_definition(self.argtypes_d, self.restype_d, self.memsync_d)
+		self.has_buffers = any(arg_d['b'] for arg_d in self.argtypes_d)
+
+		# Indices of arguments, which are synced after call
+		self.mutable_d = self.data.get_mutable_definition_indices(self.argtypes_d)
+
+		# Indices of arguments, which can be passed objects supporting the buffer protocol
+		self.buffer_d = self.data.get_buffer_definition_indices(self.argtypes_d)
+
+
+	def __pack_configuration__(self, argtypes, restype, memsync):
+
+		# Only packs, the routine is not changed (see __load_configuration__).
+		# Returns shipped definitions and compiled memsync_d for client side.
+
 		# Prepare list of arguments by parsing them into list of dicts (TODO field name / kw)
-		self.argtypes_d = self.data.pack_definition_argtypes(self.__argtypes__)
+		argtypes_d = self.data.pack_definition_argtypes(argtypes)
 
 		# Parse return type
-		self.restype_d = self.data.pack_definition_returntype(self.__restype__)
+		restype_d = self.data.pack_definition_returntype(restype)
 
 		# Compile memsync statements HACK just unpack the user input ...
-		self.memsync_d = self.data.unpack_definition_memsync(self.__memsync__)
+		memsync_d = self.data.unpack_definition_memsync(memsync)
 
 		# Pack memsync_d again for shipping
-		memsync_d_packed = self.data.pack_definition_memsync(self.memsync_d)
+		memsync_d_packed = self.data.pack_definition_memsync(memsync_d)
 
 		# Adjust definitions with void pointers
 		self.data.apply_memsync_to_argtypes_and_restype_definition(
-			self.memsync_d, self.argtypes_d, self.restype_d
+			memsync_d, argtypes_d, restype_d
 			)
 
 		# Log status
-		self.log.out(' memsync: \n%s' % pf(self.memsync_d))
-		self.log.out(' argtypes: \n%s' % pf(self.__argtypes__))
-		self.log.out(' argtypes_d: \n%s' % pf(self.argtypes_d))
-		self.log.out(' restype: \n%s' % pf(self.__restype__))
-		self.log.out(' restype_d: \n%s' % pf(self.restype_d))
+		self.log.out(' memsync: \n%s' % pf(memsync_d))
+		self.log.out(' argtypes: \n%s' % pf(argtypes))
+		self.log.out(' argtypes_d: \n%s' % pf(argtypes_d))
+		self.log.out(' restype: \n%s' % pf(restype))
+		self.log.out(' restype_d: \n%s' % pf(restype_d))
 
-		# Pass argument and return value types as strings ...
-		result = self.__configure_on_server__(
-			self.argtypes_d, self.restype_d, memsync_d_packed
-			)
+		return argtypes_d, restype_d, memsync_d_packed, memsync_d
 
 
 	@property
@@ -32,6 +32,7 @@ specific language governing rights and limitations under the License.
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 from pprint import pformat as pf
+from threading import Lock
 import traceback
 
 
@@ -62,8 +63,11 @@ class routine_server_class():
 		# Set routine handler
 		self.handler = routine_handler
 
+		# Calls of streams enter the DLL one at a time
+		self.lock = Lock()
 
-	def __call__(self, arg_message_list, arg_memory_list):
+
+	def __call__(self, arg_message_list, arg_memory_list, exclusive = False):
 		"""
 		TODO: Optimize for speed!
 		"""
@@ -71,28 +75,13 @@ class routine_server_class():
 		# Log status
 		self.log.out('[routine-server] Trying call routine "%s" ...' % self.name)
 
-		try:
-
-			# Unpack passed arguments, handle pointers and structs ...
-			args_list = self.data.arg_list_unpack(arg_message_list, self.argtypes_d)
-
-			# Unpack pointer data
-			self.data.server_unpack_memory_list(args_list, arg_memory_list, self.memsync_d)
-
-			# Default return value
-			return_value = None
-
-		except Exception as e:
-
-			# Push traceback to log
-			self.log.err(traceback.format_exc())
-
-			raise e
+		# Unpack arguments and memory
+		args_list = self.__unpack_arguments__(arg_message_list, arg_memory_list)
 
 		try:
 
 			# Call into dll
-			return_value = self.handler(*tuple(args_list))
+			return_value = self.__call_handler__(args_list, exclusive)
 
 		except Exception as e:
 
@@ -102,22 +91,34 @@ class routine_server_class():
 			# Push traceback to log
 			self.log.err(traceback.format_exc())
 
-			# Pack return package and return it
+			# Buffers are not reused
+			self.data.server_discard_memory_list(arg_memory_list)
+
+			# Pack return package and return it (arguments unchanged, nothing to sync)
 			return {
-				'args': arg_message_list,
-				'return_value': return_value,
+				'args': [],
+				'return_value': None,
 				'memory': arg_memory_list,
 				'success': False,
 				'exception': e
 				}
 
+		# Pack arguments (only those not residing here), return value and memory
+		return self.__pack_return_dict__(
+			args_list, return_value, arg_memory_list,
+			self.data.arg_list_local_indices(self.mutable_d, arg_message_list)
+			)
+
+
+	def __pack_return_dict__(self, args_list, return_value, arg_memory_list, local_indices):
+
 		try:
 
 			# Pack memory for return
 			self.data.server_pack_memory_list(args_list, return_value, arg_memory_list, self.memsync_d)
 
-			# Get new arg message list
-			arg_message_list = self.data.arg_list_pack(args_list, self.argtypes_d)
+			# Get new arg message list (only arguments, which can have changed)
+			arg_message_list = self.data.arg_list_pack_mutable(args_list, self.argtypes_d, local_indices)
 
 			# Get new return message list
 			return_message = self.data.return_msg_pack(return_value, self.restype_d)
@@ -145,11 +146,71 @@ class routine_server_class():
 			raise e
 
 
+	def __unpack_arguments__(self, arg_message_list, arg_memory_list, substitutes = None):
+
+		try:
+
+			# Unpack passed arguments, handle pointers and structs ...
+			args_list = self.data.arg_list_unpack(arg_message_list, self.argtypes_d)
+
+			# Objects from earlier calls (pipelines) replace placeholders, memory depends on them
+			if substitutes is not None:
+				for index, value in substitutes.items():
+					args_list[index] = value
+
+			# Unpack pointer data
+			self.data.server_unpack_memory_list(args_list, arg_memory_list, self.memsync_d)
+
+		except Exception as e:
+
+			# Push traceback to log
+			self.log.err(traceback.format_exc())
+
+			raise e
+
+		return args_list
+
+
+	def __call_scalar__(self, *args, exclusive = False):
+		"""
+		Fast path for routines, which only take and return fundamental types by value
+		(classified by client). Arguments and return value are plain values, ctypes converts.
+		"""
+
+		try:
+
+			# Call into dll
+			return self.__call_handler__(args, exclusive)
+
+		except Exception as e:
+
+			# Log status
+			self.log.out('[routine-server] ... call of "%s" failed!' % self.name)
+
+			# Push traceback to log
+			self.log.err(traceback.format_exc())
+
+			raise e
+
+
+	def __call_handler__(self, args, exclusive):
+
+		# Other calls of the same stream may be transferred meanwhile
+		if exclusive:
+			with self.lock:
+				return self.handler(*tuple(args))
+
+		return self.handler(*tuple(args))
+
+
 	def __configure__(self, argtypes_d, restype_d, memsync_d):
 
 		# Store argtype definition dict
 		self.argtypes_d = argtypes_d
 
+		# Indices of arguments, which are synced after call
+		self.mutable_d = self.data.get_mutable_definition_indices(argtypes_d)
+
 		# Store return value definition dict
 		self.restype_d = restype_d
 
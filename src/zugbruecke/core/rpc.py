@@ -31,20 +31,67 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from itertools import count
 from multiprocessing.connection import (
 	Client,
 	Listener
 	)
-from threading import Thread
+from threading import (
+	local,
+	Lock,
+	RLock,
+	Thread
+	)
 import time
 import traceback
 
 
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Handle of function translating names into handles, always registered first
+HANDLE_GET_HANDLE = 0
+
+# Kinds of frames on a connection: Requests (both directions if nested) and answers
+FRAME_CALL = 0
+FRAME_RETURN = 1
+
+
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # CLASSES AND CONSTRUCTOR ROUTINES
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-def mp_client_safe_connect(socket_path, authkey, timeout_after_seconds = 30, wait_for_seconds = 0.01):
+def call_on_connection(connection, handle, args, kwargs, handler = None):
+
+	# Send request to other side
+	connection.send((FRAME_CALL, handle, args, kwargs))
+
+	# Other side may send requests of its own (e.g. callbacks) before it answers
+	while True:
+
+		# Receive frame
+		frame = connection.recv()
+
+		# Answer to request, done
+		if frame[0] == FRAME_RETURN:
+			break
+
+		# Nested request, served in this thread by handler
+		if handler is not None:
+			handler.serve_frame(connection, frame)
+		else:
+			connection.send((FRAME_RETURN, RuntimeError('no handler for nested request')))
+
+	# If the answer is an error, raise it
+	if isinstance(frame[1], Exception):
+		raise frame[1]
+
+	# Return answer
+	return frame[1]
+
+
+def mp_client_safe_connect(socket_path, authkey, timeout_after_seconds = 30, wait_for_seconds = 0.01, handler = None):
 
 	# Already waited for ...
 	started_waiting_at = time.time()
@@ -55,7 +102,7 @@ def mp_client_safe_connect(socket_path, authkey, timeout_after_seconds = 30, wai
 		# Try to connect to server and get its status
 		try:
 			# Fire up xmlrpc client
-			mp_client = mp_client_class(socket_path, authkey)
+			mp_client = mp_client_class(socket_path, authkey, handler)
 			# Get status from server and return handle
 			if mp_client.__get_handler_status__():
 				return mp_client
@@ -76,50 +123,146 @@ def mp_client_safe_connect(socket_path, authkey, timeout_after_seconds = 30, wai
 class mp_client_class:
 
 
-	def __init__(self, socket_path, authkey):
+	def __init__(self, socket_path, authkey, handler = None):
 
 		# Start new client on top of socket
 		self.client = Client(socket_path, authkey = authkey.encode('utf-8'))
 
+		# Cache for integer handles of functions on server: name -> handle
+		self.handles = {}
+
+		# Serves nested requests (callbacks) coming back while waiting for an answer, likely None
+		self.handler = handler
+
+		# One request at a time per connection, nested requests of the same thread pass
+		self.lock = RLock()
+
+
+	def __getattr__(self, name):
+
+		# Handler routine in __getattr__ namespace
+		def do_rpc(*args, **kwargs):
+
+			# Get handle once, functions may be registered on server after this point
+			handle = self.handles.get(name, None)
+			if handle is None:
+				handle = self.__call_handle__(HANDLE_GET_HANDLE, (name,), {})
+				self.handles[name] = handle
+
+			return self.__call_handle__(handle, args, kwargs)
+
+		# Return pointer to handler routine
+		return do_rpc
+
+
+	def close(self):
+
+		# Server stops serving this connection
+		self.client.close()
+
+
+	def forget(self, name):
+
+		# Function has been unregistered on server
+		self.handles.pop(name, None)
+
+
+	def __call_handle__(self, handle, args, kwargs):
+
+		with self.lock:
+			return call_on_connection(self.client, handle, args, kwargs, self.handler)
+
+
+class mp_nested_client_class:
+	"""
+	Sends requests back through the connection, on which the current thread is serving
+	a request, i.e. as nested frames. Threads without one use the fallback client.
+	"""
+
+
+	def __init__(self, handler, fallback_client):
+
+		# Handler serving the outer requests
+		self.handler = handler
+
+		# Client with a connection of its own
+		self.fallback_client = fallback_client
+
+		# Cache for integer handles of functions on other side: name -> handle
+		self.handles = {}
+
 
 	def __getattr__(self, name):
 
 		# Handler routine in __getattr__ namespace
 		def do_rpc(*args, **kwargs):
 
-			# Send request to server
-			self.client.send((name, args, kwargs))
-			# Receive answer
-			result = self.client.recv()
+			# Connection of outer request served by this thread
+			connection = self.handler.get_connection()
+			if connection is None:
+				return getattr(self.fallback_client, name)(*args, **kwargs)
 
-			# If the answer is an error, raise it
-			if isinstance(result, Exception):
-				raise result
+			# Get handle once
+			handle = self.handles.get(name, None)
+			if handle is None:
+				handle = call_on_connection(connection, HANDLE_GET_HANDLE, (name,), {}, self.handler)
+				self.handles[name] = handle
 
-			# Return answer
-			return result
+			return call_on_connection(connection, handle, args, kwargs, self.handler)
 
 		# Return pointer to handler routine
 		return do_rpc
 
 
+	def forget(self, name):
+
+		# Function has been unregistered on other side
+		self.handles.pop(name, None)
+		self.fallback_client.forget(name)
+
+
 class mp_server_handler_class:
 
 
 	def __init__(self):
 
-		# cache for registered functions
+		# cache for registered functions: name -> handle
 		self.__functions__ = {}
 
+		# registered functions by handle
+		self.__handles__ = {}
+
+		# Handles are never reused, the other side may hold on to the handle of an unregistered function
+		self.__handle_counter__ = count()
+
+		# (Un-) registration may happen in any thread
+		self.__lock__ = Lock()
+
+		# Connection served by current thread
+		self.__local__ = local()
+
+		# Method for translating names into handles, must be first (HANDLE_GET_HANDLE)
+		self.register_function(self.__get_handle__)
+
 		# Method for verifying server status
 		self.register_function(self.__get_handler_status__)
 
 
+	def __get_handle__(self, function_name):
+
+		return self.__functions__[function_name]
+
+
 	def __get_handler_status__(self):
 
 		return True
 
 
+	def get_connection(self):
+
+		return getattr(self.__local__, 'connection', None)
+
+
 	def register_function(self, function_pointer, public_name = None):
 
 		# Is there a custom public name?
@@ -128,31 +271,65 @@ class mp_server_handler_class:
 		else:
 			function_name = function_pointer.__name__
 
-		# Register function in dict
-		self.__functions__[function_name] = function_pointer
+		with self.__lock__:
+
+			# Re-registration of name keeps handle, new names get a new handle
+			handle = self.__functions__.get(function_name, None)
+			if handle is None:
+				handle = next(self.__handle_counter__)
+				self.__functions__[function_name] = handle
+
+			# Register function by handle
+			self.__handles__[handle] = function_pointer
+
+		return handle
+
+
+	def unregister_function(self, function_name):
+
+		with self.__lock__:
+
+			# Unknown names are ignored
+			handle = self.__functions__.pop(function_name, None)
+			if handle is None:
+				return
+
+			# Calls with this handle fail from now on
+			del self.__handles__[handle]
 
 
 	def handle_connection(self, connection_client):
 
+		# Nested requests from this thread go through this connection
+		self.__local__.connection = connection_client
+
 		try:
 
 			while True:
 
-				# Receive the incomming message
-				function_name, args, kwargs = connection_client.recv()
-
-				# Run the RPC and send a response
-				try:
-					r = self.__functions__[function_name](*args,**kwargs)
-					connection_client.send(r)
-				except Exception as e:
-					connection_client.send(e)
+				# Receive the incomming message and serve it
+				self.serve_frame(connection_client, connection_client.recv())
 
 		except EOFError:
 
 			pass
 
 
+	def serve_frame(self, connection_client, frame):
+
+		_, handle, args, kwargs = frame
+
+		# Run the RPC and send a response
+		try:
+			function_pointer = self.__handles__.get(handle, None)
+			if function_pointer is None:
+				raise KeyError('no function registered with handle %d' % handle)
+			r = function_pointer(*args,**kwargs)
+			connection_client.send((FRAME_RETURN, r))
+		except Exception as e:
+			connection_client.send((FRAME_RETURN, e))
+
+
 class mp_server_class():
 
 
@@ -179,6 +356,7 @@ class mp_server_class():
 
 		# Directly pass functions into handler
 		self.register_function = self.handler.register_function
+		self.unregister_function = self.handler.unregister_function
 
 		# Status log
 		if self.log is not None:
@@ -37,9 +37,13 @@ from ctypes import (
 	_FUNCFLAG_USE_ERRNO,
 	_FUNCFLAG_USE_LASTERROR
 	)
+import inspect
 import os
 import signal
+import textwrap
+from threading import Lock
 import time
+import types
 
 from .const import _FUNCFLAG_STDCALL
 from .config import get_module_config
@@ -51,6 +55,9 @@ from .lib import (
 	get_location_of_file
 	)
 from .log import log_class
+from .pipeline_client import pipeline_client_class
+from .python_client import python_module_client_class
+from .remote_buffer import remote_buffer_class
 from .rpc import (
 	mp_client_safe_connect,
 	mp_server_class
@@ -74,6 +81,32 @@ class session_client_class():
 		self.__init_stage_1__(parameter, force)
 
 
+	def create_pipeline(self):
+		"""
+		Returns new, empty pipeline of calls, which is executed on the Wine side
+		with one single round trip.
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		return pipeline_client_class(self)
+
+
+	def create_remote_buffer(self, init):
+		"""
+		Allocates a buffer on the Wine side, which persists across calls. init is
+		either its size in bytes or its initial contents (bytes or ctypes object).
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		return remote_buffer_class(self, init)
+
+
 	def ctypes_FormatError(self, code = None):
 
 		# If in stage 1, fire up stage 2
@@ -160,6 +193,44 @@ class session_client_class():
 		return self.data.generate_callback_decorator(flags, restype, *argtypes)
 
 
+	def get_callback_statistics(self, callback):
+		"""
+		Returns statistics of memoization of a callback (see memoize attribute of
+		function pointer types) on the Wine side or None if it has not been called.
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		return self.rpc_client.get_callback_statistics(self.data.get_callback_name(callback))
+
+
+	def get_memory_pool_statistics(self):
+		"""
+		Returns statistics of the pool of buffers for memsync on the Wine side.
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		return self.rpc_client.get_memory_pool_statistics()
+
+
+	def invalidate_callback(self, callback):
+		"""
+		Drops memoized results of a callback on the Wine side, e.g. because
+		they change between calls of routines.
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		self.rpc_client.invalidate_callback(self.data.get_callback_name(callback))
+
+
 	def load_library(self, dll_name, dll_type, dll_param = {}):
 
 		# If in stage 1, fire up stage 2
@@ -216,6 +287,42 @@ class session_client_class():
 		return self.dll_dict[dll_name]
 
 
+	def load_python_module(self, module, name = None):
+		"""
+		Runs Python code in the Wine Python interpreter. module is either a Python
+		module, a path to a Python file or source code. Returns handle on module,
+		its public functions are callable through it.
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		# Python module
+		if isinstance(module, types.ModuleType):
+			source = inspect.getsource(module)
+			if name is None:
+				name = module.__name__.split('.')[-1]
+		# Python file
+		elif module.endswith('.py') and os.path.isfile(module):
+			with open(module, 'r') as f:
+				source = f.read()
+			if name is None:
+				name = os.path.splitext(os.path.basename(module))[0]
+		# Source code
+		else:
+			source = module
+			if name is None:
+				name = 'zugbruecke_module'
+
+		# Identical modules share handles
+		module_key = (name, source)
+		if module_key not in self.python_module_dict.keys():
+			self.python_module_dict[module_key] = python_module_client_class(self, name, source)
+
+		return self.python_module_dict[module_key]
+
+
 	def path_unix_to_wine(self, in_path):
 
 		# If in stage 1, fire up stage 2
@@ -236,11 +343,62 @@ class session_client_class():
 		return self.rpc_client.path_wine_to_unix(in_path)
 
 
+	def portable_callback(self, function, name = None):
+		"""
+		Transfers a self-contained Python function (or its source code and name)
+		to the Wine side. Returns handle, which can be passed in place of a callback.
+		It is called directly by the DLL as a native callback on the Wine side.
+		"""
+
+		# Source code and name of function
+		if isinstance(function, str):
+			if name is None:
+				raise ValueError('name of function in source code required')
+			source = function
+		else:
+			source = textwrap.dedent(inspect.getsource(function))
+			name = function.__name__
+			# Decorators are not available on the Wine side
+			lines = source.split('\n')
+			while len(lines) > 0 and lines[0].startswith('@'):
+				lines.pop(0)
+			source = '\n'.join(lines)
+
+		return getattr(self.load_python_module(source, name = name), name)
+
+
+	def release_callback(self, callback):
+		"""
+		Unregisters a callback on both sides right away. Otherwise, this happens
+		once the callback is garbage collected (with the next callback passed).
+		"""
+
+		# If in stage 1, fire up stage 2
+		if self.stage == 1:
+			self.__init_stage_2__()
+
+		self.data.release_callback(callback)
+
+
 	def set_parameter(self, parameter):
 
+		# Chunks must not be empty
+		if parameter.get('memsync_stream_chunk_size', 1) <= 0:
+			raise ValueError('memsync_stream_chunk_size must be positive')
+
 		self.p.update(parameter)
 		self.rpc_client.set_parameter(parameter)
 
+		# Buffers of callbacks on this side
+		if 'memory_pool_size' in parameter.keys():
+			self.data.memory_pool.set_max_size(parameter['memory_pool_size'])
+
+		# Memory streamed by routines on this side
+		if 'memsync_stream_threshold' in parameter.keys():
+			self.data.stream_threshold = parameter['memsync_stream_threshold']
+		if 'memsync_stream_chunk_size' in parameter.keys():
+			self.data.stream_chunk_size = parameter['memsync_stream_chunk_size']
+
 
 	def terminate(self):
 
@@ -253,6 +411,9 @@ class session_client_class():
 			# Only if in stage 2:
 			if self.stage == 2:
 
+				# Close connections kept for streams, their threads on the server end
+				self.__close_rpc_clients__()
+
 				# Wait for server to appear
 				self.__wait_for_server_status_change__(target_status = False)
 
@@ -275,11 +436,43 @@ class session_client_class():
 			self.up = False
 
 
+	def __acquire_rpc_clients__(self, number):
+
+		# Connections are not shared, up to the largest depth of streams are kept for reuse once released
+		rpc_clients = []
+		with self.rpc_client_lock:
+			self.rpc_client_max = max(self.rpc_client_max, number)
+		while len(rpc_clients) < number:
+			try:
+				rpc_clients.append(self.rpc_client_list.pop())
+			except IndexError:
+				rpc_clients.append(mp_client_safe_connect(
+					('localhost', self.p['port_socket_wine']),
+					'zugbruecke_wine',
+					handler = self.rpc_server.handler
+					))
+
+		return rpc_clients
+
+
+	def __close_rpc_clients__(self):
+
+		# Connections released later on are closed right away
+		with self.rpc_client_lock:
+			self.rpc_client_max = 0
+			while len(self.rpc_client_list) > 0:
+				self.rpc_client_list.pop().close()
+
+
 	def __init_stage_1__(self, parameter, force_stage_2):
 
 		# Fill empty parameters with default values and/or config file contents
 		self.p = get_module_config(parameter)
 
+		# Chunks must not be empty
+		if self.p['memsync_stream_chunk_size'] <= 0:
+			raise ValueError('memsync_stream_chunk_size must be positive')
+
 		# Get and set session id
 		self.id = self.p['id']
 
@@ -298,11 +491,30 @@ class session_client_class():
 		self.dir_cwd = os.getcwd()
 
 		# Set data cache and parser
-		self.data = data_class(self.log, is_server = False, callback_server = self.rpc_server)
+		self.data = data_class(
+			self.log, is_server = False, callback_server = self.rpc_server,
+			memory_pool_size = self.p['memory_pool_size'],
+			stream_threshold = self.p['memsync_stream_threshold'],
+			stream_chunk_size = self.p['memsync_stream_chunk_size']
+			)
+
+		# Expose memory streamed by session server during calls
+		for routine in ['allocate', 'read', 'write']:
+			self.rpc_server.register_function(
+				getattr(self.data, 'memsync_stream_' + routine), 'memsync_stream_' + routine
+				)
+
+		# Additional connections to server (e.g. for streams of calls), not in use
+		self.rpc_client_list = []
+		self.rpc_client_max = 0
+		self.rpc_client_lock = Lock()
 
 		# Set up a dict for loaded dlls
 		self.dll_dict = {}
 
+		# Start dict for Python modules on Wine side
+		self.python_module_dict = {}
+
 		# Mark session as up
 		self.up = True
 
@@ -330,12 +542,15 @@ class session_client_class():
 		# Log status
 		self.log.out('[session-client] STARTING (STAGE 2) ...')
 
-		# Install wine-python
-		setup_wine_python(self.p['arch'], self.p['version'], self.p['dir'])
+		# Wine and Wine-Python are not required in loopback mode
+		if not self.p['loopback']:
 
-		# Initialize Wine session
-		self.dir_wineprefix = set_wine_env(self.p['dir'], self.p['arch'])
-		create_wine_prefix(self.dir_wineprefix)
+			# Install wine-python
+			setup_wine_python(self.p['arch'], self.p['version'], self.p['dir'])
+
+			# Initialize Wine session
+			self.dir_wineprefix = set_wine_env(self.p['dir'], self.p['arch'])
+			create_wine_prefix(self.dir_wineprefix)
 
 		# Prepare python command for ctypes server or interpreter
 		self.__prepare_python_command__()
@@ -349,6 +564,9 @@ class session_client_class():
 		# Try to connect to Wine side
 		self.__start_rpc_client__()
 
+		# Callbacks, which are gone, are released on Wine side through this client
+		self.data.callback_client = self.rpc_client
+
 		# Set current stage to 2
 		self.stage = 2
 
@@ -356,6 +574,18 @@ class session_client_class():
 		self.log.out('[session-client] STARTED (STAGE 2).')
 
 
+	def __release_rpc_clients__(self, rpc_clients):
+
+		with self.rpc_client_lock:
+
+			# Keep connections for reuse unless there are enough or session is going down
+			for rpc_client in rpc_clients:
+				if len(self.rpc_client_list) < self.rpc_client_max:
+					self.rpc_client_list.append(rpc_client)
+				else:
+					rpc_client.close()
+
+
 	def __set_server_status__(self, status):
 
 		# Interface for session server through RPC
@@ -364,10 +594,11 @@ class session_client_class():
 
 	def __start_rpc_client__(self):
 
-		# Fire up xmlrpc client
+		# Fire up xmlrpc client, callbacks during calls are served by the calling thread
 		self.rpc_client = mp_client_safe_connect(
 			('localhost', self.p['port_socket_wine']),
-			'zugbruecke_wine'
+			'zugbruecke_wine',
+			handler = self.rpc_server.handler
 			)
 
 
@@ -404,7 +635,11 @@ class session_client_class():
 			'--port_socket_wine', str(self.p['port_socket_wine']),
 			'--port_socket_unix', str(self.p['port_socket_unix']),
 			'--log_level', str(self.p['log_level']),
-			'--log_write', str(int(self.p['log_write']))
+			'--log_write', str(int(self.p['log_write'])),
+			'--loopback', str(int(self.p['loopback'])),
+			'--memory_pool_size', str(self.p['memory_pool_size']),
+			'--memsync_stream_threshold', str(self.p['memsync_stream_threshold']),
+			'--memsync_stream_chunk_size', str(self.p['memsync_stream_chunk_size'])
 			]
 
 
@@ -37,10 +37,14 @@ import traceback
 
 from .data import data_class
 from .dll_server import dll_server_class
+from .lib import get_hash_of_string
 from .log import log_class
 from .path import path_class
+from .pipeline_server import pipeline_server_class
+from .python_server import python_module_server_class
 from .rpc import (
 	mp_client_safe_connect,
+	mp_nested_client_class,
 	mp_server_class
 	)
 
@@ -73,23 +77,38 @@ class session_server_class:
 		# Mark session as up
 		self.up = True
 
-		# Offer methods for converting paths
-		path = path_class()
-		self.path_unix_to_wine = path.unix_to_wine
-		self.path_wine_to_unix = path.wine_to_unix
+		# Loopback mode: Running natively on Unix, not on Wine
+		self.loopback = self.p.get('loopback', False)
+
+		# Offer methods for converting paths (identical paths in loopback mode)
+		if not self.loopback:
+			path = path_class()
+			self.path_unix_to_wine = path.unix_to_wine
+			self.path_wine_to_unix = path.wine_to_unix
+		else:
+			self.path_unix_to_wine = str
+			self.path_wine_to_unix = str
 
 		# Start dict for dll files and routines
 		self.dll_dict = {}
 
-		# Organize all DLL types
-		self.dll_types = {
-			'cdll': ctypes.CDLL,
-			'windll': ctypes.WinDLL,
-			'oledll': ctypes.OleDLL
-			}
+		# Start dict for Python modules sent by Unix side
+		self.python_module_dict = {}
 
-		# Set data cache and parser
-		self.data = data_class(self.log, is_server = True, callback_client = self.rpc_client)
+		# Organize all DLL types
+		if not self.loopback:
+			self.dll_types = {
+				'cdll': ctypes.CDLL,
+				'windll': ctypes.WinDLL,
+				'oledll': ctypes.OleDLL
+				}
+		else:
+			# There is only one calling convention for shared objects
+			self.dll_types = {
+				'cdll': ctypes.CDLL,
+				'windll': ctypes.CDLL,
+				'oledll': ctypes.CDLL
+				}
 
 		# Create server
 		self.rpc_server = mp_server_class(
@@ -99,6 +118,15 @@ class session_server_class:
 			terminate_function = self.__terminate__
 			)
 
+		# Set data cache and parser, callbacks go back through the connection of the call
+		self.data = data_class(
+			self.log, is_server = True,
+			callback_client = mp_nested_client_class(self.rpc_server.handler, self.rpc_client),
+			memory_pool_size = self.p['memory_pool_size'],
+			stream_threshold = self.p['memsync_stream_threshold'],
+			stream_chunk_size = self.p['memsync_stream_chunk_size']
+			)
+
 		# Register call: Accessing a dll
 		self.rpc_server.register_function(self.__load_library__, 'load_library')
 		# Expose routine for updating parameters
@@ -113,6 +141,28 @@ class session_server_class:
 		# Expose ctypes stuff
 		self.__expose_ctypes_routines__()
 
+		# Expose management of remote buffers
+		for routine in ['allocate', 'free', 'free_list', 'read', 'retain', 'write']:
+			self.rpc_server.register_function(
+				getattr(self.data, 'remote_buffer_' + routine), 'remote_buffer_' + routine
+				)
+
+		# Expose memoization of callbacks
+		self.rpc_server.register_function(self.__get_callback_statistics__, 'get_callback_statistics')
+		self.rpc_server.register_function(self.__invalidate_callback__, 'invalidate_callback')
+
+		# Expose statistics of pool of buffers
+		self.rpc_server.register_function(self.data.memory_pool.get_statistics, 'get_memory_pool_statistics')
+
+		# Expose release of callbacks, which are gone on the Unix side
+		self.rpc_server.register_function(self.data.release_callbacks_on_server, 'release_callbacks')
+
+		# Expose Python modules
+		self.rpc_server.register_function(self.__load_python_module__, 'load_python_module')
+
+		# Expose pipelines of calls
+		self.rpc_server.register_function(pipeline_server_class(self), 'run_pipeline')
+
 		# Status log
 		self.log.out('[session-server] ctypes server is listening on port %d.' % self.p['port_socket_wine'])
 		self.log.out('[session-server] STARTED.')
@@ -136,9 +186,34 @@ class session_server_class:
 			'set_last_error'
 			]:
 
+			# Some of them are not available in loopback mode
+			if not hasattr(ctypes, routine):
+				continue
+
 			self.rpc_server.register_function(getattr(ctypes, routine), 'ctypes_' + routine)
 
 
+	def __get_callback_statistics__(self, func_name):
+		"""
+		Exposed interface
+		"""
+
+		# Callback has not been called yet
+		if func_name not in self.data.cache_dict['func_translator'].keys():
+			return None
+
+		return self.data.cache_dict['func_translator'][func_name].get_statistics()
+
+
+	def __invalidate_callback__(self, func_name):
+		"""
+		Exposed interface
+		"""
+
+		if func_name in self.data.cache_dict['func_translator'].keys():
+			self.data.cache_dict['func_translator'][func_name].invalidate()
+
+
 	def __load_library__(self, dll_name, dll_type, dll_param):
 		"""
 		Exposed interface
@@ -153,11 +228,16 @@ class session_server_class:
 			dll_name, dll_type
 			))
 
+		# Loopback mode: Look for shared object with identical name instead of DLL
+		dll_path = dll_name
+		if self.loopback and dll_path.lower().endswith('.dll'):
+			dll_path = dll_path[:-4] + '.so'
+
 		try:
 
 			# Attach to DLL with ctypes
 			handler = self.dll_types[dll_type](
-				dll_name, mode = dll_param['mode'], handle = None,
+				dll_path, mode = dll_param['mode'], handle = None,
 				use_errno = dll_param['use_errno'],
 				use_last_error = dll_param['use_last_error']
 				)
@@ -189,10 +269,51 @@ class session_server_class:
 		return self.dll_dict[dll_name].hash_id
 
 
+	def __load_python_module__(self, name, source):
+		"""
+		Exposed interface
+		"""
+
+		# Hash name and source as unique ID
+		hash_id = get_hash_of_string(name + '\n' + source)
+
+		# Identical modules are compiled and run only once
+		if hash_id in self.python_module_dict.keys():
+			return hash_id, self.python_module_dict[hash_id].function_names
+
+		# Status log
+		self.log.out('[session-server] Loading Python module "%s" ...' % name)
+
+		try:
+
+			# Compile and run module, export its functions
+			self.python_module_dict[hash_id] = python_module_server_class(self, name, source, hash_id)
+
+		except:
+
+			# Push traceback to log
+			self.log.err(traceback.format_exc())
+
+			raise
+
+		# Log status
+		self.log.out('[session-server] ... loaded.')
+
+		return hash_id, self.python_module_dict[hash_id].function_names
+
+
 	def __set_parameter__(self, parameter):
 
 		self.p.update(parameter)
 
+		if 'memory_pool_size' in parameter.keys():
+			self.data.memory_pool.set_max_size(parameter['memory_pool_size'])
+
+		if 'memsync_stream_threshold' in parameter.keys():
+			self.data.stream_threshold = parameter['memsync_stream_threshold']
+		if 'memsync_stream_chunk_size' in parameter.keys():
+			self.data.stream_chunk_size = parameter['memsync_stream_chunk_size']
+
 
 	def __terminate__(self):
 		"""
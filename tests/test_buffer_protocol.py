@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_buffer_protocol.py: Objects supporting the buffer protocol as pointer and array arguments
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from array import array
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('buffer protocol arguments are a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# FIXTURE(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+@pytest.fixture
+def dll():
+
+	# Own session, routines of shared DLL are configured differently elsewhere
+	session = ctypes.session()
+	yield session.load_library('tests/demo_dll.dll', 'windll')
+	session.terminate()
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_buffer_memsync(dll):
+
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	# Length from memsync, only the first four elements are sorted
+	values = array('f', [5.0, 2.0, 4.0, 1.0, 0.0])
+	bubblesort(values, 4)
+	assert array('f', [1.0, 2.0, 4.0, 5.0, 0.0]) == values
+
+	values = bytearray(array('f', [3.0, 1.0, 2.0]).tobytes())
+	bubblesort(memoryview(values), 3)
+	assert array('f', [1.0, 2.0, 3.0]).tobytes() == values
+
+
+def test_buffer_pointer(dll):
+
+	bubblesort = dll.bubblesort
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	# No memsync, length from buffer
+	values = array('f', [5.0, 2.0, 4.0, 1.0])
+	bubblesort(values, len(values))
+	assert array('f', [1.0, 2.0, 4.0, 5.0]) == values
+
+	# Read-only, copied
+	values = array('f', [3.0, 1.0, 2.0]).tobytes()
+	bubblesort(memoryview(values), 3)
+	assert array('f', [3.0, 1.0, 2.0]).tobytes() == values
+
+	# ctypes arrays travel entirely, too
+	values = (ctypes.c_float * 3)(3.0, 1.0, 2.0)
+	bubblesort(values, 3)
+	assert [1.0, 2.0, 3.0] == values[:]
+
+
+def test_buffer_array(dll):
+
+	gauss_elimination = dll.gauss_elimination
+	gauss_elimination.argtypes = (
+		ctypes.POINTER(ctypes.c_float * 4 * 3),
+		ctypes.POINTER(ctypes.c_float * 3)
+		)
+	gauss_elimination.restype = None
+
+	A = array('f', [1, 2, 3, 2, 1, 1, 1, 2, 3, 3, 1, 0])
+	x = array('f', [0, 0, 0])
+	gauss_elimination(A, x)
+	assert array('f', [5, -6, 3]) == x
+
+
+def test_buffer_char_p(dll):
+
+	replace_letter = dll.replace_letter_in_null_terminated_string_a
+	replace_letter.argtypes = (ctypes.c_char_p, ctypes.c_char, ctypes.c_char)
+	replace_letter.restype = None
+
+	string_buffer = bytearray(b'zugbruecke\0')
+	replace_letter(string_buffer, b'z', b'Z')
+	assert bytearray(b'Zugbruecke\0') == string_buffer
+
+
+def test_buffer_numpy(dll):
+
+	numpy = pytest.importorskip('numpy')
+
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	values = numpy.array([5.0, 2.0, 4.0, 1.0], dtype = numpy.float32)
+	bubblesort(values, len(values))
+	assert [1.0, 2.0, 4.0, 5.0] == values.tolist()
+
+	# Not contiguous
+	with pytest.raises((TypeError, ValueError)):
+		bubblesort(values[::2], 2)
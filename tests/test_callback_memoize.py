@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_callback_memoize.py: Test memoization of callback results on the Wine side
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('memoization of callbacks is a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_callback_memoize():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	conveyor_belt = session.ctypes_WINFUNCTYPE(ctypes.c_int16, ctypes.c_int16)
+	conveyor_belt.memoize = 4
+	sum_elements_from_callback = dll.sum_elements_from_callback
+	sum_elements_from_callback.argtypes = (ctypes.c_int16, conveyor_belt)
+	sum_elements_from_callback.restype = ctypes.c_int16
+
+	DATA = [1, 6, 8, 4, 9, 7, 4, 2, 5, 2]
+	invocations = []
+
+	@conveyor_belt
+	def get_data(index):
+		invocations.append(index)
+		return DATA[index]
+
+	assert session.get_callback_statistics(get_data) is None
+
+	assert 19 == sum_elements_from_callback(4, get_data)
+	assert 19 == sum_elements_from_callback(4, get_data)
+	assert [0, 1, 2, 3] == invocations
+	assert {
+		'hits': 4, 'misses': 4, 'size': 4, 'maxsize': 4, 'prefetched': 0, 'blocks': 0
+		} == session.get_callback_statistics(get_data)
+
+	# Bounded: least recently used results are dropped
+	assert 48 == sum_elements_from_callback(10, get_data)
+	assert 4 == session.get_callback_statistics(get_data)['size']
+	assert 19 == sum_elements_from_callback(4, get_data)
+	assert list(range(10)) + [0, 1, 2, 3] == invocations
+
+	# Results change
+	DATA[0] = 10
+	session.invalidate_callback(get_data)
+	assert 28 == sum_elements_from_callback(4, get_data)
+
+	# Function pointer types are shared
+	conveyor_belt.memoize = 0
+
+	session.terminate()
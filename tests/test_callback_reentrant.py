@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_callback_reentrant.py: Callbacks calling back into the DLL
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# import pytest
+
+import threading
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	import ctypes
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_callback_reentrant():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	conveyor_belt = ctypes.WINFUNCTYPE(ctypes.c_int16, ctypes.c_int16)
+
+	sum_elements_from_callback = dll.sum_elements_from_callback
+	sum_elements_from_callback.argtypes = (ctypes.c_int16, conveyor_belt)
+	sum_elements_from_callback.restype = ctypes.c_int16
+
+	sqrt_int = dll.sqrt_int
+	sqrt_int.argtypes = (ctypes.c_int16,)
+	sqrt_int.restype = ctypes.c_int16
+
+	DATA = [1, 6, 8, 4, 9, 7, 4, 2, 5, 2]
+	threads = set()
+
+	@conveyor_belt
+	def get_inner(index):
+		threads.add(threading.current_thread())
+		return sqrt_int(DATA[index] ** 2)
+
+	@conveyor_belt
+	def get_outer(index):
+		threads.add(threading.current_thread())
+		# Calls back into the DLL, which calls back again
+		return sum_elements_from_callback(index + 1, get_inner)
+
+	assert sum([sum(DATA[:index + 1]) for index in range(4)]) == sum_elements_from_callback(4, get_outer)
+
+	# Callbacks are served by the calling thread
+	assert {threading.current_thread()} == threads
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_callback_release.py: Callbacks are released on both sides
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import gc
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.data import arg_contents
+	from zugbruecke.core.rpc import FRAME_CALL
+elif platform.startswith('win'):
+	pytest.skip('release of callbacks is a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class connection_class:
+
+
+	def __init__(self, sent):
+
+		self.sent = sent
+
+
+	def send(self, message):
+
+		self.sent.append(message)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_callback_release():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	conveyor_belt = session.ctypes_WINFUNCTYPE(ctypes.c_int16, ctypes.c_int16)
+	sum_elements_from_callback = dll.sum_elements_from_callback
+	sum_elements_from_callback.argtypes = (ctypes.c_int16, conveyor_belt)
+	sum_elements_from_callback.restype = ctypes.c_int16
+
+	handler = session.rpc_server.handler
+
+	# A new closure per call, e.g. per request of a service
+	for offset in range(20):
+		assert 10 * offset + 45 == sum_elements_from_callback(10, conveyor_belt(lambda index: index + offset))
+		gc.collect()
+		assert len(session.data.callback_dict) <= 1
+
+	# Dispatch table on Unix side stays flat
+	assert len([name for name in handler.__functions__.keys() if name.startswith('func_')]) <= 1
+	size = len(handler.__handles__)
+
+	@conveyor_belt
+	def get_data(index):
+		return 1
+
+	assert 10 == sum_elements_from_callback(10, get_data)
+	assert len(handler.__handles__) <= size + 1
+
+	# Deterministic release on both sides
+	session.release_callback(get_data)
+	assert len(session.data.callback_dict) == 0
+	assert 0 == session.rpc_client.release_callbacks([])
+
+	# Released callbacks can be passed again, under a new name
+	assert 10 == sum_elements_from_callback(10, get_data)
+
+	class conveyor_belt_data(ctypes.Structure):
+		_fields_ = [
+			('len', ctypes.c_int16),
+			('get_data', conveyor_belt)
+			]
+
+	sum_elements_from_callback_in_struct = dll.sum_elements_from_callback_in_struct
+	sum_elements_from_callback_in_struct.argtypes = (ctypes.POINTER(conveyor_belt_data),)
+	sum_elements_from_callback_in_struct.restype = ctypes.c_int16
+
+	# Fields return new function pointer objects on every access, they are identified by address
+	in_struct = conveyor_belt_data(10, conveyor_belt(lambda index: 2))
+	assert 20 == sum_elements_from_callback_in_struct(in_struct)
+	assert 20 == sum_elements_from_callback_in_struct(in_struct)
+	assert 1 == len(session.data.callback_lru)
+	session.release_callback(in_struct.get_data)
+	assert 0 == len(session.data.callback_lru)
+
+	session.terminate()
+
+
+def test_callback_release_evicted(monkeypatch):
+
+	# Only one callback, which can not be tracked, is kept
+	monkeypatch.setattr(arg_contents, 'CALLBACK_CACHE_SIZE', 1)
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	conveyor_belt = session.ctypes_WINFUNCTYPE(ctypes.c_int16, ctypes.c_int16)
+
+	class conveyor_belt_data(ctypes.Structure):
+		_fields_ = [
+			('len', ctypes.c_int16),
+			('get_data', conveyor_belt)
+			]
+
+	class other_conveyor_belt_data(ctypes.Structure):
+		_fields_ = conveyor_belt_data._fields_
+
+	keep_callback_from_struct = dll.keep_callback_from_struct
+	keep_callback_from_struct.argtypes = (ctypes.POINTER(conveyor_belt_data),)
+	keep_callback_from_struct.restype = None
+
+	call_kept_callback = dll.call_kept_callback
+	call_kept_callback.argtypes = (ctypes.c_int16,)
+	call_kept_callback.restype = ctypes.c_int16
+
+	sum_elements_from_callback_in_struct = dll.sum_elements_from_callback_in_struct
+	sum_elements_from_callback_in_struct.argtypes = (ctypes.POINTER(other_conveyor_belt_data),)
+	sum_elements_from_callback_in_struct.restype = ctypes.c_int16
+
+	# DLL holds on to callback
+	kept = conveyor_belt_data(1, conveyor_belt(lambda index: 3))
+	keep_callback_from_struct(kept)
+	assert 3 == call_kept_callback(0)
+	handle = session.rpc_server.handler.__get_handle__(session.data.get_callback_name(kept.get_data))
+
+	# Another callback, which can not be tracked, evicts the kept one
+	calls = []
+	def get_data(index):
+		calls.append(index)
+		return 5
+	other = other_conveyor_belt_data(2, conveyor_belt(get_data))
+	assert 10 == sum_elements_from_callback_in_struct(other)
+	assert 1 == len(session.data.callback_lru)
+	del calls[:]
+
+	# Handle of evicted callback is not reused, requests with it fail
+	sent = []
+	session.rpc_server.handler.serve_frame(connection_class(sent), (FRAME_CALL, handle, ([], []), {}))
+	assert isinstance(sent[0][1], KeyError)
+
+	# Evicted callback fails on Wine side (return value undefined) instead of calling the new one
+	call_kept_callback(0)
+	assert [] == calls
+
+	session.terminate()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_declare.py: Test bulk declaration of routines
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('declare is a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class Point(ctypes.Structure):
+
+
+	_fields_ = [
+		('x', ctypes.c_double),
+		('y', ctypes.c_double)
+		]
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_declare():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	dll.declare({
+		'subtract_ints': ((ctypes.c_int16, ctypes.c_int16), ctypes.c_int16),
+		'cookbook_distance': ((ctypes.POINTER(Point), ctypes.POINTER(Point)), ctypes.c_double),
+		'cookbook_avg': (
+			(ctypes.POINTER(ctypes.c_double), ctypes.c_int),
+			ctypes.c_double,
+			[{'p': [0], 'l': [1], 't': 'c_double'}]
+			),
+		'square_int': ((ctypes.c_int16,),)
+		})
+
+	assert dll.subtract_ints.called
+	assert dll.subtract_ints.restype is ctypes.c_int16
+
+	assert 3 == dll.subtract_ints(7, 4)
+	assert pytest.approx(4.242640687119285) == dll.cookbook_distance(Point(1, 2), Point(4, 5))
+	values = (ctypes.c_double * 3)(1.0, 2.0, 6.0)
+	assert 3.0 == dll.cookbook_avg(ctypes.cast(values, ctypes.POINTER(ctypes.c_double)), 3)
+	assert 49 == dll.square_int(7)
+
+
+def test_declare_unknown_routine():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	with pytest.raises(AttributeError):
+		dll.declare({
+			'pow_ints': ((ctypes.c_int16, ctypes.c_int16), ctypes.c_int16),
+			'unknown_routine': ((ctypes.c_int16,), ctypes.c_int16)
+			})
+
+	assert 'unknown_routine' not in dll.routines.keys()
+
+
+def test_declare_malformed():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	with pytest.raises(TypeError):
+		dll.declare({'add_ints': ctypes.c_int16})
+	with pytest.raises(TypeError):
+		dll.declare({'add_ints': (ctypes.c_int16,)})
+
+
+def test_declare_failed_keeps_definitions():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	dll.declare({'subtract_ints': ((ctypes.c_int16, ctypes.c_int16), ctypes.c_int16)})
+	argtypes_d = dll.subtract_ints.argtypes_d
+
+	with pytest.raises(AttributeError):
+		dll.declare({
+			'subtract_ints': ((ctypes.c_int32, ctypes.c_int32, ctypes.c_int32), ctypes.c_int32),
+			'unknown_routine': ((ctypes.c_int16,), ctypes.c_int16)
+			})
+
+	assert dll.subtract_ints.restype is ctypes.c_int16
+	assert 2 == len(dll.subtract_ints.argtypes)
+	assert argtypes_d is dll.subtract_ints.argtypes_d
+	assert 3 == dll.subtract_ints(7, 4)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_definition_cache.py: Test cache of packed type definitions
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import gc
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.const import GROUP_FUNDAMENTAL, GROUP_VOID
+elif platform.startswith('win'):
+	pytest.skip('packed definitions only exist on Unix side', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class image_data(ctypes.Structure):
+
+
+	_fields_ = [
+		('data', ctypes.POINTER(ctypes.c_int16)),
+		('width', ctypes.c_int16),
+		('height', ctypes.c_int16)
+		]
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_definition_cache_struct_packed_once():
+
+	data = ctypes.current_session.data
+
+	a = data.pack_definition_argtypes((ctypes.POINTER(image_data),))
+	b = data.pack_definition_argtypes((image_data,))
+
+	assert a[0] is not b[0]
+	assert a[0]['f'] != b[0]['f']
+	assert a[0]['_fields_'] is b[0]['_fields_']
+
+
+def test_definition_cache_memsync_does_not_modify_cache():
+
+	data = ctypes.current_session.data
+
+	memsync_d = data.unpack_definition_memsync([
+		{
+			'p': [0, 'data'],
+			'l': ([0, 'width'], [0, 'height']),
+			'f': 'lambda x, y: x * y',
+			't': 'c_int16'
+			}
+		])
+
+	with_memsync = data.pack_definition_argtypes((ctypes.POINTER(image_data),))
+	data.apply_memsync_to_argtypes_and_restype_definition(
+		memsync_d, with_memsync, data.pack_definition_returntype(None)
+		)
+	without_memsync = data.pack_definition_argtypes((ctypes.POINTER(image_data),))
+
+	assert with_memsync[0]['_fields_'][0]['g'] == GROUP_VOID
+	assert without_memsync[0]['_fields_'][0]['g'] == GROUP_FUNDAMENTAL
+	assert without_memsync[0]['_fields_'][0]['t'] == ctypes.c_int16.__name__
+
+
+def test_definition_cache_dynamic_types_collected():
+
+	data = ctypes.current_session.data
+
+	dynamic_type = type('dynamic_struct', (ctypes.Structure,), {'_fields_': [('x', ctypes.c_int)]})
+	data.pack_definition_argtypes((dynamic_type,))
+	assert dynamic_type in data.cache_dict['packed_definition']
+
+	type_name = data.cache_dict['struct_name'][dynamic_type]
+	assert data.cache_dict['struct_type'][type_name] is dynamic_type
+
+	length = len(data.cache_dict['packed_definition'])
+	del dynamic_type
+	gc.collect()
+
+	assert len(data.cache_dict['packed_definition']) == length - 1
+	assert type_name not in data.cache_dict['struct_type']
+
+	# Name is not reused, server still knows the old struct type by name
+	dynamic_type = type('dynamic_struct', (ctypes.Structure,), {'_fields_': [('x', ctypes.c_double)]})
+	assert type_name != data.pack_definition_returntype(dynamic_type)['t']
+
+
+def test_definition_cache_struct_name_collision():
+
+	data = ctypes.current_session.data
+
+	class colliding_struct(ctypes.Structure):
+		_fields_ = [('x', ctypes.c_int16)]
+	first_type = colliding_struct
+
+	class colliding_struct(ctypes.Structure):
+		_fields_ = [('x', ctypes.c_double)]
+	second_type = colliding_struct
+
+	first_d = data.pack_definition_returntype(first_type)
+	second_d = data.pack_definition_returntype(second_type)
+
+	assert first_d['t'] != second_d['t']
+	assert data.cache_dict['struct_type'][first_d['t']] is first_type
+	assert data.cache_dict['struct_type'][second_d['t']] is second_type
@@ -44,6 +44,10 @@ elif platform.startswith('win'):
 # TEST(s)
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+@pytest.mark.skipif(
+	getattr(getattr(ctypes, 'current_session', None), 'p', {}).get('loopback', False),
+	reason = 'requires stack check of stdcall convention, not available in loopback mode'
+	)
 def test_error_callargs_unconfigured_too_many_args():
 
 	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_header.py: Test bindings generated from C header files
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.header import header_class
+elif platform.startswith('win'):
+	pytest.skip('header parsing is a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+HEADER_PATH = 'demo_dll/demo_dll.h'
+
+HEADER = """
+#ifdef _WIN32
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT
+#endif
+
+/* Comment */
+typedef int32_t bool;
+typedef float *float_p;
+
+typedef struct buffer {
+	const uint8_t *data; // data
+	size_t size;
+	double x, y;
+} buffer_t;
+
+typedef void (__stdcall *notify)(char *message);
+
+EXPORT bool __stdcall process(buffer_t *buffer, float_p values, int n_values, notify callback);
+EXPORT void shutdown(void);
+EXPORT HANDLE get_handle(void);
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_header_parse():
+
+	header = header_class(HEADER)
+
+	assert header.manifest['types'] == [
+		{'struct': 'buffer_t', 'fields': [
+			['data', 'POINTER(c_uint8)'], ['size', 'c_size_t'], ['x', 'c_double'], ['y', 'c_double']
+			]},
+		{'callback': 'notify', 'restype': None, 'argtypes': ['POINTER(c_char)'],
+			'memsync': [{'p': [0], 'n': True}], 'convention': 'stdcall'}
+		]
+	assert header.manifest['routines'] == {
+		'process': {
+			'argtypes': ['POINTER(buffer_t)', 'POINTER(c_float)', 'c_int', 'notify'],
+			'restype': 'c_int32',
+			'memsync': [
+				{'p': [0, 'data'], 'l': [0, 'size'], 't': 'c_uint8'},
+				{'p': [1], 'l': [2], 't': 'c_float'}
+				]
+			},
+		'shutdown': {'argtypes': [], 'restype': None, 'memsync': []}
+		}
+	assert [reason for _, reason in header.skipped] == ['unknown type "HANDLE"']
+
+
+def test_header_demo_dll():
+
+	with open(HEADER_PATH, 'r') as f:
+		routines = header_class(f.read()).manifest['routines']
+
+	assert routines['bubblesort_struct']['memsync'] == [{'p': [0, 'a'], 'l': [0, 'n'], 't': 'c_float'}]
+	assert routines['gauss_elimination']['argtypes'] == ['POINTER(c_float * 4 * 3)', 'POINTER(c_float * 3)']
+	assert routines['replace_letter_in_null_terminated_string_unicode_a']['memsync'] == [{'p': [0], 'n': True, 'w': True}]
+	assert routines['cookbook_distance_pointer']['restype'] == 'POINTER(c_double)'
+
+
+def test_header_load():
+
+	# Own session, bindings would otherwise interfere with routines configured by other tests
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	for _ in range(2): # Second time: manifest from cache
+
+		bindings = dll.load_header(HEADER_PATH)
+
+		assert pytest.approx(2.5) == bindings.cookbook_avg((ctypes.c_double * 4)(1, 2, 3, 4), 4)
+
+		data = bindings.bubblesort_data()
+		data.n = 4
+		data.a = ctypes.cast(ctypes.pointer((ctypes.c_float * 4)(4, 2, 3, 1)), ctypes.POINTER(ctypes.c_float))
+		data_pointer = ctypes.pointer(data)
+		bindings.bubblesort_struct(data_pointer)
+		assert [1.0, 2.0, 3.0, 4.0] == data_pointer.contents.a[:4]
+
+		@bindings.conveyor_belt
+		def get_data(index):
+			return index * 2
+		assert 2 * sum(range(5)) == bindings.sum_elements_from_callback(5, get_data)
+
+	session.terminate()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_manifest.py: Test declarative binding manifests
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import os
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('manifests are a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+MEMSYNC_IMAGE = [
+	{'p': [0, 'data'], 'l': [[0, 'width'], [0, 'height']], 'f': 'lambda x, y: x * y', 't': 'c_int16'},
+	{'p': [1, 'data'], 'l': [[1, 'width'], [1, 'height']], 'f': 'lambda x, y: x * y', 't': 'c_int16'}
+	]
+
+MANIFEST = {
+	'version': 1,
+	'types': [
+		{'struct': 'cookbook_point', 'fields': [['x', 'c_double'], ['y', 'c_double']]},
+		{'struct': 'image_data', 'fields': [['data', 'POINTER(c_int16)'], ['width', 'c_int16'], ['height', 'c_int16']]},
+		{'callback': 'filter_func_type', 'restype': 'c_int16', 'argtypes': ['POINTER(image_data)'], 'memsync': MEMSYNC_IMAGE[:1]}
+		],
+	'routines': {
+		'cookbook_distance': {'argtypes': ['POINTER(cookbook_point)', 'POINTER(cookbook_point)'], 'restype': 'c_double'},
+		'gauss_elimination': {'argtypes': ['POINTER(c_float * 4 * 3)', 'POINTER(c_float * 3)'], 'restype': None},
+		'apply_filter_to_image': {
+			'argtypes': ['POINTER(image_data)', 'POINTER(image_data)', 'filter_func_type'],
+			'restype': None,
+			'memsync': MEMSYNC_IMAGE
+			}
+		}
+	}
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def run_manifest_routines(manifest, point_name = 'cookbook_point', image_name = 'image_data'):
+
+	point_type, image_type = getattr(manifest, point_name), getattr(manifest, image_name)
+
+	assert pytest.approx(4.242640687119285) == manifest.cookbook_distance(
+		point_type(1, 2), point_type(4, 5)
+		)
+
+	A = (ctypes.c_float * 4 * 3)(*(tuple(eq) for eq in [[1, 2, 3, 2], [1, 1, 1, 2], [3, 3, 1, 0]]))
+	x = (ctypes.c_float * 3)()
+	manifest.gauss_elimination(ctypes.pointer(A), ctypes.pointer(x))
+	assert [5.0, -6.0, 3.0] == x[:]
+
+	@manifest.filter_func_type
+	def filter_average(in_buffer):
+		width, height = in_buffer.contents.width, in_buffer.contents.height
+		return sum(in_buffer.contents.data[index] for index in range(width * height)) // (width * height)
+
+	in_image, out_image = image_type(), image_type()
+	in_image.width, in_image.height = 4, 4
+	in_image.data = ctypes.cast(
+		ctypes.pointer((ctypes.c_int16 * 16)(*([9] * 16))), ctypes.POINTER(ctypes.c_int16)
+		)
+	in_pointer, out_pointer = ctypes.pointer(in_image), ctypes.pointer(out_image)
+	manifest.apply_filter_to_image(in_pointer, out_pointer, filter_average)
+	assert [9] * 4 == [out_pointer.contents.data[index] for index in (5, 6, 9, 10)] # inner pixels
+
+
+def test_manifest_dict_and_cache():
+
+	# Own session and names: structures of the same names used by other tests prevent caching
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll')
+	manifest_d = json.loads(json.dumps(MANIFEST).replace(
+		'cookbook_point', 'cache_point').replace('image_data', 'cache_image_data'
+		))
+
+	manifest = dll.load_manifest(manifest_d)
+	assert os.path.isfile(manifest.__get_cache_path__())
+	assert manifest.cookbook_distance is dll.cookbook_distance
+	assert dll.cookbook_distance.called
+	run_manifest_routines(manifest, 'cache_point', 'cache_image_data')
+
+	# Second time: same types, definitions from cache
+	manifest = dll.load_manifest(manifest_d)
+	assert not manifest.name_collision
+	run_manifest_routines(manifest, 'cache_point', 'cache_image_data')
+
+	session.terminate()
+
+
+def test_manifest_file(tmpdir):
+
+	manifest_path = os.path.join(str(tmpdir), 'demo_dll.json')
+	with open(manifest_path, 'w') as f:
+		f.write(json.dumps(MANIFEST))
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	run_manifest_routines(dll.load_manifest(manifest_path))
+
+
+def test_manifest_malformed():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	with pytest.raises(ValueError):
+		dll.load_manifest({'routines': {'square_int': {'argtypes': ['c_int16'], 'restype': 'int'}}})
+	with pytest.raises(ValueError):
+		dll.load_manifest({'routines': {'square_int': {'argtypes': ['__import__("os")']}}})
+	with pytest.raises(ValueError):
+		dll.load_manifest({'types': [{'union': 'foo'}]})
+	with pytest.raises(TypeError):
+		dll.load_manifest({'routines': {'square_int': {'argtypes': 'c_int16'}}})
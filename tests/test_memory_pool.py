@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_memory_pool.py: Buffers for memsync reused across calls
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from threading import Thread
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.data.pool import get_size_class, memory_pool_class
+elif platform.startswith('win'):
+	pytest.skip('pool of buffers is a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_memory_pool_class():
+
+	assert [64, 64, 80, 128, 160, 1024, 1280] == [get_size_class(n) for n in (0, 64, 65, 128, 129, 1024, 1025)]
+
+	pool = memory_pool_class(256)
+
+	buffer = pool.acquire(b'abcdefgh')
+	assert 64 == len(buffer)
+	pool.release(buffer)
+
+	# Same size class, nothing of earlier data is visible
+	assert buffer is pool.acquire(b'xyz')
+	assert b'xyz' + bytes(61) == bytes(buffer)
+	pool.release(buffer)
+
+	# Too large for pool
+	pool.release(pool.acquire(bytes(1000)))
+	assert {'hits': 1, 'misses': 2, 'size': 64, 'maxsize': 256} == pool.get_statistics()
+
+	pool.set_max_size(0)
+	assert 0 == pool.get_statistics()['size']
+
+	# Off: exact length, no statistics
+	buffer = pool.acquire(b'abc')
+	assert b'abc' == bytes(buffer)
+	pool.release(buffer)
+	assert {'hits': 1, 'misses': 2, 'size': 0, 'maxsize': 0} == pool.get_statistics()
+
+
+def test_memory_pool_threads():
+
+	pool = memory_pool_class(4096)
+
+	def work(length):
+		for _ in range(2000):
+			pool.release(pool.acquire(bytes(length)))
+
+	threads = [Thread(target = work, args = (length,)) for length in (10, 100, 500, 1000, 10, 100, 500, 1000)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	# Bookkeeping matches buffers retained
+	statistics = pool.get_statistics()
+	assert statistics['size'] == sum(len(buffer) for buffers in pool.buffer_dict.values() for buffer in buffers)
+	assert statistics['size'] <= statistics['maxsize']
+	assert 16000 == statistics['hits'] + statistics['misses']
+
+
+def test_memory_pool_session():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	def sort(values):
+		values_c = (ctypes.c_float * len(values))(*values)
+		bubblesort(ctypes.cast(ctypes.pointer(values_c), ctypes.POINTER(ctypes.c_float)), len(values))
+		return values_c[:]
+
+	assert [1.0, 2.0, 3.0] == sort([3.0, 1.0, 2.0])
+	assert [1.0, 2.0, 3.0, 4.0] == sort([3.0, 4.0, 1.0, 2.0])
+	assert {'hits': 1, 'misses': 1} == {
+		key: value for key, value in session.get_memory_pool_statistics().items() if key in ('hits', 'misses')
+		}
+
+	# Off
+	session.set_parameter({'memory_pool_size': 0})
+	assert [1.0, 2.0] == sort([2.0, 1.0])
+	assert 1 == session.get_memory_pool_statistics()['hits']
+
+	session.terminate()
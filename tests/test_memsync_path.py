@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_memsync_path.py: Accessors compiled from memsync paths
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.data import data_class
+elif platform.startswith('win'):
+	pytest.skip('memsync path accessors are a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class log_class:
+
+
+	def out(self, message):
+		pass
+
+
+	def err(self, message):
+		pass
+
+
+class image_data(ctypes.Structure):
+
+
+	_fields_ = [
+		('data', ctypes.POINTER(ctypes.c_int16)),
+		('width', ctypes.c_int16),
+		('height', ctypes.c_int16)
+		]
+
+
+def get_memsync_d(**memsync_d):
+
+	return data_class(log_class(), is_server = False).unpack_definition_memsync([memsync_d])[0]
+
+
+def get_image(width, height):
+
+	image = image_data()
+	image.width, image.height = width, height
+	image.data = ctypes.cast(
+		ctypes.pointer((ctypes.c_int16 * (width * height))()), ctypes.POINTER(ctypes.c_int16)
+		)
+
+	return image
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_memsync_path_argument():
+
+	memsync_d = get_memsync_d(p = [0], l = [1], t = 'c_int16')
+	buffer = (ctypes.c_int16 * 3)()
+	args = (buffer, ctypes.c_int(3))
+
+	assert memsync_d['_get_pointer'](args) is buffer
+	assert memsync_d['_get_parent'](args) is args
+	assert memsync_d['_get_null_parent'](args) is args
+	assert 3 == memsync_d['_get_length'](args)
+	assert 3 == memsync_d['_get_length']((buffer, 3))
+
+
+def test_memsync_path_struct():
+
+	memsync_d = get_memsync_d(p = [0, 'data'], l = ([0, 'width'], [0, 'height']), f = 'lambda x, y: x * y', t = 'c_int16')
+	image = get_image(4, 3)
+
+	# Struct passed by pointer, by reference and by value
+	for arg in (ctypes.pointer(image), ctypes.byref(image), image):
+		args = (arg,)
+		assert memsync_d['_get_parent'](args) is arg
+		assert ctypes.cast(image.data, ctypes.c_void_p).value == ctypes.cast(
+			memsync_d['_get_pointer'](args), ctypes.c_void_p
+			).value
+		assert 12 == memsync_d['_get_length'](args)
+
+
+def test_memsync_path_pointer_to_pointer():
+
+	memsync_d = get_memsync_d(p = [0, -1], l = [1])
+	pointer = ctypes.pointer(ctypes.c_void_p())
+	args = (pointer, 5)
+
+	assert isinstance(memsync_d['_get_pointer'](args), ctypes.c_void_p)
+	assert memsync_d['_get_parent'](args) is pointer
+	assert memsync_d['_get_null_parent'](args) is args
+
+
+def test_memsync_path_return_value():
+
+	memsync_d = get_memsync_d(p = ['r', 'data'], l = (['r', 'width'], ['r', 'height']), f = 'lambda x, y: x * y', t = 'c_int16')
+	image = get_image(2, 5)
+
+	assert memsync_d['_get_pointer']((), None) is None
+	assert 10 == memsync_d['_get_length']((), ctypes.pointer(image))
+
+
+def test_memsync_path_invalid():
+
+	with pytest.raises(ValueError):
+		get_memsync_d(p = ['x', 0])
+	with pytest.raises(ValueError):
+		get_memsync_d(p = [0, 1.0])
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_memsync_stream.py: Streaming of large memory segments in chunks
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.data import data_class
+elif platform.startswith('win'):
+	pytest.skip('streaming of memory is a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class log_class:
+
+
+	def out(self, message):
+		pass
+
+
+	def err(self, message):
+		pass
+
+
+def get_session(threshold, chunk_size):
+
+	session = ctypes.session({'memsync_stream_threshold': threshold, 'memsync_stream_chunk_size': chunk_size})
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	return session, dll
+
+
+def get_bubblesort(dll):
+
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	return bubblesort
+
+
+def get_float_pointer(values):
+
+	return ctypes.cast(ctypes.pointer(values), ctypes.POINTER(ctypes.c_float))
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_memsync_stream_pack():
+
+	data = data_class(log_class(), is_server = False, stream_threshold = 64)
+
+	memsync_d_list = data.unpack_definition_memsync([
+		{'p': [0], 'l': [1], 't': 'c_int16'},
+		{'p': [2], 'l': [3], 't': 'c_wchar', 'w': True}
+		])
+	values = (ctypes.c_int16 * 40)(*range(40))
+	text = ctypes.create_unicode_buffer('zugbruecke', 40)
+	args = (values, 40, text, 40)
+
+	# Large memory is not serialized, Unicode is
+	memory_d, memory_unicode_d = data.client_pack_memory_list(args, memsync_d_list)
+	assert b'' == memory_d['d'] and 80 == memory_d['l'] and 's' in memory_d.keys()
+	assert len(memory_unicode_d['d']) > 0 and 's' not in memory_unicode_d.keys()
+
+	# Access by other side
+	assert bytes(values)[2:12] == data.memsync_stream_read(memory_d['s'], 2, 10)
+	data.memsync_stream_write(memory_d['s'], 78, bytes(ctypes.c_int16(-1)))
+	assert -1 == values[39]
+	with pytest.raises(ValueError):
+		data.memsync_stream_read(memory_d['s'], 72, 10)
+	with pytest.raises(ValueError):
+		data.memsync_stream_write(memory_d['s'], -2, b'ab')
+
+	# Call is over
+	data.client_close_memory_list([memory_d, memory_unicode_d])
+	assert {} == data.stream_dict
+	with pytest.raises(KeyError):
+		data.memsync_stream_read(memory_d['s'], 0, 2)
+
+	# Small memory and streaming off
+	assert 's' not in data.client_pack_memory_list((values, 31, text, 0), memsync_d_list)[0].keys()
+	data.stream_threshold = 0
+	assert 's' not in data.client_pack_memory_list(args, memsync_d_list)[0].keys()
+
+
+def test_memsync_stream_allocated_during_call():
+
+	data = data_class(log_class(), is_server = False, stream_threshold = 64)
+
+	# Memory allocated on behalf of other side is handed over when unpacking ...
+	mark = data.client_begin_stream_call()
+	token = data.memsync_stream_allocate(64)
+	data.__stream_close__(token)
+	data.client_end_stream_call(mark)
+	assert {} == data.stream_dict
+
+	# ... or dropped after the call if the call failed (also in nested calls)
+	mark = data.client_begin_stream_call()
+	data.memsync_stream_allocate(64)
+	nested_mark = data.client_begin_stream_call()
+	data.memsync_stream_allocate(128)
+	data.client_end_stream_call(nested_mark)
+	assert 1 == len(data.stream_dict)
+	data.client_end_stream_call(mark)
+	assert {} == data.stream_dict
+
+
+def test_memsync_stream_chunk_size():
+
+	with pytest.raises(ValueError):
+		get_session(64, 0)
+
+	session, _ = get_session(64, 32)
+	with pytest.raises(ValueError):
+		session.set_parameter({'memsync_stream_chunk_size': 0})
+	assert 32 == session.data.stream_chunk_size
+	session.terminate()
+
+
+@pytest.mark.parametrize('chunk_size', [24, 400, 4096])
+def test_memsync_stream_session(chunk_size):
+
+	session, dll = get_session(64, chunk_size)
+
+	# Memory allocated by caller
+	bubblesort = get_bubblesort(dll)
+	values = (ctypes.c_float * 100)(*range(100, 0, -1))
+	bubblesort(get_float_pointer(values), 100)
+	assert [float(number) for number in range(1, 101)] == values[:]
+
+	# Memory allocated by DLL
+	square_int_array = dll.square_int_array
+	square_int_array.argtypes = (ctypes.POINTER(ctypes.c_int16), ctypes.c_void_p, ctypes.c_int16)
+	square_int_array.memsync = [{'p': [0], 'l': [2], 't': 'c_int16'}, {'p': [1, -1], 'l': [2], 't': 'c_int16'}]
+	in_array = (ctypes.c_int16 * 150)(*range(150))
+	out_array_p = ctypes.pointer(ctypes.c_void_p())
+	square_int_array(ctypes.cast(ctypes.pointer(in_array), ctypes.POINTER(ctypes.c_int16)), out_array_p, 150)
+	assert [ctypes.c_int16(number ** 2).value for number in range(150)] == \
+		ctypes.cast(out_array_p.contents, ctypes.POINTER(ctypes.c_int16 * 150)).contents[:]
+
+	# Nothing is kept after calls
+	assert {} == session.data.stream_dict
+
+	session.terminate()
+
+
+def test_memsync_stream_pipeline():
+
+	session, dll = get_session(64, 32)
+	bubblesort = get_bubblesort(dll)
+
+	values = (ctypes.c_float * 50)(*range(50, 0, -1))
+	pointer = get_float_pointer(values)
+
+	pipeline = session.create_pipeline()
+	sort = pipeline.call(bubblesort, pointer, 50)
+	pipeline.call(bubblesort, sort.arg(0), 3) # same memory on Wine side
+	pipeline.run()
+	assert 50.0 == values[0] # memory of first call was not requested
+	assert {} == session.data.stream_dict
+
+	pipeline.run(sort.arg(0), sort)
+	assert [float(number) for number in range(1, 51)] == values[:]
+	assert {} == session.data.stream_dict
+
+	session.terminate()
+
+
+def test_memsync_stream_set_parameter():
+
+	session, dll = get_session(0, 32)
+	bubblesort = get_bubblesort(dll)
+
+	for threshold in (64, 0):
+		session.set_parameter({'memsync_stream_threshold': threshold})
+		values = (ctypes.c_float * 30)(*range(30, 0, -1))
+		bubblesort(get_float_pointer(values), 30)
+		assert [float(number) for number in range(1, 31)] == values[:]
+
+	session.terminate()
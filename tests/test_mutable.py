@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_mutable.py: Test selection of arguments synced after a call
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('packed definitions only exist on Unix side', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class values_by_value(ctypes.Structure):
+
+
+	_fields_ = [
+		('values', ctypes.c_float * 64),
+		('length', ctypes.c_int)
+		]
+
+
+class values_by_pointer(ctypes.Structure):
+
+
+	_fields_ = [
+		('values', ctypes.POINTER(ctypes.c_float)),
+		('length', ctypes.c_int)
+		]
+
+
+class nested_values(ctypes.Structure):
+
+
+	_fields_ = [
+		('inner', values_by_pointer),
+		('scale', ctypes.c_double)
+		]
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_mutable_indices():
+
+	data = ctypes.current_session.data
+
+	argtypes_d = data.pack_definition_argtypes((
+		ctypes.c_int, # 0: by value
+		ctypes.POINTER(ctypes.c_int), # 1: pointer
+		ctypes.c_int16 * 3, # 2: array, passed as pointer
+		values_by_value, # 3: struct by value, no pointers
+		ctypes.POINTER(values_by_value), # 4: pointer to struct
+		values_by_pointer, # 5: struct by value, pointer in field
+		nested_values, # 6: struct by value, pointer in field of nested struct
+		ctypes.c_void_p # 7: plain address
+		))
+
+	assert [1, 2, 4, 5, 6] == data.get_mutable_definition_indices(argtypes_d)
+
+
+def test_mutable_indices_memsync():
+
+	data = ctypes.current_session.data
+
+	memsync_d = data.unpack_definition_memsync([{'p': [1], 'l': [0], 't': 'c_float'}])
+	argtypes_d = data.pack_definition_argtypes((ctypes.c_int, ctypes.POINTER(ctypes.c_float)))
+	data.apply_memsync_to_argtypes_and_restype_definition(memsync_d, argtypes_d, data.pack_definition_returntype(None))
+
+	assert [] == data.get_mutable_definition_indices(argtypes_d) # memory handled by memsync
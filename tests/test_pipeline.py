@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_pipeline.py: Test sequences of calls executed on the Wine side in one go
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('pipelines are a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_pipeline_references():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	divide = dll.cookbook_divide
+	divide.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+	divide.restype = ctypes.c_int
+	add_ints = dll.add_ints
+	add_ints.argtypes = (ctypes.c_int16, ctypes.c_int16)
+	add_ints.restype = ctypes.c_int16
+
+	pipeline = session.create_pipeline()
+	remainder = ctypes.c_int()
+	quotient = pipeline.call(divide, 17, 5, remainder)
+	total = pipeline.call(add_ints, quotient, quotient.arg(2)) # 3 + 2
+	total = pipeline.call(add_ints, total, total) # 5 + 5
+
+	assert 3 == len(pipeline)
+	assert [10, 3] == pipeline.run(total, quotient)
+	assert 2 == remainder.value # synced, call was requested
+
+	remainder.value = 0
+	assert [10] == pipeline.run()
+	assert 0 == remainder.value # not synced, call was not requested
+
+	session.terminate()
+
+
+def test_pipeline_memsync():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	values = (ctypes.c_float * 5)(5, 2, 4, 1, 3)
+	pointer = ctypes.cast(ctypes.pointer(values), ctypes.POINTER(ctypes.c_float))
+
+	pipeline = session.create_pipeline()
+	sort = pipeline.call(bubblesort, pointer, 5)
+	pipeline.call(bubblesort, sort.arg(0), 3) # same memory on Wine side
+	pipeline.run()
+	assert [5.0, 2.0, 4.0, 1.0, 3.0] == values[:] # memory of first call was not requested
+
+	result = pipeline.run(sort.arg(0), sort)
+	assert [1.0, 2.0, 3.0, 4.0, 5.0] == values[:] # state after all calls
+	assert result[0] is pointer
+
+	session.terminate()
+
+
+def test_pipeline_errors():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+	add_ints = dll.add_ints
+	add_ints.argtypes = (ctypes.c_int16, ctypes.c_int16)
+	add_ints.restype = ctypes.c_int16
+
+	pipeline = session.create_pipeline()
+	step = pipeline.call(add_ints, 1, 2)
+	with pytest.raises(IndexError):
+		pipeline.call(add_ints, step.arg(2), 1)
+	with pytest.raises(ValueError):
+		session.create_pipeline().call(add_ints, step, 1)
+
+	pipeline.call(add_ints, step)
+	with pytest.raises(TypeError):
+		pipeline.run()
+
+	session.terminate()
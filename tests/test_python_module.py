@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_python_module.py: Test Python code running on the Wine side
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('Wine-side Python modules are a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+SOURCE = """
+import ctypes
+
+def gcd_table(dll_name, pairs):
+	gcd = get_dll(dll_name).cookbook_gcd
+	return [gcd(x, y) for x, y in pairs]
+
+def sum_floats(buffer_id = None, buffer = None, length = 0):
+	if buffer is None:
+		buffer = get_buffer(buffer_id)
+	return sum((ctypes.c_float * length).from_buffer(buffer))
+
+def fail():
+	raise ValueError('fail')
+
+def _private():
+	pass
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_python_module():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+	dll.cookbook_gcd.argtypes = (ctypes.c_int, ctypes.c_int)
+	dll.cookbook_gcd.restype = ctypes.c_int
+	assert 7 == dll.cookbook_gcd(35, 42)
+
+	module = session.load_python_module(SOURCE, name = 'sample')
+	assert ['fail', 'gcd_table', 'sum_floats'] == sorted(module.functions.keys())
+	assert module is session.load_python_module(SOURCE, name = 'sample')
+
+	assert [7, 6, 1] == module.gcd_table('tests/demo_dll.dll', [(35, 42), (12, 18), (3, 5)])
+
+	buffer = session.create_remote_buffer((ctypes.c_float * 3)(1.5, 2.0, 3.5))
+	assert 7.0 == module.sum_floats(buffer = buffer, length = 3)
+	assert 7.0 == module.sum_floats(buffer.buffer_id, length = 3)
+
+	with pytest.raises(ValueError):
+		module.fail()
+
+	session.terminate()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_remote_buffer.py: Test buffers residing on the Wine side across calls
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import gc
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('remote buffers are a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_remote_buffer_memsync():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+
+	values = (ctypes.c_float * 5)(5, 2, 4, 1, 3)
+
+	with ctypes.current_session.create_remote_buffer(values) as buffer:
+
+		bubblesort(buffer, 3) # sort first three elements on Wine side
+		assert [2.0, 4.0, 5.0, 1.0, 3.0] == buffer.download((ctypes.c_float * 5)())[:]
+		bubblesort(buffer, 5) # same buffer, no upload
+		assert [1.0, 2.0, 3.0, 4.0, 5.0] == buffer.download((ctypes.c_float * 5)())[:]
+
+		# Local contents are untouched
+		assert [5.0, 2.0, 4.0, 1.0, 3.0] == values[:]
+
+
+def test_remote_buffer_pointers_and_arrays():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	cookbook_divide = dll.cookbook_divide
+	cookbook_divide.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+	cookbook_divide.restype = ctypes.c_int
+
+	remainder = ctypes.current_session.create_remote_buffer(ctypes.sizeof(ctypes.c_int))
+	assert 3 == cookbook_divide(7, 2, remainder)
+	assert 1 == ctypes.c_int.from_buffer_copy(remainder.raw).value
+
+	gauss_elimination = dll.gauss_elimination
+	gauss_elimination.argtypes = (ctypes.POINTER(ctypes.c_float * 4 * 3), ctypes.POINTER(ctypes.c_float * 3))
+
+	A = ctypes.current_session.create_remote_buffer(
+		(ctypes.c_float * 4 * 3)(*(tuple(eq) for eq in [[1, 2, 3, 2], [1, 1, 1, 2], [3, 3, 1, 0]]))
+		)
+	x = ctypes.current_session.create_remote_buffer(ctypes.sizeof(ctypes.c_float * 3))
+	gauss_elimination(A, x)
+	assert [5.0, -6.0, 3.0] == (ctypes.c_float * 3).from_buffer_copy(x.raw)[:]
+
+	for buffer in (remainder, A, x):
+		buffer.free()
+
+
+def test_remote_buffer_reference_counting():
+
+	buffer = ctypes.current_session.create_remote_buffer(b'zugbruecke')
+	assert b'zugbruecke' == buffer.raw
+
+	buffer.upload(b'Z')
+	assert b'Zugbruecke' == buffer.raw
+
+	other = buffer.retain()
+	buffer.free()
+	buffer.free() # no effect
+	with pytest.raises(ValueError):
+		buffer.download()
+
+	assert b'bruecke' == other.download(offset = 3)
+	with pytest.raises(ValueError):
+		other.download(offset = 3, length = 100)
+
+	buffer_id = other.buffer_id
+	other.free()
+	with pytest.raises(KeyError):
+		ctypes.current_session.rpc_client.remote_buffer_read(buffer_id, 0, 1)
+
+
+def test_remote_buffer_garbage_collected():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+	cookbook_divide = dll.cookbook_divide
+	cookbook_divide.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+	cookbook_divide.restype = ctypes.c_int
+
+	buffer = ctypes.current_session.create_remote_buffer(ctypes.sizeof(ctypes.c_int))
+	buffer_id = buffer.buffer_id
+
+	# No RPC from garbage collection, buffer is queued for release
+	del buffer
+	gc.collect()
+	assert buffer_id in ctypes.current_session.data.remote_release_queue
+	assert b'\x00' == ctypes.current_session.rpc_client.remote_buffer_read(buffer_id, 0, 1)
+
+	# Released with next call
+	assert 3 == cookbook_divide(7, 2, ctypes.pointer(ctypes.c_int()))
+	assert 0 == len(ctypes.current_session.data.remote_release_queue)
+	with pytest.raises(KeyError):
+		ctypes.current_session.rpc_client.remote_buffer_read(buffer_id, 0, 1)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_routine_stream.py: Streams of calls with transfers overlapping DLL calls
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from itertools import islice
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('streams of calls are a zugbruecke extension', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def get_session():
+
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll', {
+		'mode': ctypes.DEFAULT_MODE, 'use_errno': False, 'use_last_error': False
+		})
+
+	add_ints = dll.add_ints
+	add_ints.argtypes = (ctypes.c_int16, ctypes.c_int16)
+	add_ints.restype = ctypes.c_int16
+
+	bubblesort = dll.bubblesort
+	bubblesort.memsync = [{'p': [0], 'l': [1], 't': 'c_float'}]
+	bubblesort.argtypes = (ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+	bubblesort.restype = None
+
+	return session, add_ints, bubblesort
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+@pytest.mark.parametrize('depth', [1, 2, 3])
+def test_routine_stream_memsync(depth):
+
+	session, _, bubblesort = get_session()
+
+	chunks = [(ctypes.c_float * 50)(*range(index, index + 50)[::-1]) for index in range(12)]
+
+	# Chunks are generated on demand
+	results = bubblesort.stream(
+		((ctypes.cast(ctypes.pointer(chunk), ctypes.POINTER(ctypes.c_float)), len(chunk)) for chunk in chunks),
+		depth = depth
+		)
+
+	for index, result in enumerate(results):
+		assert result is None
+		assert [float(number) for number in range(index, index + 50)] == chunks[index][:]
+
+	assert depth == len(session.rpc_client_list) # connections are kept for reuse
+
+	session.terminate()
+
+
+def test_routine_stream_order():
+
+	session, add_ints, _ = get_session()
+
+	assert [2 * number for number in range(30)] == list(add_ints.stream(((number, number) for number in range(30)), depth = 4))
+	assert [] == list(add_ints.stream([]))
+
+	session.terminate()
+
+
+def test_routine_stream_close_and_errors():
+
+	session, add_ints, _ = get_session()
+
+	# Stream is not consumed entirely
+	results = add_ints.stream(((number, 1) for number in range(100)), depth = 3)
+	assert [1, 2] == list(islice(results, 2))
+	results.close()
+	assert 3 == len(session.rpc_client_list)
+
+	# Error in one call ends stream
+	results = add_ints.stream([(1, 1), (1, 1, 1), (2, 2)], depth = 2)
+	assert 2 == next(results)
+	with pytest.raises(TypeError):
+		next(results)
+	assert 3 == len(session.rpc_client_list)
+
+	with pytest.raises(ValueError):
+		list(add_ints.stream([(1, 1)], depth = 0))
+
+	# Connections still work
+	assert [4, 6] == list(add_ints.stream([(2, 2), (3, 3)]))
+	assert 5 == add_ints(2, 3)
+
+	session.terminate()
+
+
+def test_routine_stream_connections():
+
+	session, add_ints, _ = get_session()
+
+	# Two streams at once need more connections than the largest depth
+	first = add_ints.stream(((number, 1) for number in range(10)), depth = 3)
+	assert 1 == next(first)
+	assert [2, 4] == list(add_ints.stream([(1, 1), (2, 2)], depth = 2))
+	assert 2 == len(session.rpc_client_list)
+	rpc_clients = list(session.rpc_client_list)
+	first.close()
+
+	# Pool is capped at largest depth
+	assert 3 == len(session.rpc_client_list)
+	assert not any(rpc_client.client.closed for rpc_client in rpc_clients)
+
+	# Connections are closed with session
+	rpc_clients = list(session.rpc_client_list)
+	session.terminate()
+	assert 0 == len(session.rpc_client_list)
+	assert all(rpc_client.client.closed for rpc_client in rpc_clients)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_rpc.py: Test dispatch of RPC by integer handles
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	from zugbruecke.core.rpc import (
+		call_on_connection,
+		FRAME_CALL,
+		FRAME_RETURN,
+		HANDLE_GET_HANDLE,
+		mp_server_handler_class
+		)
+elif platform.startswith('win'):
+	pytest.skip('rpc is a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class connection_class:
+
+
+	def __init__(self, messages):
+
+		self.messages = list(messages)
+		self.sent = []
+
+
+	def recv(self):
+
+		if len(self.messages) == 0:
+			raise EOFError()
+		return self.messages.pop(0)
+
+
+	def send(self, message):
+
+		self.sent.append(message)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_rpc_handles():
+
+	handler = mp_server_handler_class()
+
+	handle = handler.register_function(lambda a, b: a + b, 'add')
+	assert handle == handler.register_function(lambda a, b: a - b, 'add') # re-registration keeps handle
+
+	connection = connection_class([
+		(FRAME_CALL, HANDLE_GET_HANDLE, ('add',), {}),
+		(FRAME_CALL, handle, (3, 2), {}),
+		(FRAME_CALL, HANDLE_GET_HANDLE, ('unknown',), {})
+		])
+	handler.handle_connection(connection)
+
+	assert connection.sent[:2] == [(FRAME_RETURN, handle), (FRAME_RETURN, 1)]
+	assert isinstance(connection.sent[2][1], KeyError)
+
+	# Handles of unregistered functions are not reused, requests with them fail
+	handler.unregister_function('add')
+	assert handle != handler.register_function(lambda a, b: a * b, 'mul')
+	connection = connection_class([(FRAME_CALL, handle, (3, 2), {})])
+	handler.handle_connection(connection)
+	assert isinstance(connection.sent[0][1], KeyError)
+
+
+def test_rpc_nested():
+
+	handler = mp_server_handler_class()
+	handle = handler.register_function(lambda a: a * 2, 'double')
+
+	# Other side sends two nested requests (callbacks) before answering
+	connection = connection_class([
+		(FRAME_CALL, handle, (3,), {}),
+		(FRAME_CALL, handle, (4,), {}),
+		(FRAME_RETURN, 42)
+		])
+	assert 42 == call_on_connection(connection, 7, ('x',), {}, handler)
+
+	assert connection.sent == [
+		(FRAME_CALL, 7, ('x',), {}),
+		(FRAME_RETURN, 6),
+		(FRAME_RETURN, 8)
+		]
+
+	# Errors of the other side are raised
+	connection = connection_class([(FRAME_RETURN, ValueError('test'))])
+	with pytest.raises(ValueError):
+		call_on_connection(connection, 7, (), {}, handler)
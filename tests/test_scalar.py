@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_scalar.py: Test fast path for routines with fundamental types by value only
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('fast path is a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_scalar_fast_path():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	simple_demo_routine = dll.simple_demo_routine
+	simple_demo_routine.argtypes = (ctypes.c_float, ctypes.c_float)
+	simple_demo_routine.restype = ctypes.c_float
+
+	assert pytest.approx(1.5) == simple_demo_routine(ctypes.c_float(3.0), 2.0) # ctypes types are stripped
+	assert simple_demo_routine.is_scalar
+
+	with pytest.raises(TypeError):
+		simple_demo_routine(2.0)
+
+
+def test_scalar_not_classified():
+
+	dll = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+	cookbook_divide = dll.cookbook_divide
+	cookbook_divide.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+	cookbook_divide.restype = ctypes.c_int
+
+	remainder = ctypes.c_int()
+	assert 3 == cookbook_divide(7, 2, remainder)
+	assert 1 == remainder.value
+	assert not cookbook_divide.is_scalar
+
+
+def test_scalar_void():
+
+	# Own session, routine is configured with a return value elsewhere
+	session = ctypes.session()
+	dll = session.load_library('tests/demo_dll.dll', 'windll')
+
+	simple_demo_routine = dll.simple_demo_routine
+	simple_demo_routine.argtypes = (ctypes.c_float, ctypes.c_float)
+	simple_demo_routine.restype = None
+
+	assert simple_demo_routine(3.0, 2.0) is None
+	assert simple_demo_routine.is_scalar
+
+	session.terminate()
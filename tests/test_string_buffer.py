@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_string_buffer.py: C strings and string buffers without memsync
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	pytest.skip('routines of demo DLL are configured with memsync by other tests', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# FIXTURE(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+@pytest.fixture
+def dll():
+
+	# Own session, routines of shared DLL are configured with memsync elsewhere
+	session = ctypes.session()
+	yield session.load_library('tests/demo_dll.dll', 'windll')
+	session.terminate()
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_string_buffer_char_p(dll):
+
+	replace_letter = dll.replace_letter_in_null_terminated_string_a
+	replace_letter.argtypes = (ctypes.c_char_p, ctypes.c_char, ctypes.c_char)
+	replace_letter.restype = None
+
+	# Immutable strings are passed by value, nothing to sync
+	assert replace_letter(b'zugbruecke', b'x', b'y') is None
+	assert replace_letter.is_scalar
+
+	# String buffers are synced in place, including everything after the null character
+	string_buffer = ctypes.create_string_buffer(b'zugbruecke\0zz', 16)
+	replace_letter(string_buffer, b'z', b'Z')
+	assert b'Zugbruecke\0zz\0\0\0' == string_buffer.raw
+
+
+def test_string_buffer_pointer_char(dll):
+
+	replace_letter = dll.replace_letter_in_null_terminated_string_b
+	replace_letter.argtypes = (ctypes.POINTER(ctypes.c_char), ctypes.c_char, ctypes.c_char)
+
+	string_buffer = ctypes.create_string_buffer(b'zugbruecke')
+	replace_letter(string_buffer, b'e', b'E')
+	assert b'zugbruEckE' == string_buffer.value
+
+
+def test_string_buffer_wchar_p(dll):
+
+	replace_letter = dll.replace_letter_in_null_terminated_string_unicode_a
+	replace_letter.argtypes = (ctypes.c_wchar_p, ctypes.c_wchar, ctypes.c_wchar)
+
+	unicode_buffer = ctypes.create_unicode_buffer('zugbrücke \U0001f309 zugbrücke')
+	length = len(unicode_buffer)
+	replace_letter(unicode_buffer, 'ü', 'u')
+	assert 'zugbrucke \U0001f309 zugbrucke' == unicode_buffer.value
+	assert length == len(unicode_buffer)
+
+
+def test_string_buffer_pointer_wchar(dll):
+
+	replace_letter = dll.replace_letter_in_null_terminated_string_unicode_b
+	replace_letter.argtypes = (ctypes.POINTER(ctypes.c_wchar), ctypes.c_wchar, ctypes.c_wchar)
+
+	unicode_buffer = ctypes.create_unicode_buffer('bridge', 10)
+	replace_letter(unicode_buffer, 'e', 'E')
+	assert 'bridgE\0\0\0\0' == unicode_buffer[:]
+
+
+def test_string_buffer_definition():
+
+	data = ctypes.current_session.data
+
+	assert [True, True, True, True, False, False, False] == [
+		arg_d['b'] for arg_d in data.pack_definition_argtypes([
+			ctypes.c_char_p, ctypes.c_wchar_p, ctypes.POINTER(ctypes.c_char), ctypes.POINTER(ctypes.c_wchar),
+			ctypes.c_char, ctypes.POINTER(ctypes.c_char_p), ctypes.c_char * 4
+			])
+		]
+
+
+def test_string_buffer_sync_length():
+
+	data = ctypes.current_session.data
+
+	# Characters outside of the BMP take two units on the Windows side, the number of characters differs
+	unicode_buffer = ctypes.create_unicode_buffer('abc', 4)
+	data.__sync_item_buffer__(unicode_buffer, ctypes.create_unicode_buffer('xy', 3))
+	assert 'xy\0\0' == unicode_buffer[:]
+	data.__sync_item_buffer__(unicode_buffer, ctypes.create_unicode_buffer('vwxyz'))
+	assert 'vwxy' == unicode_buffer[:]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_wchar.py: Conversion of Unicode memsync segments between wchar_t sizes
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2019 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+	from zugbruecke.core.data import data_class, mem_contents
+	from zugbruecke.core.data.memory import convert_wchar_bytes
+elif platform.startswith('win'):
+	pytest.skip('conversion of wchar_t is a zugbruecke internal', allow_module_level = True)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class log_class:
+
+
+	def out(self, message):
+		pass
+
+
+	def err(self, message):
+		pass
+
+
+def pack_unicode_buffer(data, buffer):
+
+	return data.client_pack_memory_list(
+		(ctypes.cast(buffer, ctypes.POINTER(ctypes.c_wchar)), len(buffer)),
+		data.unpack_definition_memsync([{'p': [0], 'l': [1], 't': 'c_wchar', 'w': True}])
+		)[0]
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+@pytest.mark.parametrize('text', [
+	'', 'zugbrücke', '\U0001f309 bridge \U0001f309', '\U00010000\U0010ffff￿', 'lone \ud800 surrogate'
+	])
+def test_convert_wchar_bytes_roundtrip(text):
+
+	utf32 = text.encode('utf-32-le', 'surrogatepass')
+	utf16 = text.encode('utf-16-le', 'surrogatepass')
+
+	assert utf16 == convert_wchar_bytes(utf32, 4, 2)
+	assert utf32 == convert_wchar_bytes(utf16, 2, 4)
+	assert utf32 == convert_wchar_bytes(convert_wchar_bytes(utf32, 4, 2), 2, 4)
+
+
+def test_convert_wchar_bytes_invalid():
+
+	# Not Unicode: unit by unit, wider units are truncated
+	assert b'\xff\xffA\x00' == convert_wchar_bytes(b'\xff\xff\xff\xffA\x00\x00\x00', 4, 2)
+	assert b'\xff\xff\x00\x00A\x00\x00\x00' == convert_wchar_bytes(b'\xff\xffA\x00\x00', 2, 4)
+
+
+def test_adjust_wchar_length_fixed_buffer(monkeypatch):
+
+	data = data_class(log_class(), is_server = False)
+
+	text = 'a\U0001f309b\U0001f309c'
+	buffer = ctypes.create_unicode_buffer(text, 8)
+	memory_d = pack_unicode_buffer(data, buffer)
+	assert 32 == memory_d['l']
+
+	# Arrives on Windows side: surrogate pairs need more units
+	monkeypatch.setattr(mem_contents, 'WCHAR_BYTES', 2)
+	data.__adjust_wchar_length__(memory_d)
+	assert (text + '\0\0\0').encode('utf-16-le') == memory_d['d']
+	assert 20 == memory_d['l']
+
+	# DLL changes string in place
+	memory_d['d'] = memory_d['d'].replace('b'.encode('utf-16-le'), 'B'.encode('utf-16-le'))
+
+	# Back on Unix side, fits into original buffer
+	monkeypatch.setattr(mem_contents, 'WCHAR_BYTES', 4)
+	data.__adjust_wchar_length__(memory_d)
+	assert 32 == memory_d['l'] == len(memory_d['d'])
+	assert (text.replace('b', 'B') + '\0\0\0').encode('utf-32-le') == memory_d['d']
+
+
+def test_adjust_wchar_length_overflow(monkeypatch):
+
+	data = data_class(log_class(), is_server = False)
+
+	# Windows side DLL fills buffer of 4 units with BMP characters only, Unix side has room for 2
+	memory_d = {'d': 'bridge'.encode('utf-16-le')[:8], 'l': 8, 'w': 2, '_l': 8}
+	data.__adjust_wchar_length__(memory_d)
+	assert 'br'.encode('utf-32-le') == memory_d['d']
+	assert 8 == memory_d['l']